@@ -0,0 +1,42 @@
+import importlib.util
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.services.analytics.export import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, EXPORT_STREAMS
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+@router.get("/entries")
+def export_entries(
+    format: str = Query("csv", description="csv, ndjson or parquet"),
+    ba_codes: Optional[List[str]] = Query(None),
+    years: Optional[List[int]] = Query(None),
+    categories: Optional[List[str]] = Query(None),
+    asset_types: Optional[List[str]] = Query(None),
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=100, le=100000),
+):
+    """
+    Streams every ExtractedEntry matching the filters, chunk by chunk, so memory use
+    does not grow with the size of the export. Repeat a filter parameter for several
+    values, e.g. ?years=2023&years=2024.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format '{format}', expected one of {', '.join(EXPORT_FORMATS)}")
+    if format == "parquet" and importlib.util.find_spec("pyarrow") is None:
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow")
+
+    stream = EXPORT_STREAMS[format](
+        chunk_size,
+        ba_codes=ba_codes,
+        years=years,
+        categories=categories,
+        asset_types=asset_types,
+    )
+    return StreamingResponse(
+        stream,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="extracted_entries.{format}"'},
+    )
@@ -0,0 +1,115 @@
+import hashlib
+import math
+import os
+from typing import List
+
+from fastapi import APIRouter, File, HTTPException, Query, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+
+from app.schemas.ingestion import ExtractedRecord, JobCreate, JobResults, JobStatus, UploadResponse
+from app.services.ingestion.bulk import EXCEL_EXTENSIONS
+from app.services.ingestion.jobs import JOB_FAILED, JobManager, StoredUpload, get_job_manager
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+router = APIRouter(prefix="/ingestion", tags=["ingestion"])
+
+
+def _job_status(job) -> JobStatus:
+    # Field by field: asdict() would deep-copy the job's records on every poll
+    return JobStatus(**{name: getattr(job, name) for name in JobStatus.model_fields})
+
+
+def _get_job_or_404(manager: JobManager, job_id: str):
+    job = manager.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+@router.post("/uploads", response_model=UploadResponse, status_code=status.HTTP_201_CREATED)
+async def upload_workbook(file: UploadFile = File(...)):
+    """
+    Streams a workbook to a temporary file in 1 MiB chunks and returns its upload_id.
+    """
+    if not file.filename or not file.filename.lower().endswith(EXCEL_EXTENSIONS):
+        raise HTTPException(status_code=400, detail="Only .xlsx / .xls files are accepted")
+
+    manager = get_job_manager()
+    upload_id, path = manager.new_upload_path(file.filename)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(path, "wb") as out:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                digest.update(chunk)
+                size += len(chunk)
+                await run_in_threadpool(out.write, chunk)
+    except Exception:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    finally:
+        await file.close()
+
+    upload = StoredUpload(upload_id=upload_id, filename=file.filename, path=path, size=size, sha256=digest.hexdigest())
+    manager.register_upload(upload)
+    return UploadResponse(upload_id=upload_id, filename=upload.filename, size=size, sha256=upload.sha256)
+
+
+@router.delete("/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_upload(upload_id: str):
+    if not get_job_manager().delete_upload(upload_id):
+        raise HTTPException(status_code=404, detail=f"Upload {upload_id} not found")
+
+
+@router.post("/jobs", response_model=JobStatus, status_code=status.HTTP_202_ACCEPTED)
+async def start_job(request: JobCreate):
+    """
+    Queues extraction (and, unless persist is false, persistence) of an upload, together
+    with extra_upload_ids when given. Returns immediately; poll GET /ingestion/jobs/{job_id} for progress.
+    Each upload can be submitted once; upload the file again to run another job.
+    """
+    try:
+        job = get_job_manager().submit(
+            request.upload_id, request.category, request.persist, request.tahun_anggaran, request.extra_upload_ids
+        )
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Upload {e.args[0]} not found or already submitted")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _job_status(job)
+
+
+@router.get("/jobs", response_model=List[JobStatus])
+async def list_jobs():
+    return [_job_status(job) for job in get_job_manager().list_jobs()]
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    return _job_status(_get_job_or_404(get_job_manager(), job_id))
+
+
+@router.get("/jobs/{job_id}/results", response_model=JobResults)
+async def get_job_results(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=10000),
+):
+    """
+    Extracted records of a finished job, one page at a time.
+    """
+    job = _get_job_or_404(get_job_manager(), job_id)
+    if job.records is None:
+        if job.status == JOB_FAILED:
+            raise HTTPException(status_code=422, detail=job.error)
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is still {job.status}")
+
+    page = job.records[offset:offset + limit]
+    records = [
+        # Penyusutan keeps empty values as NaN, which JSON cannot carry
+        ExtractedRecord(**{**r, "nilai": None if r.get("nilai") is None or math.isnan(r["nilai"]) else r["nilai"]})
+        for r in page
+    ]
+    return JobResults(job_id=job_id, total=len(job.records), offset=offset, records=records)
@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.instrumentation import metrics
+
+router = APIRouter(tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """
+    Per-stage ingestion timings (duration histogram, rows and bytes) of this process,
+    in Prometheus text exposition format.
+    """
+    return PlainTextResponse(metrics.render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,10 +1,29 @@
 import os
+import tempfile
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Excel Data Ingestion Engine"
     # Default to SQLite for development, can be overridden by env var
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./sql_app.db")
+    # Connection pool (readers); SQLite writes use a separate single-connection engine
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    # SQLite connection pragmas
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 10000))
+    SQLITE_CACHE_SIZE_KB: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", 64 * 1024))
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+    # On-disk cache of extracted records, keyed by workbook content hash
+    EXTRACTION_CACHE_DIR: str = os.getenv("EXTRACTION_CACHE_DIR", "./.extraction_cache")
+    EXTRACTION_CACHE_MAX_BYTES: int = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+    # API uploads are streamed here before extraction; worker processes for extraction jobs (0 = one per core)
+    UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "bar_uploads"))
+    INGESTION_WORKERS: int = int(os.getenv("INGESTION_WORKERS", 0))
+    # Parquet snapshot of extracted_entries read by the analytics pages (needs pyarrow)
+    SNAPSHOT_DIR: str = os.getenv("SNAPSHOT_DIR", "./.analytics_snapshot")
+    # When set, every traced upload is run under cProfile and its stats are dumped here
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "")
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
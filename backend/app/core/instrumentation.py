@@ -0,0 +1,193 @@
+import cProfile
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from app.core.config import settings
+
+# Upper bounds (seconds) of the Prometheus duration histogram buckets
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass
+class Span:
+    """
+    One timed stage, e.g. "extract.read" of one workbook. rows / bytes are set by the
+    instrumented code when it knows them.
+    """
+    stage: str
+    seconds: float = 0.0
+    rows: Optional[int] = None
+    bytes: Optional[int] = None
+
+
+@dataclass
+class Trace:
+    """
+    The spans recorded while a trace() block was active, e.g. during one upload.
+    """
+    name: str
+    spans: List[Span] = field(default_factory=list)
+    seconds: float = 0.0
+    profile_path: Optional[str] = None
+
+    def by_stage(self) -> List[dict]:
+        """
+        Totals per stage in first-seen order: calls, seconds, rows, bytes and share of the trace time.
+        """
+        stages: Dict[str, dict] = {}
+        for s in self.spans:
+            total = stages.setdefault(s.stage, {"stage": s.stage, "calls": 0, "seconds": 0.0, "rows": None, "bytes": None})
+            total["calls"] += 1
+            total["seconds"] += s.seconds
+            if s.rows is not None:
+                total["rows"] = (total["rows"] or 0) + s.rows
+            if s.bytes is not None:
+                total["bytes"] = (total["bytes"] or 0) + s.bytes
+        for total in stages.values():
+            total["share"] = total["seconds"] / self.seconds if self.seconds else None
+        return list(stages.values())
+
+
+class StageMetrics:
+    """
+    Process-wide totals per stage, exported in Prometheus text format by /metrics.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, dict] = {}
+
+    def observe(self, span: Span):
+        with self._lock:
+            stage = self._stages.setdefault(
+                span.stage, {"count": 0, "seconds": 0.0, "rows": 0, "bytes": 0, "buckets": [0] * len(DURATION_BUCKETS)}
+            )
+            stage["count"] += 1
+            stage["seconds"] += span.seconds
+            stage["rows"] += span.rows or 0
+            stage["bytes"] += span.bytes or 0
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if span.seconds <= bound:
+                    stage["buckets"][i] += 1
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            stages = {name: dict(s, buckets=list(s["buckets"])) for name, s in sorted(self._stages.items())}
+
+        lines = [
+            "# HELP bar_stage_duration_seconds Time spent in each ingestion stage.",
+            "# TYPE bar_stage_duration_seconds histogram",
+        ]
+        for name, s in stages.items():
+            for bound, count in zip(DURATION_BUCKETS, s["buckets"]):
+                lines.append(f'bar_stage_duration_seconds_bucket{{stage="{name}",le="{bound}"}} {count}')
+            lines.append(f'bar_stage_duration_seconds_bucket{{stage="{name}",le="+Inf"}} {s["count"]}')
+            lines.append(f'bar_stage_duration_seconds_sum{{stage="{name}"}} {s["seconds"]}')
+            lines.append(f'bar_stage_duration_seconds_count{{stage="{name}"}} {s["count"]}')
+        for metric, key, help_text in (
+            ("bar_stage_rows_total", "rows", "Rows handled by each ingestion stage."),
+            ("bar_stage_bytes_total", "bytes", "Bytes read by each ingestion stage."),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for name, s in stages.items():
+                if s[key]:
+                    lines.append(f'{metric}{{stage="{name}"}} {s[key]}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = StageMetrics()
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_profiling: ContextVar[bool] = ContextVar("profiling", default=False)
+
+
+@contextmanager
+def span(stage: str, rows: Optional[int] = None, bytes: Optional[int] = None) -> Iterator[Span]:
+    """
+    Times the block as `stage`. The yielded Span can be given rows / bytes inside the block.
+    Recorded in the process metrics and in the active trace, also when the block raises.
+    """
+    record = Span(stage, rows=rows, bytes=bytes)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.seconds = time.perf_counter() - start
+        metrics.observe(record)
+        current = _current_trace.get()
+        if current is not None:
+            current.spans.append(record)
+
+
+def timed(stage: str, rows: Optional[Callable[[object], int]] = None):
+    """
+    Decorator form of span(); `rows` computes the row count from the return value.
+    """
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage) as record:
+                result = fn(*args, **kwargs)
+                if rows is not None:
+                    record.rows = rows(result)
+                return result
+        return wrapper
+    return decorate
+
+
+def merge_spans(spans: Iterable[Span]):
+    """
+    Adds spans recorded in another process (extraction workers) to this process's
+    metrics and to the active trace.
+    """
+    current = _current_trace.get()
+    for record in spans:
+        metrics.observe(record)
+        if current is not None:
+            current.spans.append(record)
+
+
+@contextmanager
+def trace(name: str) -> Iterator[Trace]:
+    """
+    Collects the spans recorded in this context into a Trace; a trace nested in another
+    also passes its spans on to the outer one. When settings.PROFILE_DIR is set, the
+    outermost trace also runs under cProfile and dumps PROFILE_DIR/<name>.prof.
+    """
+    current = Trace(name)
+    parent = _current_trace.get()
+    token = _current_trace.set(current)
+
+    profiler = None
+    profile_token = None
+    if settings.PROFILE_DIR and not _profiling.get():
+        profiler = cProfile.Profile()
+        profile_token = _profiling.set(True)
+        profiler.enable()
+
+    start = time.perf_counter()
+    try:
+        yield current
+    finally:
+        current.seconds = time.perf_counter() - start
+        if profiler is not None:
+            profiler.disable()
+            _profiling.reset(profile_token)
+            os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+            current.profile_path = os.path.join(settings.PROFILE_DIR, re.sub(r"[^\w.-]", "_", name) + ".prof")
+            profiler.dump_stats(current.profile_path)
+        _current_trace.reset(token)
+        if parent is not None:
+            parent.spans.extend(current.spans)
@@ -0,0 +1,43 @@
+import os
+from typing import Optional
+
+from alembic import command
+from alembic.config import Config
+
+from app.core.config import settings
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ALEMBIC_INI = os.path.join(BACKEND_DIR, "alembic.ini")
+
+
+def alembic_config(database_url: Optional[str] = None) -> Config:
+    """
+    Alembic configuration for backend/migrations, pointed at `database_url`
+    (defaults to settings.DATABASE_URL).
+    """
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    config.set_main_option("sqlalchemy.url", (database_url or settings.DATABASE_URL).replace("%", "%%"))
+    # Keep the caller's logging setup
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def upgrade_database(database_url: Optional[str] = None, revision: str = "head"):
+    """
+    Applies all pending migrations. Safe to run on a new database, on one created by the
+    old create_all()/migrate_db.py setup (the baseline adopts it), and on an up-to-date one.
+    """
+    command.upgrade(alembic_config(database_url), revision)
+
+
+def current_revision(database_url: Optional[str] = None) -> Optional[str]:
+    from alembic.runtime.migration import MigrationContext
+    from sqlalchemy import create_engine
+
+    engine = create_engine(database_url or settings.DATABASE_URL)
+    try:
+        with engine.connect() as connection:
+            return MigrationContext.configure(connection).get_current_revision()
+    finally:
+        engine.dispose()
@@ -1,11 +1,82 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
 from app.core.config import settings
 
-# SQLite requires connect_args check_same_thread=False
-connect_args = {"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
 
-engine = create_engine(
-    settings.DATABASE_URL, connect_args=connect_args
-)
+def _is_file_sqlite(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def _apply_sqlite_pragmas(dbapi_connection):
+    cursor = dbapi_connection.cursor()
+    try:
+        # WAL lets readers run while a write is in progress; NORMAL only fsyncs at checkpoints
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}")  # Negative: KiB, not pages
+        cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
+def build_engine(url: str, writer: bool = False, tuned: bool = True):
+    """
+    Engine for `url`. For file-based SQLite with tuned=True:
+    - every connection gets the WAL / busy_timeout / cache / mmap pragmas;
+    - writer=True gives a single-connection pool whose transactions start with
+      BEGIN IMMEDIATE, so the write lock is taken up front (and waited for with
+      busy_timeout) instead of failing with "database is locked" on lock upgrade.
+    Other databases get a plain pooled engine; writer makes no difference there.
+    """
+    if not url.startswith("sqlite"):
+        return create_engine(
+            url,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_pre_ping=True,
+        )
+
+    # SQLite requires connect_args check_same_thread=False
+    connect_args = {"check_same_thread": False}
+    if not _is_file_sqlite(url):
+        return create_engine(url, connect_args=connect_args, poolclass=StaticPool)
+    if not tuned:
+        return create_engine(url, connect_args=connect_args)
+
+    engine = create_engine(
+        url,
+        connect_args=connect_args,
+        poolclass=QueuePool,
+        pool_size=1 if writer else settings.DB_POOL_SIZE,
+        max_overflow=0 if writer else settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        _apply_sqlite_pragmas(dbapi_connection)
+        if writer:
+            # Take over transaction control from pysqlite so "begin" below decides the mode
+            dbapi_connection.isolation_level = None
+
+    if writer:
+        @event.listens_for(engine, "begin")
+        def on_begin(conn):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return engine
+
+
+engine = build_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Writes (ingestion, form saves, reference sync) go through their own engine: on SQLite a
+# single IMMEDIATE-transaction connection, so the readers' pool never queues behind a writer
+writer_engine = build_engine(settings.DATABASE_URL, writer=True) if _is_file_sqlite(settings.DATABASE_URL) else engine
+WriterSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=writer_engine)
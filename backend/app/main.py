@@ -1,10 +1,25 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api import export, ingestion, metrics
+from app.db.migrations import upgrade_database
+from app.services.ingestion.jobs import get_job_manager
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Apply pending migrations before serving; the bundled database may predate them
+    upgrade_database()
+    yield
+    # Stop the extraction workers and the writer thread
+    get_job_manager().shutdown()
+
 app = FastAPI(
     title="Excel Data Ingestion Engine",
     description="API for ingesting and analyzing financial data from Excel files",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -16,6 +31,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.include_router(ingestion.router)
+app.include_router(export.router)
+app.include_router(metrics.router)
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Excel Ingestion Engine API"}
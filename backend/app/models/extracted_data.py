@@ -1,10 +1,17 @@
-from sqlalchemy import Column, Integer, String, Numeric, DateTime
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
 class ExtractedEntry(Base):
     __tablename__ = "extracted_entries"
+    __table_args__ = (
+        # Slice replacement and the Face BAR refresh filter on (kode_ba, tahun_anggaran, data_category);
+        # kode_akun and nilai make the index covering for the per-account sums
+        Index("ix_extracted_entries_ba_year_category", "kode_ba", "tahun_anggaran", "data_category", "kode_akun", "nilai"),
+        # Analytics snapshot partitions
+        Index("ix_extracted_entries_year_category", "tahun_anggaran", "data_category"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     upload_id = Column(String, index=True)  # Grouping by upload session/batch
@@ -12,22 +19,71 @@ class ExtractedEntry(Base):
     
     kode_akun = Column(String, index=True)
     uraian_akun = Column(String)  # Denormalized for convenience
+    jenis_aset = Column(String, index=True)  # Asset type derived from kode_akun prefix at ingestion
     
     # Financial Value
     nilai = Column(Numeric, nullable=True)
     
     tahun_anggaran = Column(Integer, nullable=False)
     
-    kode_ba = Column(String, index=True)
+    kode_ba = Column(String)  # Indexed by ix_extracted_entries_ba_year_category
     uraian_ba = Column(String)  # Denormalized for convenience
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+class EntryChangeLog(Base):
+    """
+    Compact change log of incremental saves: per upload, one row for every
+    (category, BA, year) slice with the number of rows inserted, updated, deleted
+    and left unchanged, and the accounts that changed.
+    """
+    __tablename__ = "entry_change_log"
+    __table_args__ = (
+        Index("ix_entry_change_log_ba_year", "kode_ba", "tahun_anggaran"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    upload_id = Column(String, index=True)
+    data_category = Column(String, nullable=False)
+    kode_ba = Column(String, nullable=False)
+    tahun_anggaran = Column(Integer, nullable=False)
+
+    inserted = Column(Integer, nullable=False, default=0)
+    updated = Column(Integer, nullable=False, default=0)
+    deleted = Column(Integer, nullable=False, default=0)
+    unchanged = Column(Integer, nullable=False, default=0)
+    changed_accounts = Column(String)  # Comma-separated, sorted kode_akun of inserted/updated/deleted rows
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class FaceBARSummary(Base):
+    """
+    Materialized Part I totals of the Face BAR per (BA, year, label, category).
+    Refreshed for the affected (BA, year) slices whenever Neraca / Saldo Awal data is saved.
+    """
+    __tablename__ = "face_bar_summary"
+    __table_args__ = (
+        UniqueConstraint("kode_ba", "tahun_anggaran", "face_bar_label", "data_category", name="uq_face_bar_summary_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kode_ba = Column(String, nullable=False)
+    tahun_anggaran = Column(Integer, nullable=False)
+    face_bar_label = Column(String, nullable=False)  # akun_spesifik_face_bar in referensi_face_bar.xlsx
+    data_category = Column(String, nullable=False)  # "Saldo Awal" or "Neraca"
+    nilai = Column(Numeric, default=0.0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
 class BARMetadata(Base):
     __tablename__ = "bar_metadata"
+    __table_args__ = (
+        # One row per BA and year; the natural key for upserts
+        Index("uq_bar_metadata_ba_year", "kode_ba", "tahun_anggaran", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    kode_ba = Column(String, index=True)
+    kode_ba = Column(String)
     tahun_anggaran = Column(Integer, index=True)
     
     nama_petugas = Column(String)
@@ -42,9 +98,13 @@ class BARMetadata(Base):
     
 class BARNonNeraca(Base):
     __tablename__ = "bar_non_neraca"
+    __table_args__ = (
+        # One row per BA, year and Part II label; the natural key for upserts
+        Index("uq_bar_non_neraca_ba_year_label", "kode_ba", "tahun_anggaran", "label", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    kode_ba = Column(String, index=True)
+    kode_ba = Column(String)
     tahun_anggaran = Column(Integer, index=True)
     label = Column(String)
     nilai_awal = Column(Numeric(precision=20, scale=2), default=0.0)
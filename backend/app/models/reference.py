@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, DateTime, Integer, String, ForeignKey
+from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
@@ -33,3 +34,14 @@ class ReferenceStaff(Base):
     nip_kasubdit = Column(String)
 
     organization = relationship("ReferenceOrganization")
+
+class ReferenceVersion(Base):
+    """
+    Content hash of each referensi workbook as last written into the database
+    (reference tables and, for referensi_face_bar.xlsx, face_bar_summary).
+    """
+    __tablename__ = "ref_versions"
+
+    filename = Column(String, primary_key=True)
+    sha256 = Column(String, nullable=False)
+    synced_at = Column(DateTime(timezone=True), server_default=func.now())
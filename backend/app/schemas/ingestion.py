@@ -0,0 +1,62 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class UploadResponse(BaseModel):
+    upload_id: str
+    filename: str
+    size: int
+    sha256: str
+
+
+class JobCreate(BaseModel):
+    upload_id: str
+    category: str  # "Neraca", "Saldo Awal" or "Penyusutan"
+    # More uploads of the same category, saved in one batch with upload_id,
+    # e.g. the intra- and ekstrakomptabel Penyusutan workbooks of a BA
+    extra_upload_ids: List[str] = []
+    persist: bool = True  # False: extract only, nothing is written to the database
+    tahun_anggaran: Optional[int] = None  # Used for records without a parsed year
+
+
+class StageTiming(BaseModel):
+    stage: str  # e.g. "extract.read", "persist.insert"
+    calls: int
+    seconds: float
+    rows: Optional[int] = None
+    bytes: Optional[int] = None
+    share: Optional[float] = None  # Fraction of the job's traced time
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    upload_id: str
+    upload_ids: List[str] = []  # Every upload of the job, upload_id first
+    filename: str
+    category: str
+    persist: bool
+    status: str  # pending, extracting, saving, succeeded, failed
+    record_count: int
+    batch_id: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float
+    finished_at: Optional[float] = None
+    seconds: float
+    timings: List[StageTiming] = []
+
+
+class ExtractedRecord(BaseModel):
+    kode_akun: Optional[str] = None
+    uraian_akun: Optional[str] = None
+    nilai: Optional[float] = None
+    tahun_anggaran: Optional[int] = None
+    kode_ba: Optional[str] = None
+    uraian_ba: Optional[str] = None
+
+
+class JobResults(BaseModel):
+    job_id: str
+    total: int
+    offset: int
+    records: List[ExtractedRecord]
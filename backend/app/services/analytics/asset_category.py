@@ -0,0 +1,25 @@
+from typing import Iterable, List
+
+import pandas as pd
+
+# Account code prefix -> asset type (jenis_aset)
+ASSET_CATEGORY_PREFIXES = {
+    "117": "Persediaan",
+    "131": "Tanah",
+    "132": "Peralatan & Mesin",
+    "133": "Gedung & Bangunan",
+    "134": "Jalan, Irigasi & Jaringan",
+    "135": "Aset Tetap Lainnya",
+    "136": "KDP",
+}
+ASSET_CATEGORY_DEFAULT = "Lainnya"
+ASSET_CATEGORIES = sorted(set(ASSET_CATEGORY_PREFIXES.values()) | {ASSET_CATEGORY_DEFAULT})
+
+
+def classify_asset_categories(kode_akun: Iterable) -> List[str]:
+    """
+    Vectorized jenis_aset lookup: one prefix slice and one dictionary map over the whole batch.
+    """
+    prefixes = pd.Series(list(kode_akun), dtype=object).map(str).str[:3]
+    return prefixes.map(ASSET_CATEGORY_PREFIXES).fillna(ASSET_CATEGORY_DEFAULT).tolist()
+
@@ -0,0 +1,136 @@
+import csv
+import io
+import json
+import math
+from typing import Iterator, List, Sequence
+
+from app.db.session import SessionLocal
+from app.services.analytics.queries import entries_select
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def iter_entry_chunks(chunk_size: int = DEFAULT_CHUNK_SIZE, **filters) -> Iterator[Sequence]:
+    """
+    Yields (columns, rows) for ExtractedEntry rows matching the filters, `chunk_size` rows
+    at a time, from a server-side cursor where the driver supports one (psycopg);
+    SQLite fetches lazily from its cursor as well. Owns its session, so it can outlive
+    the request handler inside a StreamingResponse.
+    """
+    db = SessionLocal()
+    try:
+        stmt = entries_select(**filters).execution_options(stream_results=True, yield_per=chunk_size)
+        result = db.execute(stmt)
+        columns = list(result.keys())
+        for rows in result.partitions(chunk_size):
+            yield columns, rows
+    finally:
+        db.close()
+
+
+def _entry_columns() -> List[str]:
+    return [c.name for c in entries_select().selected_columns]
+
+
+def stream_csv(chunk_size: int = DEFAULT_CHUNK_SIZE, **filters) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # Header goes out before the query runs, so the client sees bytes immediately
+    writer.writerow(_entry_columns())
+    yield buffer.getvalue().encode("utf-8")
+
+    for _, rows in iter_entry_chunks(chunk_size, **filters):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _json_value(value):
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def stream_ndjson(chunk_size: int = DEFAULT_CHUNK_SIZE, **filters) -> Iterator[bytes]:
+    for columns, rows in iter_entry_chunks(chunk_size, **filters):
+        yield "".join(
+            json.dumps(dict(zip(columns, map(_json_value, row))), ensure_ascii=False) + "\n"
+            for row in rows
+        ).encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only file object that hands over what was written since the last drain().
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_parquet(chunk_size: int = DEFAULT_CHUNK_SIZE, **filters) -> Iterator[bytes]:
+    """
+    One Parquet row group per chunk; each row group is sent as soon as it is written.
+    Requires pyarrow (raises ImportError otherwise).
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("upload_id", pa.string()),
+        ("data_category", pa.string()),
+        ("kode_akun", pa.string()),
+        ("uraian_akun", pa.string()),
+        ("nilai", pa.float64()),
+        ("tahun_anggaran", pa.int64()),
+        ("kode_ba", pa.string()),
+        ("uraian_ba", pa.string()),
+        ("created_at", pa.timestamp("us")),
+        ("jenis_aset", pa.string()),
+    ])
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for columns, rows in iter_entry_chunks(chunk_size, **filters):
+            arrays = {name: list(values) for name, values in zip(columns, zip(*rows))}
+            writer.write_table(pa.Table.from_pydict(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    # Footer
+    yield sink.drain()
+
+
+EXPORT_STREAMS = {
+    "csv": stream_csv,
+    "ndjson": stream_ndjson,
+    "parquet": stream_parquet,
+}
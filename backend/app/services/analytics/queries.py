@@ -0,0 +1,132 @@
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+from sqlalchemy import Float, distinct, func, select
+from sqlalchemy.orm import Session
+
+from app.models.extracted_data import ExtractedEntry
+from app.services.analytics.asset_category import ASSET_CATEGORIES
+
+
+def _nilai_sum():
+    return func.coalesce(func.sum(ExtractedEntry.nilai, type_=Float), 0.0)
+
+
+def _group_columns() -> Dict[str, object]:
+    return {
+        "tahun_anggaran": ExtractedEntry.tahun_anggaran,
+        "data_category": ExtractedEntry.data_category,
+        "kode_ba": ExtractedEntry.kode_ba,
+        "uraian_ba": ExtractedEntry.uraian_ba,
+        "kode_akun": ExtractedEntry.kode_akun,
+        "jenis_aset": ExtractedEntry.jenis_aset,
+    }
+
+
+def _apply_filters(
+    stmt,
+    ba_names: Optional[Sequence[str]] = None,
+    ba_codes: Optional[Sequence[str]] = None,
+    years: Optional[Sequence[int]] = None,
+    categories: Optional[Sequence[str]] = None,
+    asset_types: Optional[Sequence[str]] = None,
+):
+    """
+    Adds WHERE clauses for every filter that is not None. An empty list matches nothing,
+    like an empty multiselect does.
+    """
+    if ba_names is not None:
+        stmt = stmt.where(ExtractedEntry.uraian_ba.in_(list(ba_names)))
+    if ba_codes is not None:
+        stmt = stmt.where(ExtractedEntry.kode_ba.in_(list(ba_codes)))
+    if years is not None:
+        stmt = stmt.where(ExtractedEntry.tahun_anggaran.in_(list(years)))
+    if categories is not None:
+        stmt = stmt.where(ExtractedEntry.data_category.in_(list(categories)))
+    if asset_types is not None:
+        stmt = stmt.where(ExtractedEntry.jenis_aset.in_(list(asset_types)))
+    return stmt
+
+
+def get_filter_options(db: Session) -> dict:
+    """
+    Distinct values for the dashboard filters, each sorted.
+    """
+    def distinct_values(column):
+        return [v for (v,) in db.execute(select(distinct(column)).where(column.isnot(None)).order_by(column)).all()]
+
+    return {
+        "uraian_ba": distinct_values(ExtractedEntry.uraian_ba),
+        "tahun_anggaran": distinct_values(ExtractedEntry.tahun_anggaran),
+        "data_category": distinct_values(ExtractedEntry.data_category),
+        "jenis_aset": ASSET_CATEGORIES,
+    }
+
+
+def get_ba_codes(db: Session) -> Dict[str, str]:
+    """
+    Maps uraian_ba -> kode_ba (first code seen for each name).
+    """
+    rows = db.execute(
+        select(ExtractedEntry.uraian_ba, func.min(ExtractedEntry.kode_ba))
+        .where(ExtractedEntry.uraian_ba.isnot(None))
+        .group_by(ExtractedEntry.uraian_ba)
+        .order_by(ExtractedEntry.uraian_ba)
+    ).all()
+    return {name: code for name, code in rows}
+
+
+def summarize_entries(db: Session, **filters) -> dict:
+    """
+    Total value, number of distinct organizations and number of records matching the filters.
+    """
+    stmt = select(
+        _nilai_sum(),
+        func.count(distinct(ExtractedEntry.uraian_ba)),
+        func.count(ExtractedEntry.id),
+    ).select_from(ExtractedEntry)
+    total, ba_count, records = db.execute(_apply_filters(stmt, **filters)).one()
+    return {"total_nilai": float(total), "ba_count": ba_count, "records": records}
+
+
+def aggregate_entries(db: Session, group_by: List[str], **filters) -> pd.DataFrame:
+    """
+    SUM(nilai) grouped in SQL by any of: tahun_anggaran, data_category, kode_ba,
+    uraian_ba, kode_akun, jenis_aset. Returns one row per group with a 'nilai' column.
+    """
+    columns = _group_columns()
+    keys = [columns[name].label(name) for name in group_by]
+    stmt = select(*keys, _nilai_sum().label("nilai")).select_from(ExtractedEntry)
+    stmt = _apply_filters(stmt, **filters).group_by(*keys).order_by(*keys)
+    return pd.DataFrame(db.execute(stmt).all(), columns=group_by + ["nilai"])
+
+
+def entries_select(**filters):
+    """
+    SELECT of individual ExtractedEntry rows (nilai as float, NULL as 0) matching the filters, ordered by id.
+    """
+    stmt = select(
+        ExtractedEntry.id,
+        ExtractedEntry.upload_id,
+        ExtractedEntry.data_category,
+        ExtractedEntry.kode_akun,
+        ExtractedEntry.uraian_akun,
+        func.coalesce(ExtractedEntry.nilai.cast(Float), 0.0).label("nilai"),
+        ExtractedEntry.tahun_anggaran,
+        ExtractedEntry.kode_ba,
+        ExtractedEntry.uraian_ba,
+        ExtractedEntry.created_at,
+        ExtractedEntry.jenis_aset,
+    )
+    return _apply_filters(stmt, **filters).order_by(ExtractedEntry.id)
+
+
+def load_entries(db: Session, limit: Optional[int] = None, **filters) -> pd.DataFrame:
+    """
+    Individual rows matching the filters, with jenis_aset, for detail tables.
+    """
+    stmt = entries_select(**filters)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    result = db.execute(stmt)
+    return pd.DataFrame(result.all(), columns=list(result.keys()))
@@ -0,0 +1,291 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import warnings
+from typing import Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+import pandas as pd
+from sqlalchemy import Float, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.instrumentation import span
+from app.models.extracted_data import ExtractedEntry
+from app.services.analytics.asset_category import ASSET_CATEGORIES
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+    import pyarrow.parquet as pq
+except ImportError:
+    # pyarrow is optional; without it analytics read from SQL
+    pa = None
+
+MANIFEST_FILE = "_manifest.json"
+PARTITION_FILE = "part-0.parquet"
+# Directory name of a NULL partition key; pyarrow's hive partitioning reads it back as null
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+# Partition keys, as hive directories: tahun_anggaran=2023/data_category=Saldo%20Awal/
+DATA_COLUMNS = ("id", "upload_id", "kode_akun", "uraian_akun", "nilai", "kode_ba", "uraian_ba", "created_at", "jenis_aset")
+
+Partition = Tuple[Optional[int], Optional[str]]
+
+
+def snapshots_available() -> bool:
+    return pa is not None
+
+
+def _partitioning():
+    return ds.partitioning(pa.schema([("tahun_anggaran", pa.int64()), ("data_category", pa.string())]), flavor="hive")
+
+
+def _schema():
+    return pa.schema([
+        ("id", pa.int64()),
+        ("upload_id", pa.string()),
+        ("kode_akun", pa.string()),
+        ("uraian_akun", pa.string()),
+        ("nilai", pa.float64()),
+        ("kode_ba", pa.string()),
+        ("uraian_ba", pa.string()),
+        ("created_at", pa.timestamp("us")),
+        ("jenis_aset", pa.string()),
+    ])
+
+
+def _partition_key(value) -> str:
+    return NULL_PARTITION if value is None else quote(str(value), safe="")
+
+
+def _partition_condition(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def _filter_expression(
+    ba_names: Optional[Sequence[str]] = None,
+    ba_codes: Optional[Sequence[str]] = None,
+    years: Optional[Sequence[int]] = None,
+    categories: Optional[Sequence[str]] = None,
+    asset_types: Optional[Sequence[str]] = None,
+):
+    """
+    Same semantics as queries._apply_filters: None means no filter, an empty list matches nothing.
+    Year and category filters prune whole partitions before any file is opened.
+    """
+    conditions = [
+        ds.field(column).isin(list(values))
+        for column, values in (
+            ("uraian_ba", ba_names),
+            ("kode_ba", ba_codes),
+            ("tahun_anggaran", years),
+            ("data_category", categories),
+            ("jenis_aset", asset_types),
+        )
+        if values is not None
+    ]
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+class SnapshotStore:
+    """
+    Columnar copy of extracted_entries as Parquet, one file per (tahun_anggaran, data_category)
+    partition, for the analytics pages. Reads are memory-mapped and only touch the
+    requested columns and the partitions selected by the year/category filters.
+
+    The database stays the source of truth: partitions are rewritten from it after each
+    ingestion commit. While the manifest is missing (never built, or a refresh failed)
+    is_ready() is False and callers read from SQL instead.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def _partition_dir(self, partition: Partition) -> str:
+        year, category = partition
+        return os.path.join(
+            self.directory, f"tahun_anggaran={_partition_key(year)}", f"data_category={_partition_key(category)}"
+        )
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.directory, MANIFEST_FILE)
+
+    def is_ready(self) -> bool:
+        return snapshots_available() and os.path.exists(self._manifest_path())
+
+    def invalidate(self):
+        if os.path.exists(self._manifest_path()):
+            os.remove(self._manifest_path())
+
+    # --- Writing -------------------------------------------------------------
+
+    def _write_partition(self, db: Session, partition: Partition):
+        year, category = partition
+        rows = db.execute(
+            select(
+                ExtractedEntry.id,
+                ExtractedEntry.upload_id,
+                ExtractedEntry.kode_akun,
+                ExtractedEntry.uraian_akun,
+                ExtractedEntry.nilai.cast(Float),
+                ExtractedEntry.kode_ba,
+                ExtractedEntry.uraian_ba,
+                ExtractedEntry.created_at,
+                ExtractedEntry.jenis_aset,
+            )
+            .where(
+                _partition_condition(ExtractedEntry.tahun_anggaran, year),
+                _partition_condition(ExtractedEntry.data_category, category),
+            )
+            .order_by(ExtractedEntry.id)
+        ).all()
+
+        directory = self._partition_dir(partition)
+        target = os.path.join(directory, PARTITION_FILE)
+        if not rows:
+            shutil.rmtree(directory, ignore_errors=True)
+            return
+
+        table = pa.Table.from_pydict(
+            {name: list(values) for name, values in zip(DATA_COLUMNS, zip(*rows))},
+            schema=_schema()
+        )
+        os.makedirs(directory, exist_ok=True)
+        # Write next to the target and swap it in, so readers never see a partial file;
+        # the dot prefix keeps the temporary file out of dataset scans (see _read)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+        os.close(fd)
+        try:
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, target)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _write_manifest(self, db: Session):
+        partitions = db.execute(
+            select(ExtractedEntry.tahun_anggaran, ExtractedEntry.data_category).distinct()
+        ).all()
+        # Rows ingested before data_category existed have a NULL key; sort those first
+        partitions = sorted((list(p) for p in partitions), key=lambda p: [(v is not None, v) for v in p])
+        manifest = {"built_at": time.time(), "partitions": partitions}
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".", suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self._manifest_path())
+
+    def refresh(self, db: Session, partitions: Optional[Iterable[Partition]] = None):
+        """
+        Rewrites the given (tahun_anggaran, data_category) partitions from the database,
+        or every partition when None (or when the store is not ready yet, since the other
+        partitions would be missing). A failed refresh leaves the store not ready.
+        """
+        if not snapshots_available():
+            return
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            try:
+                if partitions is None or not self.is_ready():
+                    # Full rebuild: drop partitions that no longer exist in the database too
+                    self.invalidate()
+                    for entry in os.scandir(self.directory):
+                        if entry.is_dir():
+                            shutil.rmtree(entry.path)
+                    partitions = [
+                        tuple(p) for p in db.execute(
+                            select(ExtractedEntry.tahun_anggaran, ExtractedEntry.data_category).distinct()
+                        ).all()
+                    ]
+                for partition in set(partitions):
+                    self._write_partition(db, partition)
+                self._write_manifest(db)
+            except Exception:
+                self.invalidate()
+                raise
+
+    # --- Reading -------------------------------------------------------------
+
+    def _read(self, columns: List[str], **filters):
+        dataset = ds.dataset(
+            self.directory,
+            # Explicit schema so an empty store still reads as zero rows
+            schema=pa.unify_schemas([_schema(), _partitioning().schema]),
+            format="parquet",
+            partitioning=_partitioning(),
+            filesystem=pafs.LocalFileSystem(use_mmap=True),
+            ignore_prefixes=[".", "_"],
+        )
+        return dataset.to_table(columns=columns, filter=_filter_expression(**filters))
+
+    def get_filter_options(self) -> dict:
+        table = self._read(["uraian_ba", "tahun_anggaran", "data_category"])
+
+        def distinct_values(name):
+            return sorted(v for v in pc.unique(table[name]).to_pylist() if v is not None)
+
+        return {
+            "uraian_ba": distinct_values("uraian_ba"),
+            "tahun_anggaran": distinct_values("tahun_anggaran"),
+            "data_category": distinct_values("data_category"),
+            "jenis_aset": ASSET_CATEGORIES,
+        }
+
+    def summarize_entries(self, **filters) -> dict:
+        table = self._read(["nilai", "uraian_ba"], **filters)
+        total = pc.sum(table["nilai"]).as_py() if table.num_rows else None
+        ba_count = pc.count_distinct(table["uraian_ba"], mode="only_valid").as_py() if table.num_rows else 0
+        return {"total_nilai": float(total or 0.0), "ba_count": ba_count, "records": table.num_rows}
+
+    def aggregate_entries(self, group_by: List[str], **filters) -> pd.DataFrame:
+        table = self._read(list(group_by) + ["nilai"], **filters)
+        grouped = table.group_by(list(group_by)).aggregate([("nilai", "sum")])
+        df = grouped.to_pandas().rename(columns={"nilai_sum": "nilai"})
+        df["nilai"] = df["nilai"].fillna(0.0).astype(float)
+        df = df.sort_values(list(group_by), na_position="first", ignore_index=True)
+        return df[list(group_by) + ["nilai"]]
+
+    def load_entries(self, limit: Optional[int] = None, **filters) -> pd.DataFrame:
+        columns = ["id", "upload_id", "data_category", "kode_akun", "uraian_akun", "nilai",
+                   "tahun_anggaran", "kode_ba", "uraian_ba", "created_at", "jenis_aset"]
+        table = self._read(columns, **filters)
+        table = table.sort_by("id")
+        if limit is not None:
+            table = table.slice(0, limit)
+        df = table.to_pandas()
+        df["nilai"] = df["nilai"].fillna(0.0)
+        return df
+
+
+_default_store = None
+
+
+def get_snapshot_store() -> SnapshotStore:
+    global _default_store
+    if _default_store is None:
+        _default_store = SnapshotStore(settings.SNAPSHOT_DIR)
+    return _default_store
+
+
+def refresh_snapshot(db: Session, partitions: Optional[Iterable[Partition]] = None):
+    """
+    Refreshes the default store after an ingestion commit. The snapshot is derived data,
+    so a failure is reported as a warning (the store falls back to SQL) instead of failing the ingestion.
+    """
+    if not snapshots_available():
+        return
+    try:
+        with span("snapshot.refresh"):
+            get_snapshot_store().refresh(db, partitions)
+    except Exception as e:
+        warnings.warn(f"Analytics snapshot refresh failed, falling back to SQL: {e}")
@@ -1,16 +1,45 @@
-from abc import ABC, abstractmethod
+from abc import ABC
+import numpy as np
 import pandas as pd
-import re
-from typing import BinaryIO, List
+import io
+import os
+from typing import BinaryIO, Iterator, List, Optional
+from openpyxl import load_workbook
+from app.core.instrumentation import span, timed
+from app.services.extraction.header import HEADER_WINDOW, HeaderInfo, convert_cell, parse_header
+from app.services.extraction.layouts import ReportLayout, detect_layout, layouts_for
 from app.models.extracted_data import ExtractedEntry
 
+PARSER_PANDAS = "pandas"
+PARSER_STREAMING = "streaming"
+
 class BaseExtractor(ABC):
     """
     Abstract Base Class for all Excel Extractors.
     Each data category (Neraca, Laporan Barang, etc.) will have its own implementation.
+    Column positions are not set here but in the category's layouts (see layouts.LAYOUTS),
+    one of which is picked per workbook from its header.
     """
 
-    @abstractmethod
+    # Bump when extraction output changes, so cached results are invalidated
+    version: str = "2"
+
+    # Data category, selects the candidate layouts
+    category: str = ""
+
+    # Rows holding the report header and the first data row, then rows per vectorized chunk
+    header_window: int = HEADER_WINDOW
+    chunk_size: int = 1000
+
+    def __init__(self, parser: str = PARSER_PANDAS):
+        """
+        :param parser: "pandas" materializes the sheet with pd.read_excel;
+                       "streaming" iterates it with openpyxl in read-only mode.
+        """
+        if parser not in (PARSER_PANDAS, PARSER_STREAMING):
+            raise ValueError(f"Unknown parser: {parser}")
+        self.parser = parser
+
     def extract(self, file_content: BinaryIO, filename: str) -> List[dict]:
         """
         Parses the Excel file and returns a list of dictionaries 
@@ -20,7 +49,118 @@ class BaseExtractor(ABC):
         :param filename: The name of the file (useful for metadata).
         :return: List of dicts ready to be inserted into DB.
         """
-        pass
+        if self.parser == PARSER_STREAMING:
+            return list(self.iter_records(file_content))
+
+        # No header row: the header window is parsed for metadata, layout and data start
+        df = self.read_sheet(file_content)
+        rows = df.iloc[:self.header_window].values.tolist()
+        header = self.parse_header_rows(rows)
+        return self.extract_records(df, header.as_metadata(), self.detect_layout(rows), header.data_start_row)
+
+    def read_sheet(self, file_content: BinaryIO) -> pd.DataFrame:
+        """
+        pd.read_excel(header=None) of the first sheet, timed as the "extract.read" stage.
+        """
+        with span("extract.read", bytes=_content_size(file_content)) as record:
+            df = pd.read_excel(file_content, header=None)
+            record.rows = len(df)
+        return df
+
+    def detect_layout(self, rows: List[list]) -> ReportLayout:
+        """
+        The layout of this category matching the header window, or the category's default.
+        """
+        return detect_layout(rows[:self.header_window], self.category) or layouts_for(self.category)[0]
+
+    @timed("extract.records", rows=len)
+    def extract_records(
+        self, df: pd.DataFrame, metadata: dict, layout: ReportLayout, start_row: Optional[int] = None
+    ) -> List[dict]:
+        """
+        Vectorized row selection shared by all extractors.
+        Gathers the layout's code, description and value columns in one step, keeps rows
+        whose code is a numeric account code and whose value parses as a number, then emits
+        them in bulk as dicts matching the ExtractedEntry model.
+        Rows above `start_row` (the detected first data row) are the report header and skipped.
+        """
+        columns = [layout.code_col, layout.desc_col, layout.value_col]
+        if df.empty or any(c not in df.columns for c in columns):
+            return []
+
+        # Plain NumPy arrays: sheets are small, so per-call pandas overhead would dominate
+        codes, descs, raw_values = df[columns].to_numpy(dtype=object)[start_row or 0:].T
+        code_str = np.char.strip(codes.astype(str))
+        mask = ~pd.isna(codes) & np.char.isdigit(code_str)
+
+        values = np.asarray(pd.to_numeric(raw_values, errors="coerce"), dtype=float)
+
+        # Unparseable values are always dropped; empty cells only when a value is required
+        if layout.require_value:
+            mask &= ~np.isnan(values)
+        else:
+            mask &= ~np.isnan(values) | pd.isna(raw_values)
+
+        descs = np.char.strip(descs[mask].astype(str))
+
+        tahun_anggaran = metadata["tahun_anggaran"]
+        kode_ba = metadata["kode_ba"]
+        uraian_ba = metadata["uraian_ba"]
+        return [
+            {
+                "kode_akun": code,
+                "uraian_akun": desc,
+                "nilai": value,
+                "tahun_anggaran": tahun_anggaran,
+                "kode_ba": kode_ba,
+                "uraian_ba": uraian_ba
+            }
+            for code, desc, value in zip(code_str[mask].tolist(), descs.tolist(), values[mask].tolist())
+        ]
+
+    def iter_records(self, file_content: BinaryIO) -> Iterator[dict]:
+        """
+        Streaming alternative to pd.read_excel + extract_records.
+        Iterates the first sheet with openpyxl read_only/values_only, parses metadata and
+        layout from the header window, and runs only the layout's columns through extract_records in
+        fixed-size chunks, so peak memory does not grow with the workbook.
+        """
+        if isinstance(file_content, (bytes, bytearray)):
+            file_content = io.BytesIO(file_content)
+
+        # Cells are read lazily below, so this span covers opening the workbook only
+        with span("extract.read", bytes=_content_size(file_content)):
+            wb = load_workbook(file_content, read_only=True, data_only=True, keep_links=False)
+        try:
+            ws = wb.worksheets[0]
+            # Exported reports often declare a bogus dimension (A1), which would truncate every row
+            ws.reset_dimensions()
+            rows = ws.iter_rows(values_only=True)
+
+            header = []
+            for row in rows:
+                header.append([convert_cell(v) for v in row])
+                if len(header) >= self.header_window:
+                    break
+
+            info = self.parse_header_rows(header)
+            metadata = info.as_metadata()
+            layout = self.detect_layout(header)
+            columns = [layout.code_col, layout.desc_col, layout.value_col]
+
+            def project(row):
+                return [convert_cell(row[c]) if c < len(row) else np.nan for c in columns]
+
+            chunk = [project(r) for r in header[info.data_start_row or 0:]]
+            for row in rows:
+                chunk.append(project(row))
+                if len(chunk) >= self.chunk_size:
+                    yield from self.extract_records(pd.DataFrame(chunk, columns=columns, dtype=object), metadata, layout)
+                    chunk = []
+            if chunk:
+                yield from self.extract_records(pd.DataFrame(chunk, columns=columns, dtype=object), metadata, layout)
+        finally:
+            wb.close()
 
     def validate_columns(self, df: pd.DataFrame, required_columns: List[str]) -> bool:
         """
@@ -31,67 +171,40 @@ class BaseExtractor(ABC):
             raise ValueError(f"Missing required columns: {', '.join(missing)}")
         return True
 
+    @timed("extract.parse_metadata")
+    def parse_header_rows(self, rows: List[list]) -> HeaderInfo:
+        """
+        BA, year and first data row from the header window (see header.parse_header).
+        """
+        return parse_header(rows[:self.header_window])
+
+    def parse_header_frame(self, df: pd.DataFrame) -> HeaderInfo:
+        """
+        parse_header_rows on the top of a sheet read with header=None.
+        """
+        return self.parse_header_rows(df.iloc[:self.header_window].values.tolist())
+
     def parse_metadata(self, df: pd.DataFrame) -> dict:
         """
-        Parses the header rows (first 10) to find metadata like UAPB/UAKPB and TAHUN ANGGARAN.
+        Parses the header window to find metadata like UAPB/UAKPB and TAHUN ANGGARAN.
         Returns a dict with 'kode_ba', 'uraian_ba', and 'tahun_anggaran'.
         """
-        metadata = {
-            "kode_ba": "000", 
-            "uraian_ba": "Unknown",
-            "tahun_anggaran": 2023  # Default fallback
-        }
-        
-        # Look at first 10 rows
-        for idx in range(min(10, len(df))):
-            row_values = [str(val).strip() for val in df.iloc[idx].values if pd.notna(val)]
-            row_str = " ".join(row_values)
-            
-            # 1. Search for TAHUN ANGGARAN
-            if "TAHUN ANGGARAN" in row_str:
-                # Look for a 4-digit year in this row
-                for part in row_values:
-                    # Case 1: Part is exactly the 4-digit year
-                    clean_part = part.replace(":", "").replace("-", "").strip()
-                    if clean_part.isdigit() and len(clean_part) == 4:
-                        metadata["tahun_anggaran"] = int(clean_part)
-                        break
-                    
-                    # Case 2: Year is inside a string like "TAHUN ANGGARAN 2024"
-                    if "TAHUN ANGGARAN" in part:
-                        # Find all digit sequences
-                        years = re.findall(r'\b(20\d{2})\b', part)
-                        if years:
-                            metadata["tahun_anggaran"] = int(years[0])
-                            break
-            
-            # 2. Search for UAPB or UAKPB marker
-            if "UAPB" in row_str or "UAKPB" in row_str:
-                parts = row_values
-                marker_in_row = False
-                for i, part in enumerate(parts):
-                    if "UAPB" in part or "UAKPB" in part:
-                        marker_in_row = True
-                        
-                    if marker_in_row:
-                        sanitized = part.replace(":", " ").replace("UAPB", "").replace("UAKPB", "").strip()
-                        sub_parts = sanitized.split()
-                        
-                        for sub in sub_parts:
-                            clean_sub = sub.replace(".0", "") if sub.endswith(".0") else sub
-                            if clean_sub.isdigit() and metadata["kode_ba"] == "000": 
-                                 if len(clean_sub) < 3:
-                                     metadata["kode_ba"] = clean_sub.zfill(3)
-                                 else:
-                                     metadata["kode_ba"] = clean_sub
-                
-                # Refined pass for description
-                if metadata["kode_ba"] != "000" and metadata["uraian_ba"] == "Unknown":
-                    full_row_str = " ".join(parts)
-                    if metadata["kode_ba"] in full_row_str:
-                        _, remainder = full_row_str.split(metadata["kode_ba"], 1)
-                        candidate_desc = remainder.strip().replace(":", "").strip()
-                        if len(candidate_desc) > 2:
-                             metadata["uraian_ba"] = candidate_desc
-                
-        return metadata
+        return self.parse_header_frame(df).as_metadata()
+
+
+def _content_size(file_content) -> Optional[int]:
+    # Bytes of a path, buffer or seekable file object; None when it cannot be told
+    if isinstance(file_content, (bytes, bytearray)):
+        return len(file_content)
+    if isinstance(file_content, (str, os.PathLike)):
+        try:
+            return os.path.getsize(file_content)
+        except OSError:
+            return None
+    try:
+        position = file_content.tell()
+        size = file_content.seek(0, io.SEEK_END)
+        file_content.seek(position)
+        return size
+    except (AttributeError, OSError, ValueError):
+        return None
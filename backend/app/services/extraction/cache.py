@@ -0,0 +1,146 @@
+import hashlib
+import io
+import os
+import pickle
+import tempfile
+from typing import BinaryIO, List, Optional, Union
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.instrumentation import span
+from app.services.extraction.base import BaseExtractor
+
+CACHE_SUFFIX = ".pkl"
+
+
+def read_bytes(file_content: Union[bytes, str, BinaryIO]) -> bytes:
+    """
+    Returns the full contents of an upload (Streamlit UploadedFile / BytesIO), file path or bytes.
+    """
+    if isinstance(file_content, (bytes, bytearray)):
+        return bytes(file_content)
+    if isinstance(file_content, (str, os.PathLike)):
+        with open(file_content, "rb") as f:
+            return f.read()
+    if hasattr(file_content, "getvalue"):
+        return file_content.getvalue()
+    file_content.seek(0)
+    return file_content.read()
+
+
+def cache_key(data: bytes, extractor: BaseExtractor) -> str:
+    """
+    SHA-256 of the file bytes plus the extractor class and version, so changing
+    an extractor's logic (and bumping its version) invalidates old entries.
+    """
+    digest = hashlib.sha256(data)
+    digest.update(f"|{type(extractor).__name__}|{extractor.version}".encode())
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    On-disk cache of extracted records keyed by content hash.
+    Records are stored column-wise (values as a float64 array) and pickled, one file per key.
+    Least recently used entries (by file mtime, refreshed on hit) are evicted once
+    the directory grows beyond max_bytes.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    def get(self, key: str) -> Optional[List[dict]]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                payload = pickle.load(f)
+            os.utime(path)  # Mark as recently used
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+        fields = payload["fields"]
+        columns = [payload["columns"][name] for name in fields]
+        if "nilai" in payload["columns"]:
+            columns[fields.index("nilai")] = payload["columns"]["nilai"].tolist()
+        return [dict(zip(fields, row)) for row in zip(*columns)]
+
+    def put(self, key: str, records: List[dict]):
+        fields = list(records[0].keys()) if records else []
+        columns = {name: [r[name] for r in records] for name in fields}
+        if "nilai" in columns:
+            columns["nilai"] = np.asarray(columns["nilai"], dtype=float)
+
+        # Write to a temp file first so concurrent readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump({"fields": fields, "columns": columns}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(CACHE_SUFFIX):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(CACHE_SUFFIX):
+                os.remove(entry.path)
+
+
+_default_cache = None
+
+
+def get_extraction_cache() -> ExtractionCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ExtractionCache(settings.EXTRACTION_CACHE_DIR, settings.EXTRACTION_CACHE_MAX_BYTES)
+    return _default_cache
+
+
+def extract_cached(
+    extractor: BaseExtractor,
+    file_content: Union[bytes, str, BinaryIO],
+    filename: str,
+    cache: Optional[ExtractionCache] = None,
+) -> List[dict]:
+    """
+    extractor.extract() with a content-hash cache in front of it.
+    Re-uploading an unchanged workbook returns the stored records without parsing.
+    """
+    cache = cache or get_extraction_cache()
+    data = read_bytes(file_content)
+    key = cache_key(data, extractor)
+
+    with span("extract.cache_lookup", bytes=len(data)):
+        records = cache.get(key)
+    if records is None:
+        records = extractor.extract(io.BytesIO(data), filename)
+        cache.put(key, records)
+    return records
@@ -1,16 +1,16 @@
-from app.services.extraction.base import BaseExtractor
+from app.services.extraction.base import BaseExtractor, PARSER_PANDAS
 from app.services.extraction.neraca import NeracaExtractor
 from app.services.extraction.saldo_awal import SaldoAwalExtractor
 from app.services.extraction.penyusutan import PenyusutanExtractor
 
 class ExtractorFactory:
     @staticmethod
-    def get_extractor(category: str) -> BaseExtractor:
+    def get_extractor(category: str, parser: str = PARSER_PANDAS) -> BaseExtractor:
         if category == "Neraca":
-            return NeracaExtractor()
+            return NeracaExtractor(parser=parser)
         elif category == "Saldo Awal":
-            return SaldoAwalExtractor()
+            return SaldoAwalExtractor(parser=parser)
         elif category == "Penyusutan":
-            return PenyusutanExtractor()
+            return PenyusutanExtractor(parser=parser)
         else:
             raise ValueError(f"Unknown category: {category}")
@@ -0,0 +1,163 @@
+import io
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import BinaryIO, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.cell.cell import ERROR_CODES
+
+from app.core.instrumentation import span
+
+# Rows read from the top of a sheet to find the report header and the first data row.
+# The Penyusutan ekstrakomptabel reports have the most header rows (13).
+HEADER_WINDOW = 16
+
+# Used when the header does not state the value, as before. The year default is applied
+# when records are stored (see resolve_year), so a caller-supplied year can take precedence.
+DEFAULT_KODE_BA = "000"
+DEFAULT_URAIAN_BA = "Unknown"
+DEFAULT_TAHUN_ANGGARAN = 2023
+
+# "TAHUN ANGGARAN  2023", "TAHUN ANGGARAN : 2024"
+YEAR_PATTERN = re.compile(r"TAHUN\s+ANGGARAN[\s:\-]*(\d{4})\b")
+# Penyusutan reports have no TAHUN ANGGARAN line: "UNTUK PERIODE YANG BERAKHIR 31 DESEMBER 2023 - UNAUDITED"
+PERIOD_YEAR_PATTERN = re.compile(r"\bPERIODE\b.*?\b(20\d{2})\b")
+# "UAPB :  001 MAJELIS PERMUSYAWARATAN RAKYAT", "UAKPB : 1.0 ..."
+BA_PATTERN = re.compile(r"\bUAK?PB\b[\s:]*(\d+)(?:\.0)?\b[\s:]*(.*)")
+# An account code cell: digits only ("117111", "20101"); the "1", "2", ... column numbering rows are shorter
+ACCOUNT_CODE_PATTERN = re.compile(r"\d{3,}")
+
+
+@dataclass
+class HeaderInfo:
+    """
+    What the header window of a report says. Fields are None when the header does not state them.
+    """
+    kode_ba: Optional[str] = None
+    uraian_ba: Optional[str] = None
+    tahun_anggaran: Optional[int] = None
+    # First row holding an account code, and the column it is in
+    data_start_row: Optional[int] = None
+    code_col: Optional[int] = None
+    # Latest timestamp printed in the header ("Tanggal"), i.e. when the report was exported
+    exported_at: Optional[datetime] = None
+
+    def as_metadata(self) -> dict:
+        """
+        The metadata dict extractors attach to every record, with the historical BA defaults.
+        tahun_anggaran stays None when the header does not state it (see resolve_year).
+        """
+        return {
+            "kode_ba": self.kode_ba or DEFAULT_KODE_BA,
+            "uraian_ba": self.uraian_ba or DEFAULT_URAIAN_BA,
+            "tahun_anggaran": self.tahun_anggaran,
+        }
+
+
+def resolve_year(tahun_anggaran: Optional[int], default_year: Optional[int] = None) -> int:
+    """
+    The year a record is stored under: the one its header states, else `default_year`
+    (e.g. the fiscal year picked on upload), else DEFAULT_TAHUN_ANGGARAN.
+    """
+    return tahun_anggaran or default_year or DEFAULT_TAHUN_ANGGARAN
+
+
+def _cell_text(value) -> Optional[str]:
+    if value is None or (isinstance(value, float) and np.isnan(value)) or value is pd.NaT:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def find_data_start(rows: Sequence[Sequence]) -> tuple:
+    """
+    (row, column) of the first account code that is followed by a description cell
+    in the same row, or (None, None) when the window holds no data row.
+    """
+    for r, row in enumerate(rows):
+        texts = [_cell_text(v) for v in row]
+        for c, text in enumerate(texts):
+            if text is None or not ACCOUNT_CODE_PATTERN.fullmatch(text):
+                continue
+            if any(t is not None and not t.lstrip("-").replace(".", "", 1).isdigit() for t in texts[c + 1:]):
+                return r, c
+    return None, None
+
+
+def parse_header(rows: Sequence[Sequence]) -> HeaderInfo:
+    """
+    Parses the header window (a list of row value lists, as read with header=None).
+    Each row is joined once and matched against the precompiled patterns; the first
+    match of each field wins.
+    """
+    info = HeaderInfo()
+    period_year = None
+    for row in rows:
+        for value in row:
+            if isinstance(value, datetime) and value is not pd.NaT and (info.exported_at is None or value > info.exported_at):
+                info.exported_at = value
+        line = " ".join(t for t in map(_cell_text, row) if t is not None)
+        if not line:
+            continue
+        if info.tahun_anggaran is None:
+            match = YEAR_PATTERN.search(line)
+            if match:
+                info.tahun_anggaran = int(match.group(1))
+            elif period_year is None:
+                match = PERIOD_YEAR_PATTERN.search(line)
+                if match:
+                    period_year = int(match.group(1))
+        if info.kode_ba is None:
+            match = BA_PATTERN.search(line)
+            if match:
+                info.kode_ba = match.group(1).zfill(3)
+                name = match.group(2).replace(":", "").strip()
+                if len(name) > 2:
+                    info.uraian_ba = name
+    if info.tahun_anggaran is None:
+        info.tahun_anggaran = period_year
+
+    info.data_start_row, info.code_col = find_data_start(rows)
+    return info
+
+
+def read_header_rows(file_content: Union[str, bytes, BinaryIO], window: int = HEADER_WINDOW) -> List[list]:
+    """
+    The first `window` rows of the first sheet, read in openpyxl read-only mode so the
+    body of the workbook is never loaded. Cells are converted like pd.read_excel does.
+    """
+    if isinstance(file_content, (bytes, bytearray)):
+        file_content = io.BytesIO(file_content)
+    wb = load_workbook(file_content, read_only=True, data_only=True, keep_links=False)
+    try:
+        ws = wb.worksheets[0]
+        # Exported reports often declare a bogus dimension (A1), which would truncate every row
+        ws.reset_dimensions()
+        rows = []
+        for row in ws.iter_rows(values_only=True, max_row=window):
+            rows.append([convert_cell(v) for v in row])
+        return rows
+    finally:
+        wb.close()
+
+
+def read_header(file_content: Union[str, bytes, BinaryIO], window: int = HEADER_WINDOW) -> HeaderInfo:
+    """
+    BA, year and data start of a workbook from its header window alone, e.g. to group
+    or filter files before paying for full extraction.
+    """
+    with span("extract.header"):
+        return parse_header(read_header_rows(file_content, window))
+
+
+def convert_cell(value):
+    # Mirrors pandas' openpyxl reader: empty/error cells become NaN, whole floats become int
+    if value is None or value == "" or (isinstance(value, str) and value in ERROR_CODES):
+        return np.nan
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
@@ -0,0 +1,89 @@
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class ReportLayout:
+    """
+    Where the account code, description and value of one report type are (column
+    positions as read with header=None), and how to recognise the report from its header.
+    """
+    name: str
+    category: str
+    code_col: int
+    desc_col: int
+    value_col: int
+    # Column header cells that must all be present, e.g. ((1, "KODE"), (5, "URAIAN"))
+    signature: Tuple[Tuple[int, str], ...]
+    # "Kode Lap" values printed in the header; a match on one of these wins over the signature
+    report_codes: Tuple[str, ...] = ()
+    # When False, rows with an empty value cell are kept (nilai = NaN)
+    require_value: bool = True
+
+    def matches(self, cells: set) -> bool:
+        return all(cell in cells for cell in self.signature)
+
+
+# The first layout of each category is its default, used when no header matches.
+# The 2024 exports ("..._poc" report codes) keep the 2023 column positions.
+LAYOUTS: List[ReportLayout] = [
+    ReportLayout(
+        name="neraca_face",
+        category="Neraca",
+        code_col=1, desc_col=5, value_col=8,
+        signature=((1, "KODE"), (5, "URAIAN"), (8, "JUMLAH")),
+        report_codes=("lap_bmn_neraca_face_kl", "lap_bmn_neraca_face_kl_poc"),
+    ),
+    ReportLayout(
+        name="neraca_saldo_awal",
+        category="Saldo Awal",
+        code_col=0, desc_col=4, value_col=7,
+        signature=((0, "KODE"), (4, "URAIAN"), (7, "JUMLAH")),
+        report_codes=("lap_bmn_neraca_sawal_kl", "lap_bmn_neraca_sawal_kl_poc"),
+    ),
+    # Penyusutan values are "NILAI BUKU" (9=4-8), the last column; ekstrakomptabel
+    # reports have three more (merged) columns before it than intrakomptabel ones
+    ReportLayout(
+        name="penyusutan_intrakomptabel",
+        category="Penyusutan",
+        code_col=0, desc_col=2, value_col=18,
+        signature=((0, "KODE"), (2, "URAIAN"), (18, "NILAI BUKU")),
+        report_codes=("lap_bmn_susut_intra_kel_kl",),
+        require_value=False,
+    ),
+    ReportLayout(
+        name="penyusutan_ekstrakomptabel",
+        category="Penyusutan",
+        code_col=0, desc_col=2, value_col=21,
+        signature=((0, "KODE"), (2, "URAIAN"), (21, "NILAI BUKU")),
+        report_codes=("lap_bmn_susut_ekstra_kel_kl",),
+        require_value=False,
+    ),
+]
+
+
+def layouts_for(category: str) -> List[ReportLayout]:
+    return [layout for layout in LAYOUTS if layout.category == category]
+
+
+def detect_layout(rows: Sequence[Sequence], category: Optional[str] = None) -> Optional[ReportLayout]:
+    """
+    The layout whose report code, or else whose column header signature, appears in the
+    header window (rows as read with header=None). Limited to `category` when given.
+    None when nothing matches.
+    """
+    cells = set()
+    for row in rows:
+        for col, value in enumerate(row):
+            if isinstance(value, str) and value.strip():
+                cells.add((col, value.strip().upper()))
+    texts = {text.lower() for _, text in cells}
+
+    candidates = layouts_for(category) if category else LAYOUTS
+    for layout in candidates:
+        if any(code in texts for code in layout.report_codes):
+            return layout
+    for layout in candidates:
+        if layout.matches(cells):
+            return layout
+    return None
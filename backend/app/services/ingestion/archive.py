@@ -0,0 +1,72 @@
+import os
+import tarfile
+import zipfile
+from typing import BinaryIO, Iterator, Optional, Tuple, Union
+
+from app.services.ingestion.bulk import EXCEL_EXTENSIONS, BulkIngestReport, infer_category, ingest_sources
+
+ARCHIVE_EXTENSIONS = (".zip", ".tar.gz", ".tgz")
+
+# Members that are never reports: macOS resource forks and temporary Office lock files
+IGNORED_PREFIXES = ("__MACOSX/", "._", "~$")
+
+
+def is_archive(name: str) -> bool:
+    return name.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def _is_workbook(member: str) -> bool:
+    base = os.path.basename(member)
+    return (
+        member.lower().endswith(EXCEL_EXTENSIONS)
+        and not member.startswith(IGNORED_PREFIXES)
+        and not base.startswith(IGNORED_PREFIXES)
+    )
+
+
+def iter_archive_members(archive: Union[str, BinaryIO], name: Optional[str] = None) -> Iterator[Tuple[str, bytes]]:
+    """
+    Yields (member name, bytes) for every workbook in a ZIP or tar.gz archive, one member at a
+    time and without writing anything to disk. tar.gz is read as a stream (no seeking), so it
+    also works on non-seekable uploads; ZIP needs a path or seekable file for its directory.
+
+    :param archive: Path or binary file object (e.g. a Streamlit UploadedFile).
+    :param name: File name used to tell the format; defaults to `archive` when it is a path.
+    """
+    name = (name or (archive if isinstance(archive, str) else "")).lower()
+    if name.endswith((".tar.gz", ".tgz")):
+        if isinstance(archive, str):
+            tar = tarfile.open(archive, mode="r|gz")
+        else:
+            tar = tarfile.open(fileobj=archive, mode="r|gz")
+        with tar:
+            for member in tar:
+                if member.isfile() and _is_workbook(member.name):
+                    yield member.name, tar.extractfile(member).read()
+    elif name.endswith(".zip"):
+        with zipfile.ZipFile(archive) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and _is_workbook(info.filename):
+                    yield info.filename, zf.read(info)
+    else:
+        raise ValueError(f"Unsupported archive type: {name or archive!r} (expected {', '.join(ARCHIVE_EXTENSIONS)})")
+
+
+def ingest_archive(
+    archive: Union[str, BinaryIO],
+    name: Optional[str] = None,
+    **kwargs,
+) -> BulkIngestReport:
+    """
+    Ingests every workbook of a ZIP / tar.gz archive through ingest_sources. Members are read
+    only when a worker slot frees up, so at most `max_in_flight` of them are held in memory.
+    The category comes from the member path (e.g. "2023/Neraca/...") or, when that does not
+    tell, from the workbook header in the worker.
+
+    Keyword arguments are passed on to ingest_sources (max_workers, persist, by_slice, ...).
+    """
+    sources = (
+        (member, data, infer_category(member))
+        for member, data in iter_archive_members(archive, name)
+    )
+    return ingest_sources(sources, **kwargs)
@@ -0,0 +1,315 @@
+import io
+import os
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import BinaryIO, Callable, Collection, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from app.core.instrumentation import Span, Trace, merge_spans, trace
+from app.db.session import WriterSessionLocal
+from app.services.analytics.snapshot import refresh_snapshot
+from app.services.extraction.factory import ExtractorFactory
+from app.services.extraction.header import read_header, read_header_rows, resolve_year
+from app.services.extraction.layouts import detect_layout
+from app.services.ingestion.catalog import CATALOG_FILTERED, Catalog, build_catalog
+from app.services.ingestion.persistence import EntryChanges, save_entry_slices, save_extracted_entries, sync_extracted_entries
+
+EXCEL_EXTENSIONS = (".xlsx", ".xls")
+
+# Checked in order: Saldo Awal folders/files also contain "nrc", so Neraca goes last
+CATEGORY_PATTERNS = [
+    ("Penyusutan", ("penyusutan", "lap_susut")),
+    ("Saldo Awal", ("saldo awal", "sawal")),
+    ("Neraca", ("neraca", "lap_bmn_nrc")),
+]
+
+
+# A workbook to ingest: (name, path or file bytes, category or None to classify it in the worker)
+Source = Tuple[str, Union[str, bytes], Optional[str]]
+
+
+@dataclass
+class FileResult:
+    path: str
+    category: Optional[str]
+    records: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+    spans: List[Span] = field(default_factory=list)
+
+
+@dataclass
+class BulkIngestReport:
+    upload_id: str
+    files: List[FileResult] = field(default_factory=list)
+    seconds: float = 0.0
+    # Incremental runs only: rows inserted/updated/deleted/unchanged per category
+    changes: Dict[str, EntryChanges] = field(default_factory=dict)
+    # Stage timings of the whole run, extraction workers included
+    trace: Optional[Trace] = None
+    # Files left out by the years / ba_codes filters
+    skipped: List[str] = field(default_factory=list)
+    # Fingerprints and duplicate resolution of the input, when a catalog stage ran
+    catalog: Optional[Catalog] = None
+
+    @property
+    def failures(self) -> List[FileResult]:
+        return [f for f in self.files if f.error]
+
+    @property
+    def total_records(self) -> int:
+        return sum(f.records for f in self.files)
+
+
+def infer_category(path: str) -> Optional[str]:
+    """
+    Infers the data category from the directory names and filename, e.g.
+    excel/2023/Penyusutan/PENYUSUTAN INTRAKOMPTABEL/... -> "Penyusutan".
+    """
+    lowered = path.replace("\\", "/").lower()
+    for category, patterns in CATEGORY_PATTERNS:
+        if any(p in lowered for p in patterns):
+            return category
+    return None
+
+
+def classify_workbook(file_content: Union[str, bytes, BinaryIO], name: str) -> Optional[str]:
+    """
+    Category of one workbook of a mixed set: from its name (see infer_category), or else
+    from the report code / column headers in its header window (see layouts.detect_layout).
+    None when neither is recognised or the header cannot be read.
+    """
+    category = infer_category(name)
+    if category:
+        return category
+    try:
+        layout = detect_layout(read_header_rows(file_content))
+    except Exception:
+        return None
+    finally:
+        if hasattr(file_content, "seek"):
+            file_content.seek(0)
+    return layout.category if layout else None
+
+
+def discover_files(root: str) -> Iterator[Tuple[str, str]]:
+    """
+    Walks a directory tree and yields (path, category) for every workbook whose
+    category can be inferred from its path or, failing that, from its header.
+    Temporary Office lock files (~$...) are skipped.
+    """
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if not name.lower().endswith(EXCEL_EXTENSIONS) or name.startswith("~$"):
+                continue
+            path = os.path.join(dirpath, name)
+            category = infer_category(os.path.relpath(path, root)) or classify_workbook(path, name)
+            if category:
+                yield path, category
+
+
+def route_files(
+    files: Iterator[Tuple[str, str]],
+    years: Optional[Collection[int]] = None,
+    ba_codes: Optional[Collection[str]] = None,
+    skipped: Optional[List[str]] = None,
+) -> Iterator[Tuple[str, str]]:
+    """
+    Keeps the (path, category) pairs whose report header names one of `years` / `ba_codes`.
+    Only the header window of each workbook is read, so files that are filtered out never
+    reach extraction. Files whose header cannot be read are kept, so that extraction reports
+    the error. Paths that are left out are appended to `skipped`.
+    """
+    if not years and not ba_codes:
+        yield from files
+        return
+    ba_codes = {str(code).zfill(3) for code in ba_codes} if ba_codes else None
+    for path, category in files:
+        try:
+            metadata = read_header(path).as_metadata()
+        except Exception:
+            yield path, category
+            continue
+        if (years and resolve_year(metadata["tahun_anggaran"]) not in years) or (ba_codes and metadata["kode_ba"] not in ba_codes):
+            if skipped is not None:
+                skipped.append(path)
+            continue
+        yield path, category
+
+
+def _extract_file(name: str, content: Union[str, bytes], category: Optional[str]) -> Tuple[str, List[dict], float, List[Span]]:
+    # Runs inside a worker process; must stay a module-level function to be picklable.
+    # The spans go back to the parent, whose metrics and trace cannot see this process.
+    with trace(f"extract-{os.path.basename(name)}") as worker_trace:
+        if isinstance(content, bytes):
+            content = io.BytesIO(content)
+        category = category or classify_workbook(content, name)
+        if category is None:
+            raise ValueError("Not recognised as a Neraca, Saldo Awal or Penyusutan report")
+        extractor = ExtractorFactory.get_extractor(category)
+        records = extractor.extract(content, os.path.basename(name))
+    return category, records, worker_trace.seconds, worker_trace.spans
+
+
+def bulk_ingest(
+    root: str,
+    max_workers: Optional[int] = None,
+    persist: bool = True,
+    on_result: Optional[Callable[[FileResult], None]] = None,
+    incremental: bool = False,
+    years: Optional[Collection[int]] = None,
+    ba_codes: Optional[Collection[str]] = None,
+    by_slice: bool = False,
+    max_in_flight: Optional[int] = None,
+    catalog: bool = True,
+) -> BulkIngestReport:
+    """
+    Extracts every workbook under `root` across a process pool and writes each
+    file's records to the database as soon as its worker finishes (see ingest_sources).
+
+    :param root: Directory to walk, e.g. "excel/2023".
+    :param years: Only ingest workbooks whose header states one of these fiscal years.
+    :param ba_codes: Only ingest workbooks whose header states one of these BA codes, e.g. {"001"}.
+    :param catalog: Fingerprint every workbook first (see build_catalog) and leave out exact
+                    and logical duplicates and placeholder reports; they are listed in
+                    report.catalog.conflicts.
+    Other parameters as for ingest_sources.
+    """
+    skipped = []
+    found = None
+    catalog_trace = None
+    if catalog:
+        files = list(discover_files(root))
+        with trace("catalog") as catalog_trace:
+            if (max_workers or os.cpu_count()) > 1:
+                with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                    found = build_catalog(files, years, ba_codes, lambda fn, *args: pool.map(fn, *args, chunksize=8))
+            else:
+                found = build_catalog(files, years, ba_codes)
+        skipped = [e.path for e in found.entries if e.status == CATALOG_FILTERED]
+        files = [(e.path, e.category) for e in found.selected]
+    else:
+        files = route_files(discover_files(root), years, ba_codes, skipped)
+
+    report = ingest_sources(
+        ((path, path, category) for path, category in files),
+        max_workers=max_workers, persist=persist, on_result=on_result, incremental=incremental, by_slice=by_slice,
+        max_in_flight=max_in_flight,
+    )
+    report.skipped = skipped
+    report.catalog = found
+    if catalog_trace is not None:
+        report.trace.spans[:0] = catalog_trace.spans
+        report.trace.seconds += catalog_trace.seconds
+        report.seconds += catalog_trace.seconds
+    return report
+
+
+def ingest_sources(
+    sources: Iterable[Source],
+    max_workers: Optional[int] = None,
+    persist: bool = True,
+    on_result: Optional[Callable[[FileResult], None]] = None,
+    incremental: bool = False,
+    by_slice: bool = False,
+    max_in_flight: Optional[int] = None,
+) -> BulkIngestReport:
+    """
+    Extracts workbooks across a process pool and writes each file's records to the
+    database as soon as its worker finishes.
+
+    openpyxl parsing is CPU-bound and holds the GIL, so processes (not threads)
+    are used; the pool defaults to one worker per core. All writes happen in
+    this process, which keeps a single writer on SQLite.
+
+    `sources` is consumed lazily: a source is only taken (e.g. an archive member read)
+    when fewer than `max_in_flight` files are being extracted, so the bytes held at any
+    time are bounded by the files in flight, not by the size of the whole set.
+
+    :param sources: (name, path or bytes, category) per workbook; a None category is
+                    classified in the worker from the name or header (see classify_workbook).
+    :param max_workers: Pool size, defaults to os.cpu_count().
+    :param persist: When False, only extract and report (dry run).
+    :param on_result: Optional callback invoked with each FileResult as it completes.
+    :param incremental: Diff against the stored rows and write only what changed
+                        (see sync_extracted_entries). A slice can span several files, so
+                        records are collected per category and saved once extraction is done.
+    :param by_slice: Collect the records of every category and commit each (BA, year) slice,
+                     all its categories together, in one transaction (see save_entry_slices)
+                     instead of one transaction per file.
+    :param max_in_flight: Files submitted to the pool at once, defaults to twice the pool size.
+    """
+    report = BulkIngestReport(upload_id=str(uuid.uuid4()))
+    start = time.perf_counter()
+    cleared = {}
+    partitions = set()
+    pending = {}
+    max_workers = max_workers or os.cpu_count()
+    max_in_flight = max_in_flight or 2 * max_workers
+    sources = iter(sources)
+    db = WriterSessionLocal() if persist else None
+
+    with trace(f"bulk-{report.upload_id}") as run_trace:
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                in_flight = {}
+                while True:
+                    # Only the name and category are kept here; the bytes live in the pool's queue
+                    while len(in_flight) < max_in_flight:
+                        source = next(sources, None)
+                        if source is None:
+                            break
+                        name, content, category = source
+                        in_flight[pool.submit(_extract_file, name, content, category)] = (name, category)
+                        del source, content
+                    if not in_flight:
+                        break
+
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        path, category = in_flight.pop(future)
+                        result = FileResult(path=path, category=category)
+                        try:
+                            category, records, result.seconds, result.spans = future.result()
+                            result.category = category
+                            result.records = len(records)
+                            merge_spans(result.spans)
+                            if db is not None and records and (incremental or by_slice):
+                                pending.setdefault(category, []).extend(records)
+                            elif db is not None and records:
+                                # Slices are cleared only the first time they are seen in this run (per
+                                # category), so intra- and ekstrakomptabel Penyusutan files for one BA accumulate
+                                save_extracted_entries(
+                                    db, records, category, report.upload_id,
+                                    cleared=cleared.setdefault(category, set()), snapshot=False
+                                )
+                                partitions.update((yr, category) for yr, _ in cleared[category])
+                        except Exception as e:
+                            result.error = f"{type(e).__name__}: {e}"
+
+                        report.files.append(result)
+                        if on_result:
+                            on_result(result)
+
+            if incremental:
+                for category, records in pending.items():
+                    changes = sync_extracted_entries(db, records, category, report.upload_id, snapshot=False)
+                    report.changes[category] = changes
+                    if changes.written:
+                        partitions.update((resolve_year(r.get("tahun_anggaran")), category) for r in records)
+            elif pending:
+                save_entry_slices(db, pending, report.upload_id, snapshot=False)
+                partitions.update((resolve_year(r.get("tahun_anggaran")), c) for c, records in pending.items() for r in records)
+
+            if db is not None and partitions:
+                # One snapshot refresh for the whole run instead of one per file
+                refresh_snapshot(db, partitions)
+        finally:
+            if db is not None:
+                db.close()
+
+    report.trace = run_trace
+    report.seconds = time.perf_counter() - start
+    return report
@@ -0,0 +1,155 @@
+import hashlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Collection, Iterable, List, Optional, Tuple
+
+from app.core.instrumentation import span
+from app.services.extraction.header import DEFAULT_KODE_BA, parse_header, read_header_rows, resolve_year
+from app.services.extraction.layouts import detect_layout
+
+CATALOG_INGEST = "ingest"
+# Byte-for-byte copy of another workbook, e.g. "... kode 098 (1).xlsx" next to "... kode 098.xlsx"
+CATALOG_EXACT_DUPLICATE = "exact_duplicate"
+# Another export of a report already in the set: same layout, BA and year, different bytes
+CATALOG_LOGICAL_DUPLICATE = "logical_duplicate"
+# The header names no numeric BA code (e.g. "UAPB : ZZZ Suspense Bagian Anggaran").
+# "kode 999" files are not placeholders: BA 999 is Bendahara Umum Negara, listed in
+# referensi_kl.xlsx, and its workbooks hold real balances
+CATALOG_PLACEHOLDER = "placeholder"
+# Left out by the years / ba_codes filters
+CATALOG_FILTERED = "filtered"
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class CatalogEntry:
+    """
+    Fingerprint of one workbook: content hash plus what its header says.
+    """
+    path: str
+    category: str
+    sha256: str
+    size: int
+    layout: Optional[str] = None
+    kode_ba: Optional[str] = None
+    tahun_anggaran: Optional[int] = None
+    exported_at: Optional[datetime] = None
+    # Set when the header could not be read; such files go to extraction, which reports the error
+    error: Optional[str] = None
+    status: str = CATALOG_INGEST
+    duplicate_of: Optional[str] = None
+
+    @property
+    def report_key(self) -> Tuple[str, Optional[str], Optional[int]]:
+        # Intra- and ekstrakomptabel Penyusutan share a slice but are different reports
+        return (self.layout or self.category, self.kode_ba, self.tahun_anggaran)
+
+
+@dataclass
+class Catalog:
+    entries: List[CatalogEntry] = field(default_factory=list)
+
+    @property
+    def selected(self) -> List[CatalogEntry]:
+        return [e for e in self.entries if e.status == CATALOG_INGEST]
+
+    @property
+    def conflicts(self) -> List[CatalogEntry]:
+        return [e for e in self.entries if e.status in (CATALOG_EXACT_DUPLICATE, CATALOG_LOGICAL_DUPLICATE, CATALOG_PLACEHOLDER)]
+
+
+def fingerprint(path: str, category: str) -> CatalogEntry:
+    """
+    SHA-256 and header (layout, BA, year, export time) of one workbook.
+    Module-level so it can run in a process pool.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+            size += len(chunk)
+    entry = CatalogEntry(path=path, category=category, sha256=digest.hexdigest(), size=size)
+
+    try:
+        rows = read_header_rows(path)
+    except Exception as e:
+        entry.error = f"{type(e).__name__}: {e}"
+        return entry
+    info = parse_header(rows)
+    layout = detect_layout(rows, category)
+    entry.layout = layout.name if layout else None
+    entry.kode_ba = info.kode_ba
+    entry.tahun_anggaran = info.tahun_anggaran
+    entry.exported_at = info.exported_at
+    return entry
+
+
+def resolve_duplicates(entries: List[CatalogEntry]) -> List[CatalogEntry]:
+    """
+    Marks the entries that should not be extracted, deterministically whatever the input order:
+    of byte-identical files the first by path is kept; of several exports of the same report
+    (layout, BA, year) the newest by header timestamp is kept, ties going to the first by path.
+    Files without a BA code are placeholders. Unreadable files are left for extraction to report.
+    """
+    entries = sorted(entries, key=lambda e: e.path)
+    readable = [e for e in entries if e.error is None and e.status == CATALOG_INGEST]
+
+    first_by_hash = {}
+    for entry in readable:
+        original = first_by_hash.setdefault(entry.sha256, entry)
+        if original is not entry:
+            entry.status, entry.duplicate_of = CATALOG_EXACT_DUPLICATE, original.path
+
+    by_report = defaultdict(list)
+    for entry in readable:
+        if entry.status != CATALOG_INGEST:
+            continue
+        if entry.kode_ba is None:
+            entry.status = CATALOG_PLACEHOLDER
+        else:
+            by_report[entry.report_key].append(entry)
+
+    for exports in by_report.values():
+        if len(exports) < 2:
+            continue
+        # max() returns the first of equal keys, and exports are in path order
+        keep = max(exports, key=lambda e: e.exported_at or datetime.min)
+        for entry in exports:
+            if entry is not keep:
+                entry.status, entry.duplicate_of = CATALOG_LOGICAL_DUPLICATE, keep.path
+    return entries
+
+
+def build_catalog(
+    files: Iterable[Tuple[str, str]],
+    years: Optional[Collection[int]] = None,
+    ba_codes: Optional[Collection[str]] = None,
+    map_fn: Callable = map,
+) -> Catalog:
+    """
+    Fingerprints every (path, category) and resolves duplicates before extraction, so
+    redundant copies are never parsed and the result does not depend on which file
+    happens to be written last.
+
+    :param years: Mark workbooks whose header states another fiscal year as filtered.
+    :param ba_codes: Mark workbooks whose header states another BA code as filtered.
+    :param map_fn: map() to fingerprint with, e.g. a process pool's map.
+    """
+    files = list(files)
+    with span("catalog.fingerprint", rows=len(files)) as record:
+        entries = list(map_fn(fingerprint, [p for p, _ in files], [c for _, c in files]))
+        record.bytes = sum(e.size for e in entries)
+
+    ba_codes = {str(code).zfill(3) for code in ba_codes} if ba_codes else None
+    for entry in entries:
+        if entry.error is not None:
+            continue
+        # Same defaults as the stored records (HeaderInfo.as_metadata, resolve_year)
+        year = resolve_year(entry.tahun_anggaran)
+        kode_ba = entry.kode_ba or DEFAULT_KODE_BA
+        if (years and year not in years) or (ba_codes and kode_ba not in ba_codes):
+            entry.status = CATALOG_FILTERED
+    return Catalog(entries=resolve_duplicates(entries))
@@ -0,0 +1,255 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.instrumentation import Span, Trace, merge_spans, trace
+from app.db.session import WriterSessionLocal
+from app.services.extraction.cache import extract_cached
+from app.services.extraction.factory import ExtractorFactory
+from app.services.ingestion.persistence import save_entry_slices
+
+JOB_PENDING = "pending"
+JOB_EXTRACTING = "extracting"
+JOB_SAVING = "saving"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+# Finished jobs (and their records) kept in memory for polling; oldest are dropped first
+MAX_RETAINED_JOBS = 200
+
+
+@dataclass
+class StoredUpload:
+    upload_id: str
+    filename: str
+    path: str
+    size: int
+    sha256: str
+
+
+@dataclass
+class IngestionJob:
+    job_id: str
+    upload_id: str
+    filename: str
+    category: str
+    persist: bool = True
+    default_year: Optional[int] = None
+    # Every upload of the job, upload_id first; their records are saved as one batch
+    upload_ids: List[str] = field(default_factory=list)
+    upload_paths: List[str] = field(default_factory=list)
+    status: str = JOB_PENDING
+    record_count: int = 0
+    records: Optional[List[dict]] = None
+    batch_id: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    seconds: float = 0.0
+    trace: Optional[Trace] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JOB_SUCCEEDED, JOB_FAILED)
+
+    @property
+    def timings(self) -> List[dict]:
+        return self.trace.by_stage() if self.trace else []
+
+
+def _extract_uploads(job_id: str, uploads: List[Tuple[str, str]], category: str) -> Tuple[List[dict], float, List[Span]]:
+    # Runs inside a worker process; must stay a module-level function to be picklable.
+    # The spans go back to the parent, whose metrics and job trace cannot see this process.
+    records = []
+    with trace(f"extract-{job_id}") as worker_trace:
+        extractor = ExtractorFactory.get_extractor(category)
+        for path, filename in uploads:
+            records.extend(extract_cached(extractor, path, filename))
+    return records, worker_trace.seconds, worker_trace.spans
+
+
+class JobManager:
+    """
+    Runs extraction jobs for uploaded workbooks off the request path.
+
+    Parsing is CPU-bound, so it runs in a process pool and never blocks the event loop.
+    Database writes go through a single writer thread, which keeps one writer on
+    SQLite and serializes the slice replacement of concurrent jobs.
+    Job state lives in memory in this process.
+    """
+
+    def __init__(self, upload_dir: str, max_workers: Optional[int] = None):
+        self.upload_dir = upload_dir
+        self.max_workers = max_workers or os.cpu_count()
+        self._uploads: Dict[str, StoredUpload] = {}
+        self._jobs: Dict[str, IngestionJob] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._writer: Optional[ThreadPoolExecutor] = None
+        os.makedirs(upload_dir, exist_ok=True)
+
+    def _executors(self) -> Tuple[ProcessPoolExecutor, ThreadPoolExecutor]:
+        # Created on first use so importing the app does not fork workers
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+                self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingestion-writer")
+            return self._pool, self._writer
+
+    def shutdown(self):
+        with self._lock:
+            pool, writer = self._pool, self._writer
+            self._pool = self._writer = None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        if writer is not None:
+            writer.shutdown(wait=True)
+
+    # --- Uploads -------------------------------------------------------------
+
+    def new_upload_path(self, filename: str) -> Tuple[str, str]:
+        """
+        Returns (upload_id, path) for a new upload; the caller streams the file to `path`.
+        """
+        upload_id = str(uuid.uuid4())
+        extension = os.path.splitext(filename)[1].lower()
+        return upload_id, os.path.join(self.upload_dir, upload_id + extension)
+
+    def register_upload(self, upload: StoredUpload):
+        with self._lock:
+            self._uploads[upload.upload_id] = upload
+
+    def get_upload(self, upload_id: str) -> Optional[StoredUpload]:
+        return self._uploads.get(upload_id)
+
+    def delete_upload(self, upload_id: str) -> bool:
+        with self._lock:
+            upload = self._uploads.pop(upload_id, None)
+        if upload is None:
+            return False
+        if os.path.exists(upload.path):
+            os.remove(upload.path)
+        return True
+
+    # --- Jobs ----------------------------------------------------------------
+
+    def submit(
+        self,
+        upload_id: str,
+        category: str,
+        persist: bool = True,
+        default_year: Optional[int] = None,
+        extra_upload_ids: Sequence[str] = (),
+    ) -> IngestionJob:
+        """
+        Queues extraction of an upload, or of several uploads of one category that are saved
+        together: the Penyusutan rows of a BA come from two workbooks (intra- and
+        ekstrakomptabel), and saving them as separate jobs would make the second replace the
+        rows of the first.
+
+        The uploads are consumed by the job: they are no longer listed, and their files are
+        removed when the job finishes. Raises KeyError for an unknown or already submitted
+        upload and ValueError for an unknown category.
+        """
+        upload_ids = list(dict.fromkeys([upload_id, *extra_upload_ids]))
+        for uid in upload_ids:
+            if self.get_upload(uid) is None:
+                raise KeyError(uid)
+        ExtractorFactory.get_extractor(category)  # Validates the category before queueing
+
+        pool, _ = self._executors()
+        with self._lock:
+            # Taken under the lock, so concurrent submits of one upload start a single job
+            missing = [uid for uid in upload_ids if uid not in self._uploads]
+            if missing:
+                raise KeyError(missing[0])
+            uploads = [self._uploads.pop(uid) for uid in upload_ids]
+            job = IngestionJob(
+                job_id=str(uuid.uuid4()),
+                upload_id=upload_id,
+                filename=", ".join(u.filename for u in uploads),
+                category=category,
+                persist=persist,
+                default_year=default_year,
+                upload_ids=upload_ids,
+                upload_paths=[u.path for u in uploads],
+            )
+            self._jobs[job.job_id] = job
+            self._prune()
+        job.status = JOB_EXTRACTING
+        future = pool.submit(_extract_uploads, job.job_id, [(u.path, u.filename) for u in uploads], category)
+        future.add_done_callback(lambda f: self._on_extracted(job, f))
+        return job
+
+    def get_job(self, job_id: str) -> Optional[IngestionJob]:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[IngestionJob]:
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda j: j.created_at, reverse=True)
+
+    def _prune(self):
+        finished = sorted((j for j in self._jobs.values() if j.done), key=lambda j: j.created_at)
+        for job in finished[:max(0, len(self._jobs) - MAX_RETAINED_JOBS)]:
+            del self._jobs[job.job_id]
+
+    def _on_extracted(self, job: IngestionJob, future: Future):
+        # Called from the pool's management thread; hand DB work to the writer thread
+        try:
+            records, job.seconds, spans = future.result()
+        except Exception as e:
+            self._finish(job, error=f"{type(e).__name__}: {e}")
+            return
+
+        job.trace = Trace(f"job-{job.job_id}", spans=list(spans), seconds=job.seconds)
+        merge_spans(spans)
+
+        job.records = records
+        job.record_count = len(records)
+        if not job.persist or not records:
+            self._finish(job)
+            return
+
+        job.status = JOB_SAVING
+        _, writer = self._executors()
+        writer.submit(self._persist, job)
+
+    def _persist(self, job: IngestionJob):
+        db = WriterSessionLocal()
+        try:
+            batch_id = str(uuid.uuid4())
+            with trace(f"persist-{job.job_id}") as persist_trace:
+                # One batch for all uploads: each slice is replaced once, with the rows of every upload
+                save_entry_slices(db, {job.category: job.records}, batch_id, default_year=job.default_year)
+            job.trace.spans.extend(persist_trace.spans)
+            job.trace.seconds += persist_trace.seconds
+            job.batch_id = batch_id
+            self._finish(job)
+        except Exception as e:
+            self._finish(job, error=f"{type(e).__name__}: {e}")
+        finally:
+            db.close()
+
+    def _finish(self, job: IngestionJob, error: Optional[str] = None):
+        job.error = error
+        job.finished_at = time.time()
+        job.status = JOB_FAILED if error else JOB_SUCCEEDED
+        # The uploads are consumed by their job
+        for path in job.upload_paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+_default_manager = None
+
+
+def get_job_manager() -> JobManager:
+    global _default_manager
+    if _default_manager is None:
+        _default_manager = JobManager(settings.UPLOAD_DIR, settings.INGESTION_WORKERS or None)
+    return _default_manager
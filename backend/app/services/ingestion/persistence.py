@@ -0,0 +1,353 @@
+import csv
+import io
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import Float, bindparam, delete, insert, select, type_coerce, update
+from sqlalchemy.orm import Session
+
+from app.core.instrumentation import span
+from app.models.extracted_data import EntryChangeLog, ExtractedEntry
+from app.services.analytics.asset_category import classify_asset_categories
+from app.services.analytics.snapshot import refresh_snapshot
+from app.services.extraction.header import resolve_year
+from app.services.reporting.face_bar import FACE_BAR_CATEGORIES, refresh_face_bar_summary
+
+# Incremental saves match rows on (kode_ba, tahun_anggaran, kode_akun) within a category
+# and compare these columns; a row whose values all match is left untouched
+DIFF_COLUMNS = ["uraian_akun", "jenis_aset", "nilai", "uraian_ba"]
+
+# Bound parameters per DELETE ... WHERE id IN (...), below SQLite's variable limit
+DELETE_CHUNK_SIZE = 500
+
+ENTRY_COLUMNS = ["upload_id", "data_category", "kode_akun", "uraian_akun", "jenis_aset", "nilai", "tahun_anggaran", "kode_ba", "uraian_ba"]
+
+
+def _entry_rows(records: List[dict], data_category: str, upload_id: str, default_year: Optional[int]) -> List[dict]:
+    asset_categories = classify_asset_categories(r.get("kode_akun") for r in records)
+    return [
+        {
+            "upload_id": upload_id,
+            "data_category": data_category,
+            "kode_akun": r.get("kode_akun"),
+            "uraian_akun": r.get("uraian_akun"),
+            "jenis_aset": jenis_aset,
+            "nilai": r.get("nilai"),
+            "tahun_anggaran": resolve_year(r.get("tahun_anggaran"), default_year),
+            "kode_ba": r.get("kode_ba"),
+            "uraian_ba": r.get("uraian_ba")
+        }
+        for r, jenis_aset in zip(records, asset_categories)
+    ]
+
+
+def bulk_insert_entries(db: Session, rows: List[dict]):
+    """
+    Inserts ExtractedEntry rows using the fastest path of the current dialect:
+    COPY on PostgreSQL (psycopg2 / psycopg 3), the driver's executemany on SQLite,
+    otherwise a Core insert() executemany.
+    Runs on the session's connection, so it joins the session's transaction.
+    """
+    if not rows:
+        return
+
+    conn = db.connection()
+    dialect = conn.dialect
+    table = ExtractedEntry.__table__.name
+    if dialect.name == "sqlite":
+        # Plain tuples straight to sqlite3, skipping per-row parameter processing
+        placeholders = ", ".join("?" * len(ENTRY_COLUMNS))
+        cursor = conn.connection.driver_connection.cursor()
+        try:
+            cursor.executemany(
+                f"INSERT INTO {table} ({', '.join(ENTRY_COLUMNS)}) VALUES ({placeholders})",
+                [tuple(row[c] for c in ENTRY_COLUMNS) for row in rows]
+            )
+        finally:
+            cursor.close()
+    elif dialect.name == "postgresql" and dialect.driver in ("psycopg2", "psycopg"):
+        target = f"{table} ({', '.join(ENTRY_COLUMNS)})"
+        raw = conn.connection.driver_connection
+        with raw.cursor() as cursor:
+            if dialect.driver == "psycopg2":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerows([row[c] for c in ENTRY_COLUMNS] for row in rows)
+                buffer.seek(0)
+                cursor.copy_expert(f"COPY {target} FROM STDIN WITH (FORMAT csv)", buffer)
+            else:
+                with cursor.copy(f"COPY {target} FROM STDIN") as copy:
+                    for row in rows:
+                        copy.write_row([row[c] for c in ENTRY_COLUMNS])
+    else:
+        conn.execute(insert(ExtractedEntry.__table__), rows)
+
+
+def save_extracted_entries(
+    db: Session,
+    records: List[dict],
+    data_category: str,
+    upload_id: str,
+    default_year: Optional[int] = None,
+    cleared: Optional[Set[Tuple[int, str]]] = None,
+    snapshot: bool = True,
+) -> int:
+    """
+    Replaces the stored rows of every (tahun_anggaran, kode_ba) slice present in
+    `records` for `data_category`, and inserts the new rows, in one transaction.
+    For Neraca / Saldo Awal the Face BAR summary of those slices is refreshed in the same transaction
+    (or, without referensi_face_bar.xlsx, marked stale; see refresh_face_bar_summary).
+
+    :param default_year: Used for records without a parsed tahun_anggaran.
+    :param cleared: Slices already replaced earlier in the same batch; they are not
+                    deleted again and the set is updated in place.
+    :param snapshot: Refresh the affected analytics snapshot partitions after the commit.
+                     Batch callers pass False and refresh once at the end.
+    :return: Number of rows inserted.
+    """
+    rows = _entry_rows(records, data_category, upload_id, default_year)
+    slices = set((row["tahun_anggaran"], row["kode_ba"]) for row in rows)
+    pairs = slices - cleared if cleared is not None else slices
+
+    try:
+        with span("persist.delete") as record:
+            record.rows = 0
+            for yr, ba in pairs:
+                record.rows += db.execute(
+                    delete(ExtractedEntry).where(
+                        ExtractedEntry.tahun_anggaran == yr,
+                        ExtractedEntry.kode_ba == ba,
+                        ExtractedEntry.data_category == data_category
+                    )
+                ).rowcount
+        with span("persist.insert", rows=len(rows)):
+            bulk_insert_entries(db, rows)
+        if data_category in FACE_BAR_CATEGORIES:
+            with span("persist.face_bar", rows=len(slices)):
+                refresh_face_bar_summary(db, [(ba, yr) for yr, ba in slices])
+        with span("persist.commit"):
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    if cleared is not None:
+        cleared.update(pairs)
+    if snapshot:
+        refresh_snapshot(db, {(yr, data_category) for yr, _ in slices})
+    return len(rows)
+
+
+def save_entry_slices(
+    db: Session,
+    records_by_category: Dict[str, List[dict]],
+    upload_id: str,
+    default_year: Optional[int] = None,
+    snapshot: bool = True,
+) -> Dict[str, int]:
+    """
+    Saves the records of several categories at once, e.g. the Neraca, Saldo Awal and both
+    Penyusutan workbooks of a K/L, with one transaction per (tahun_anggaran, kode_ba) slice:
+    the stored rows of every category present for the slice are removed in one DELETE, all
+    new rows are inserted in one batch and the Face BAR summary is refreshed before the commit.
+
+    Unlike save_extracted_entries() called once per category, a slice is never left with
+    only some of its categories replaced.
+
+    :param default_year: Used for records without a parsed tahun_anggaran.
+    :param snapshot: Refresh the affected analytics snapshot partitions after the last commit.
+    :return: Number of rows inserted per category.
+    """
+    slices = defaultdict(list)
+    for data_category, records in records_by_category.items():
+        for row in _entry_rows(records, data_category, upload_id, default_year):
+            slices[(row["tahun_anggaran"], row["kode_ba"])].append(row)
+
+    saved = dict.fromkeys(records_by_category, 0)
+    partitions = set()
+    for (yr, ba), rows in slices.items():
+        categories = sorted(set(row["data_category"] for row in rows))
+        try:
+            with span("persist.delete") as record:
+                record.rows = db.execute(
+                    delete(ExtractedEntry).where(
+                        ExtractedEntry.tahun_anggaran == yr,
+                        ExtractedEntry.kode_ba == ba,
+                        ExtractedEntry.data_category.in_(categories)
+                    )
+                ).rowcount
+            with span("persist.insert", rows=len(rows)):
+                bulk_insert_entries(db, rows)
+            if any(c in FACE_BAR_CATEGORIES for c in categories):
+                with span("persist.face_bar", rows=1):
+                    refresh_face_bar_summary(db, [(ba, yr)])
+            with span("persist.commit"):
+                db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        for row in rows:
+            saved[row["data_category"]] += 1
+        partitions.update((yr, c) for c in categories)
+
+    if snapshot and partitions:
+        refresh_snapshot(db, partitions)
+    return saved
+
+
+@dataclass
+class EntryChanges:
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+    @property
+    def written(self) -> int:
+        return self.inserted + self.updated + self.deleted
+
+
+def _comparable(value):
+    # Stored NULLs come back as None, extracted blanks as NaN
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _diff_values(row) -> tuple:
+    return tuple(_comparable(row[c]) for c in DIFF_COLUMNS)
+
+
+def _stored_rows(db: Session, slices, data_category: str):
+    table = ExtractedEntry.__table__
+    columns = [table.c.id, table.c.kode_ba, table.c.tahun_anggaran, table.c.kode_akun] + [
+        # Compare nilai as float, the type extracted records carry
+        type_coerce(table.c.nilai, Float).label("nilai") if c == "nilai" else table.c[c]
+        for c in DIFF_COLUMNS
+    ]
+    for yr, ba in slices:
+        yield from db.execute(
+            select(*columns).where(
+                table.c.kode_ba == ba,
+                table.c.tahun_anggaran == yr,
+                table.c.data_category == data_category
+            )
+        ).mappings()
+
+
+def sync_extracted_entries(
+    db: Session,
+    records: List[dict],
+    data_category: str,
+    upload_id: str,
+    default_year: Optional[int] = None,
+    snapshot: bool = True,
+) -> EntryChanges:
+    """
+    Incremental alternative to save_extracted_entries(): brings every (tahun_anggaran, kode_ba)
+    slice present in `records` for `data_category` to the state of `records`, writing only the
+    rows that differ. Incoming and stored rows are hash-joined on (kode_ba, tahun_anggaran,
+    kode_akun); rows with identical DIFF_COLUMNS are kept as they are (with their upload_id and
+    created_at), the rest become UPDATEs, INSERTs or DELETEs. One EntryChangeLog row per slice
+    is written, and the Face BAR summary and snapshot are refreshed only for slices that changed.
+
+    `records` must hold every row of the slices it touches, e.g. both the intra- and
+    ekstrakomptabel Penyusutan files of a BA; rows missing from it are deleted.
+
+    :param default_year: Used for records without a parsed tahun_anggaran.
+    :param snapshot: Refresh the changed analytics snapshot partitions after the commit.
+    """
+    rows = _entry_rows(records, data_category, upload_id, default_year)
+    slices = set((row["tahun_anggaran"], row["kode_ba"]) for row in rows)
+
+    incoming = defaultdict(list)
+    for row in rows:
+        incoming[(row["kode_ba"], row["tahun_anggaran"], row["kode_akun"])].append(row)
+
+    changes = EntryChanges()
+    per_slice = {(ba, yr): (EntryChanges(), set()) for yr, ba in slices}
+    inserts, updates, delete_ids = [], [], []
+
+    try:
+        with span("persist.diff", rows=len(rows)):
+            stored = defaultdict(list)
+            for row in _stored_rows(db, slices, data_category):
+                stored[(row["kode_ba"], row["tahun_anggaran"], row["kode_akun"])].append(row)
+
+            for key in incoming.keys() | stored.keys():
+                # An account can appear more than once per slice (intra- and ekstrakomptabel
+                # Penyusutan), so rows are first matched on their values, then paired up in id order
+                old_by_values = defaultdict(list)
+                for row in stored.get(key, []):
+                    old_by_values[_diff_values(row)].append(row)
+                new_rows = []
+                for row in incoming.get(key, []):
+                    bucket = old_by_values.get(_diff_values(row))
+                    if bucket:
+                        bucket.pop()
+                    else:
+                        new_rows.append(row)
+                old_rows = sorted((r for bucket in old_by_values.values() for r in bucket), key=lambda r: r["id"])
+                unchanged = len(incoming.get(key, [])) - len(new_rows)
+
+                for old, new in zip(old_rows, new_rows):
+                    updates.append({"_id": old["id"], "upload_id": upload_id, **{c: new[c] for c in DIFF_COLUMNS}})
+                inserts.extend(new_rows[len(old_rows):])
+                delete_ids.extend(r["id"] for r in old_rows[len(new_rows):])
+
+                slice_changes, accounts = per_slice[key[:2]]
+                slice_changes.unchanged += unchanged
+                slice_changes.updated += min(len(old_rows), len(new_rows))
+                slice_changes.inserted += max(len(new_rows) - len(old_rows), 0)
+                slice_changes.deleted += max(len(old_rows) - len(new_rows), 0)
+                if old_rows or new_rows:
+                    accounts.add(key[2])
+
+        table = ExtractedEntry.__table__
+        with span("persist.delete", rows=len(delete_ids)):
+            for i in range(0, len(delete_ids), DELETE_CHUNK_SIZE):
+                db.execute(delete(table).where(table.c.id.in_(delete_ids[i:i + DELETE_CHUNK_SIZE])))
+        if updates:
+            with span("persist.update", rows=len(updates)):
+                db.execute(update(table).where(table.c.id == bindparam("_id")), updates)
+        with span("persist.insert", rows=len(inserts)):
+            bulk_insert_entries(db, inserts)
+
+        changed = []
+        log_rows = []
+        for (ba, yr), (slice_changes, accounts) in per_slice.items():
+            if slice_changes.written:
+                changed.append((ba, yr))
+            log_rows.append({
+                "upload_id": upload_id,
+                "data_category": data_category,
+                "kode_ba": ba,
+                "tahun_anggaran": yr,
+                "inserted": slice_changes.inserted,
+                "updated": slice_changes.updated,
+                "deleted": slice_changes.deleted,
+                "unchanged": slice_changes.unchanged,
+                "changed_accounts": ",".join(sorted(a for a in accounts if a is not None)) or None,
+            })
+            changes.inserted += slice_changes.inserted
+            changes.updated += slice_changes.updated
+            changes.deleted += slice_changes.deleted
+            changes.unchanged += slice_changes.unchanged
+        if log_rows:
+            db.execute(insert(EntryChangeLog), log_rows)
+
+        if changed and data_category in FACE_BAR_CATEGORIES:
+            with span("persist.face_bar", rows=len(changed)):
+                refresh_face_bar_summary(db, changed)
+        with span("persist.commit"):
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    if snapshot and changed:
+        refresh_snapshot(db, {(yr, data_category) for _, yr in changed})
+    return changes
@@ -0,0 +1,256 @@
+import hashlib
+import io
+import os
+import threading
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.extracted_data import OrganizationPIC
+from app.models.reference import ReferenceAccount, ReferenceOrganization, ReferenceVersion
+
+ACCOUNTS_FILE = "referensi_akun.xlsx"
+FACE_BAR_FILE = "referensi_face_bar.xlsx"
+ORGANIZATIONS_FILE = "referensi_kl.xlsx"
+KL_SIGNERS_FILE = "referensi_penandatangan_kl.xlsx"
+PKKN_SIGNERS_FILE = "referensi_penandatangan_pkkn.xlsx"
+PIC_MAPPING_FILE = "referensi_pic_kl.xlsx"
+
+
+def find_reference_dir() -> Optional[str]:
+    """
+    Looks for the referensi/ directory under the working directory and the project root.
+    """
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+    for base in (os.getcwd(), project_root):
+        path = os.path.join(base, "referensi")
+        if os.path.isdir(path):
+            return path
+    return None
+
+
+def _ba_code(value) -> str:
+    return str(value).zfill(3)
+
+
+class ReferenceRegistry:
+    """
+    In-process cache of the referensi/*.xlsx workbooks.
+    Each workbook is parsed once into plain dictionaries. Every lookup checks the file's
+    mtime; when it changed, the content hash decides whether the file is parsed again.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or find_reference_dir()
+        self._entries: Dict[str, dict] = {}
+        self._pics = None
+        self._lock = threading.Lock()
+
+    def path(self, filename: str) -> str:
+        if not self.directory:
+            raise FileNotFoundError("Reference directory 'referensi' not found.")
+        path = os.path.join(self.directory, filename)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Reference file '{filename}' not found in {self.directory}")
+        return path
+
+    def _get(self, filename: str, parse: Callable[[pd.DataFrame], object]):
+        path = self.path(filename)
+        mtime = os.path.getmtime(path)
+        entry = self._entries.get(filename)
+        if entry and entry["mtime"] == mtime:
+            return entry["value"]
+
+        with self._lock:
+            entry = self._entries.get(filename)
+            if entry and entry["mtime"] == mtime:
+                return entry["value"]
+            with open(path, "rb") as f:
+                data = f.read()
+            sha256 = hashlib.sha256(data).hexdigest()
+            if entry and entry["sha256"] == sha256:
+                # Touched but unchanged: keep the parsed value
+                entry["mtime"] = mtime
+                return entry["value"]
+            value = parse(pd.read_excel(io.BytesIO(data)))
+            self._entries[filename] = {"mtime": mtime, "sha256": sha256, "value": value}
+            return value
+
+    def fingerprint(self) -> tuple:
+        """
+        Content hashes of the loaded workbooks; changes whenever any of them is reloaded.
+        """
+        return tuple(sorted((name, entry["sha256"]) for name, entry in self._entries.items()))
+
+    # --- Lookups -------------------------------------------------------------
+
+    def accounts(self) -> Dict[str, dict]:
+        """
+        kode_akun -> {'uraian', 'posisi', 'akun_umum', 'akun_spesifik_face_bar'}
+        """
+        def parse(df):
+            return {
+                str(row['kode_akun']): {
+                    'uraian': row['uraian'],
+                    'posisi': row['posisi'],
+                    'akun_umum': row['akun_umum'],
+                    'akun_spesifik_face_bar': row['akun_spesifik_face_bar']
+                }
+                for row in df.to_dict('records')
+            }
+        return self._get(ACCOUNTS_FILE, parse)
+
+    def face_bar_mapping(self) -> Dict[str, str]:
+        """
+        kode_akun -> akun_spesifik_face_bar
+        """
+        return self._get(FACE_BAR_FILE, lambda df: dict(zip(df['kode_akun'].astype(str), df['akun_spesifik_face_bar'])))
+
+    def organizations(self) -> Dict[str, str]:
+        """
+        kode_ba ("001") -> uraian_kl
+        """
+        return self._get(ORGANIZATIONS_FILE, lambda df: dict(zip(df['kd_kl'].map(_ba_code), df['uraian_kl'])))
+
+    def kl_signers(self) -> Dict[str, dict]:
+        """
+        kode_ba -> {'nama', 'jabatan', 'nip'} of the K/L signing officer
+        """
+        def parse(df):
+            return {
+                _ba_code(row['kd_kl']): {
+                    'nama': row['nama_penandatangan_kl'],
+                    'jabatan': row['jabatan_penandatangan_kl'],
+                    'nip': str(row['nip'])
+                }
+                for row in df.to_dict('records')
+            }
+        return self._get(KL_SIGNERS_FILE, parse)
+
+    def pics(self) -> Dict[str, dict]:
+        """
+        kode_ba -> {'nama_pic', 'nip_pic', 'jabatan_pic'} of the PKKN counterpart, joining
+        referensi_pic_kl (id_direktorat) with referensi_penandatangan_pkkn (id_subdirektorat).
+        """
+        officers = self._get(PKKN_SIGNERS_FILE, lambda df: {
+            row['id_subdirektorat']: {
+                'nama_pic': row['nama'],
+                'nip_pic': str(row['nip']),
+                'jabatan_pic': row['jabatan']
+            }
+            for row in df.to_dict('records')
+        })
+        mapping = self._get(PIC_MAPPING_FILE, lambda df: [
+            (_ba_code(row['kode_ba']), row['id_direktorat']) for row in df.to_dict('records')
+        ])
+
+        # The join is rebuilt only when either parsed workbook was replaced
+        key = (id(officers), id(mapping))
+        if self._pics is None or self._pics[0] != key:
+            pics = {}
+            for kode_ba, id_direktorat in mapping:
+                # First mapping wins for duplicated BAs, as the seeded table's .first() did
+                if kode_ba not in pics and id_direktorat in officers:
+                    pics[kode_ba] = officers[id_direktorat]
+            self._pics = (key, pics)
+        return self._pics[1]
+
+    def face_bar_label(self, kode_akun) -> Optional[str]:
+        return self.face_bar_mapping().get(str(kode_akun))
+
+    def ba_name(self, kode_ba: str) -> Optional[str]:
+        return self.organizations().get(kode_ba)
+
+    def ba_pic(self, kode_ba: str) -> Optional[dict]:
+        return self.pics().get(kode_ba)
+
+
+registry = ReferenceRegistry()
+
+_synced_fingerprint = None
+
+
+def sync_reference_tables(db: Session, force: bool = False) -> bool:
+    """
+    Writes the registry contents into ref_accounts, ref_organizations and organization_pics,
+    and the workbook hashes into ref_versions, in one transaction. When referensi_face_bar.xlsx
+    differs from the version face_bar_summary was built with, the summary is rebuilt for every
+    slice in the same transaction.
+    Skipped when no workbook changed since the last sync, in this process or as recorded in
+    ref_versions. Returns True when the tables were rewritten.
+    """
+    global _synced_fingerprint
+    # face_bar reads the mapping through this module
+    from app.services.reporting.face_bar import rebuild_face_bar_summary
+
+    accounts = registry.accounts()
+    organizations = registry.organizations()
+    pics = registry.pics()
+    # Loaded for completeness so the fingerprint covers every workbook
+    registry.face_bar_mapping()
+    registry.kl_signers()
+
+    fingerprint = registry.fingerprint()
+    if not force and fingerprint == _synced_fingerprint:
+        return False
+
+    try:
+        synced = dict(db.execute(select(ReferenceVersion.filename, ReferenceVersion.sha256)).all())
+        current = dict(fingerprint)
+        if not force and synced == current:
+            db.rollback()
+            _synced_fingerprint = fingerprint
+            return False
+
+        db.execute(delete(ReferenceAccount))
+        db.execute(insert(ReferenceAccount), [
+            {"kode_akun": kode, "uraian_akun": acc['uraian'], "kategori": acc['posisi']}
+            for kode, acc in accounts.items()
+        ])
+        db.execute(delete(ReferenceOrganization))
+        db.execute(insert(ReferenceOrganization), [
+            {"kode_ba": kode, "uraian_ba": name}
+            for kode, name in organizations.items()
+        ])
+        db.execute(delete(OrganizationPIC))
+        db.execute(insert(OrganizationPIC), [
+            {"kode_ba": kode, **pic}
+            for kode, pic in pics.items()
+        ])
+        if force or synced.get(FACE_BAR_FILE) != current[FACE_BAR_FILE]:
+            rebuild_face_bar_summary(db)
+        db.execute(delete(ReferenceVersion))
+        db.execute(insert(ReferenceVersion), [
+            {"filename": filename, "sha256": sha256}
+            for filename, sha256 in fingerprint
+        ])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    _synced_fingerprint = fingerprint
+    return True
+
+
+def mark_reference_stale(db: Session, filename: str):
+    """
+    Forgets the synced version of a workbook, so the next sync_reference_tables()
+    rewrites what depends on it. Does not commit, so it joins the caller's transaction.
+    """
+    global _synced_fingerprint
+    db.execute(delete(ReferenceVersion).where(ReferenceVersion.filename == filename))
+    _synced_fingerprint = None
+
+
+def organization_pic(kode_ba: str) -> Optional[OrganizationPIC]:
+    """
+    Counterpart PIC for a BA as a transient OrganizationPIC (same attributes the
+    BAR PDF reads), resolved from the registry without a database query.
+    """
+    pic = registry.ba_pic(kode_ba)
+    if pic is None:
+        return None
+    return OrganizationPIC(kode_ba=kode_ba, **pic)
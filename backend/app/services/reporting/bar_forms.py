@@ -0,0 +1,115 @@
+from typing import Dict, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.extracted_data import BARMetadata, BARNonNeraca
+
+# Form fields of BARMetadata that a save may set; None means "leave unchanged"
+METADATA_FIELDS = ("nama_petugas", "nip_petugas", "jabatan_petugas", "jenis_ttd", "catatan_kualitatif")
+
+_DIALECT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+def _upsert(db: Session, model):
+    """
+    INSERT for `model` that supports .on_conflict_do_update() on the session's dialect.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect not in _DIALECT_INSERTS:
+        raise NotImplementedError(f"Upserts are not supported on {dialect}")
+    return _DIALECT_INSERTS[dialect](model)
+
+
+def load_non_neraca(db: Session, kode_ba: str, tahun: int) -> Dict[str, dict]:
+    """
+    Part II values of a BAR as {label: {'awal': float, 'akhir': float}}.
+    """
+    rows = db.execute(
+        select(BARNonNeraca.label, BARNonNeraca.nilai_awal, BARNonNeraca.nilai_akhir).where(
+            BARNonNeraca.kode_ba == kode_ba,
+            BARNonNeraca.tahun_anggaran == tahun
+        )
+    ).all()
+    return {label: {'awal': float(awal), 'akhir': float(akhir)} for label, awal, akhir in rows}
+
+
+def save_non_neraca(db: Session, kode_ba: str, tahun: int, labels_values: Dict[str, dict]):
+    """
+    Stores the Part II values of a BAR: one multi-row INSERT ... ON CONFLICT
+    (kode_ba, tahun_anggaran, label) DO UPDATE, and removal of labels no longer
+    in `labels_values`, in one transaction. Concurrent saves never fail or
+    duplicate rows; per label, the last committed save wins.
+    """
+    rows = [
+        {
+            "kode_ba": kode_ba,
+            "tahun_anggaran": tahun,
+            "label": label,
+            "nilai_awal": vals['awal'],
+            "nilai_akhir": vals['akhir'],
+        }
+        for label, vals in labels_values.items()
+    ]
+    try:
+        if rows:
+            stmt = _upsert(db, BARNonNeraca).values(rows)
+            db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["kode_ba", "tahun_anggaran", "label"],
+                    set_={
+                        "nilai_awal": stmt.excluded.nilai_awal,
+                        "nilai_akhir": stmt.excluded.nilai_akhir,
+                        "updated_at": func.now(),
+                    }
+                )
+            )
+        db.execute(
+            delete(BARNonNeraca).where(
+                BARNonNeraca.kode_ba == kode_ba,
+                BARNonNeraca.tahun_anggaran == tahun,
+                BARNonNeraca.label.not_in(list(labels_values))
+            )
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def load_bar_metadata(db: Session, kode_ba: str, tahun: int) -> Optional[BARMetadata]:
+    return db.execute(
+        select(BARMetadata).where(
+            BARMetadata.kode_ba == kode_ba,
+            BARMetadata.tahun_anggaran == tahun
+        )
+    ).scalar_one_or_none()
+
+
+def save_bar_metadata(db: Session, kode_ba: str, tahun: int, **fields):
+    """
+    Creates or updates the BAR metadata row of (kode_ba, tahun) with a single
+    INSERT ... ON CONFLICT (kode_ba, tahun_anggaran) DO UPDATE. Only the given
+    METADATA_FIELDS that are not None are written, so saves of different form
+    sections (signatory, qualitative notes) never overwrite each other.
+    """
+    unknown = set(fields) - set(METADATA_FIELDS)
+    if unknown:
+        raise TypeError(f"Unknown BAR metadata fields: {sorted(unknown)}")
+    values = {name: value for name, value in fields.items() if value is not None}
+
+    stmt = _upsert(db, BARMetadata).values(kode_ba=kode_ba, tahun_anggaran=tahun, **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["kode_ba", "tahun_anggaran"],
+        set_={**{name: stmt.excluded[name] for name in values}, "updated_at": func.now()}
+    )
+    try:
+        db.execute(stmt)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
@@ -0,0 +1,190 @@
+import os
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import BinaryIO, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.extracted_data import BARMetadata, BARNonNeraca, ExtractedEntry
+from app.services.reference.registry import registry
+from app.services.reporting.face_bar import build_bar_summary, get_face_bar_summaries
+from app.services.reporting.pdf_generator import BARPDFGenerator
+
+METADATA_FIELDS = ("nama_petugas", "nip_petugas", "jabatan_petugas", "jenis_ttd")
+
+
+@dataclass
+class BARJob:
+    """
+    Everything needed to render one BAR, as plain picklable values for a worker process.
+    """
+    kode_ba: str
+    ba_name: str
+    year: int
+    summary_df: object
+    metadata: Optional[SimpleNamespace] = None
+    counterpart_pic: Optional[SimpleNamespace] = None
+
+    @property
+    def filename(self) -> str:
+        return f"BAR_{self.kode_ba}_{self.year}.pdf"
+
+
+@dataclass
+class PDFResult:
+    kode_ba: str
+    filename: str
+    size: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class BatchPDFReport:
+    year: int
+    files: List[PDFResult] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def failures(self) -> List[PDFResult]:
+        return [f for f in self.files if f.error]
+
+    @property
+    def pdfs_per_second(self) -> float:
+        generated = len(self.files) - len(self.failures)
+        return generated / self.seconds if self.seconds else 0.0
+
+
+def collect_bar_jobs(db: Session, year: int, ba_codes: Optional[Sequence[str]] = None) -> List[BARJob]:
+    """
+    Builds the Face BAR summary of every BA with data in `year` (or only `ba_codes`)
+    with one query per table instead of one round of queries per BA.
+    """
+    names_stmt = (
+        select(ExtractedEntry.kode_ba, func.min(ExtractedEntry.uraian_ba))
+        .where(ExtractedEntry.tahun_anggaran == year, ExtractedEntry.kode_ba.isnot(None))
+        .group_by(ExtractedEntry.kode_ba)
+        .order_by(ExtractedEntry.kode_ba)
+    )
+    if ba_codes is not None:
+        names_stmt = names_stmt.where(ExtractedEntry.kode_ba.in_(list(ba_codes)))
+    ba_names = dict(db.execute(names_stmt).all())
+    if not ba_names:
+        return []
+
+    part_i = get_face_bar_summaries(db, year, list(ba_names))
+
+    part_ii: Dict[str, dict] = {}
+    for kode_ba, label, awal, akhir in db.execute(
+        select(BARNonNeraca.kode_ba, BARNonNeraca.label, BARNonNeraca.nilai_awal, BARNonNeraca.nilai_akhir)
+        .where(BARNonNeraca.tahun_anggaran == year, BARNonNeraca.kode_ba.in_(list(ba_names)))
+    ).all():
+        part_ii.setdefault(kode_ba, {})[label] = {'awal': float(awal or 0.0), 'akhir': float(akhir or 0.0)}
+
+    metadata = {}
+    for meta in db.execute(
+        select(BARMetadata)
+        .where(BARMetadata.tahun_anggaran == year, BARMetadata.kode_ba.in_(list(ba_names)))
+        .order_by(BARMetadata.id)
+    ).scalars():
+        # First row wins, like the page's .first()
+        metadata.setdefault(meta.kode_ba, SimpleNamespace(**{f: getattr(meta, f) for f in METADATA_FIELDS}))
+
+    try:
+        pics = registry.pics()
+    except FileNotFoundError:
+        pics = {}
+
+    return [
+        BARJob(
+            kode_ba=kode_ba,
+            ba_name=ba_name,
+            year=year,
+            summary_df=build_bar_summary(part_i[kode_ba], part_ii.get(kode_ba, {})),
+            metadata=metadata.get(kode_ba),
+            counterpart_pic=SimpleNamespace(**pics[kode_ba]) if kode_ba in pics else None,
+        )
+        for kode_ba, ba_name in ba_names.items()
+    ]
+
+
+_generator = None
+
+
+def _render(job: BARJob) -> Tuple[bytes, float]:
+    # Runs inside a worker process; the generator (and its styles) is built once per worker
+    global _generator
+    if _generator is None:
+        _generator = BARPDFGenerator()
+    start = time.perf_counter()
+    pdf = _generator.generate_bar_pdf(job.metadata, job.summary_df, job.ba_name, job.year, counterpart_pic=job.counterpart_pic)
+    return pdf, time.perf_counter() - start
+
+
+def generate_bar_zip(
+    output: Union[str, BinaryIO],
+    year: int,
+    ba_codes: Optional[Sequence[str]] = None,
+    max_workers: Optional[int] = None,
+    on_result: Optional[Callable[[PDFResult], None]] = None,
+) -> BatchPDFReport:
+    """
+    Renders the BAR of every BA of `year` across a process pool and writes each PDF
+    into a ZIP archive as soon as it is ready.
+
+    At most two jobs per worker are in flight, so only a handful of PDFs are held in
+    memory at any time regardless of how many BAs are rendered.
+
+    :param output: Path or writable binary file object for the ZIP archive.
+    :param ba_codes: Restrict to these BAs; defaults to every BA with data in `year`.
+    :param max_workers: Pool size, defaults to os.cpu_count().
+    :param on_result: Optional callback invoked with each PDFResult as it completes.
+    """
+    report = BatchPDFReport(year=year)
+    start = time.perf_counter()
+
+    db = SessionLocal()
+    try:
+        jobs = collect_bar_jobs(db, year, ba_codes)
+    finally:
+        db.close()
+
+    workers = max_workers or os.cpu_count()
+    pending = iter(jobs)
+    in_flight = {}
+
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as archive, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+
+        def submit_next():
+            job = next(pending, None)
+            if job is not None:
+                in_flight[pool.submit(_render, job)] = job
+
+        for _ in range(workers * 2):
+            submit_next()
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = in_flight.pop(future)
+                result = PDFResult(kode_ba=job.kode_ba, filename=job.filename)
+                try:
+                    pdf, result.seconds = future.result()
+                    archive.writestr(job.filename, pdf)
+                    result.size = len(pdf)
+                except Exception as e:
+                    result.error = f"{type(e).__name__}: {e}"
+
+                report.files.append(result)
+                if on_result:
+                    on_result(result)
+                submit_next()
+
+    report.seconds = time.perf_counter() - start
+    return report
@@ -0,0 +1,178 @@
+import warnings
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import pandas as pd
+from sqlalchemy import Float, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.extracted_data import ExtractedEntry, FaceBARSummary
+from app.services.reference.registry import FACE_BAR_FILE, mark_reference_stale, registry
+
+# Categories feeding Part I: Saldo Awal -> "awal", Neraca -> "akhir"
+FACE_BAR_CATEGORIES = ("Saldo Awal", "Neraca")
+
+PART_I_LABELS = [
+    "Persediaan", "Tanah", "Peralatan dan Mesin", "Gedung dan Bangunan",
+    "Jalan, Irigasi, dan Jaringan", "Aset Tetap Lainnya", "Konstruksi Dalam Pengerjaan",
+    "Aset Konsesi Jasa Partisipasi Pemerintah", "Aset Konsesi Jasa Pemerintah Partisipasi Mitra (BMN)", 
+    "Akum. Penyusutan Aset Tetap", "Properti Investasi", "Akum. Penyusutan Properti Investasi",
+    "Kemitraan Dengan Pihak Ketiga", "Aset Tak Berwujud", "Aset lain-lain",
+    "Akum. Penyusutan Aset Lainnya"
+]
+
+PART_II_LABELS = [
+    "BMN Ekstrakomptabel", "Akum. Peny. Ekstrakomptabel",
+    "BPYBDS", "BARANG HILANG", "BARANG RUSAK BERAT",
+    "BARANG PERSEDIAAN YANG DISERAHKAN", "BARANG PERSEDIAAN RUSAK/USANG"
+]
+
+
+def load_face_bar_mapping() -> Dict[str, str]:
+    """
+    kode_akun -> akun_spesifik_face_bar from referensi_face_bar.xlsx, served by the reference registry.
+    """
+    return registry.face_bar_mapping()
+
+
+def refresh_face_bar_summary(db: Session, slices: Iterable[Tuple[str, int]]) -> bool:
+    """
+    Recomputes the materialized Face BAR totals of the given (kode_ba, tahun_anggaran) slices
+    from extracted_entries. Does not commit, so it joins the caller's transaction.
+
+    The mapping is not needed to store extracted entries: when referensi_face_bar.xlsx is
+    unavailable the slices are left as they are with a warning, and the summary is marked
+    stale so that the next sync_reference_tables() rebuilds it. Returns False in that case.
+    """
+    try:
+        mapping = load_face_bar_mapping()
+    except FileNotFoundError as e:
+        warnings.warn(f"Face BAR summary not refreshed, the mapping is unavailable: {e}")
+        mark_reference_stale(db, FACE_BAR_FILE)
+        return False
+
+    for kode_ba, tahun in set(slices):
+        db.execute(
+            delete(FaceBARSummary).where(
+                FaceBARSummary.kode_ba == kode_ba,
+                FaceBARSummary.tahun_anggaran == tahun
+            )
+        )
+
+        per_account = db.execute(
+            select(
+                ExtractedEntry.kode_akun,
+                ExtractedEntry.data_category,
+                func.sum(ExtractedEntry.nilai, type_=Float)
+            )
+            .where(
+                ExtractedEntry.kode_ba == kode_ba,
+                ExtractedEntry.tahun_anggaran == tahun,
+                ExtractedEntry.data_category.in_(FACE_BAR_CATEGORIES)
+            )
+            .group_by(ExtractedEntry.kode_akun, ExtractedEntry.data_category)
+        ).all()
+
+        totals = defaultdict(float)
+        for kode_akun, category, nilai in per_account:
+            label = mapping.get(str(kode_akun))
+            if label is not None:
+                totals[(label, category)] += float(nilai or 0.0)
+
+        if totals:
+            db.execute(insert(FaceBARSummary), [
+                {
+                    "kode_ba": kode_ba,
+                    "tahun_anggaran": tahun,
+                    "face_bar_label": label,
+                    "data_category": category,
+                    "nilai": nilai
+                }
+                for (label, category), nilai in totals.items()
+            ])
+    return True
+
+
+def rebuild_face_bar_summary(db: Session) -> int:
+    """
+    Recomputes the whole table, e.g. after the Face BAR mapping changed: every (BA, year) slice
+    that has Neraca or Saldo Awal data is refreshed. Does not commit. Returns the slice count.
+    """
+    # Also drops the rows of slices whose data is gone
+    db.execute(delete(FaceBARSummary))
+    slices = db.execute(
+        select(ExtractedEntry.kode_ba, ExtractedEntry.tahun_anggaran)
+        .where(ExtractedEntry.data_category.in_(FACE_BAR_CATEGORIES))
+        .distinct()
+    ).all()
+    refresh_face_bar_summary(db, [tuple(s) for s in slices])
+    return len(slices)
+
+
+def _empty_part_i() -> Dict[str, dict]:
+    return {label: {'awal': 0.0, 'akhir': 0.0} for label in PART_I_LABELS}
+
+
+def _add_summary_row(part_i_data: Dict[str, dict], label: str, category: str, nilai):
+    if label in part_i_data:
+        key = 'awal' if category == 'Saldo Awal' else 'akhir'
+        part_i_data[label][key] = float(nilai or 0.0)
+
+
+def get_face_bar_summary(db: Session, kode_ba: str, tahun: int) -> Dict[str, dict]:
+    """
+    Part I values of one BA and year as {label: {'awal': ..., 'akhir': ...}},
+    read from the materialized table with a single indexed lookup.
+    """
+    rows = db.execute(
+        select(FaceBARSummary.face_bar_label, FaceBARSummary.data_category, FaceBARSummary.nilai)
+        .where(
+            FaceBARSummary.kode_ba == kode_ba,
+            FaceBARSummary.tahun_anggaran == tahun
+        )
+    ).all()
+
+    part_i_data = _empty_part_i()
+    for label, category, nilai in rows:
+        _add_summary_row(part_i_data, label, category, nilai)
+    return part_i_data
+
+
+def get_face_bar_summaries(db: Session, tahun: int, ba_codes: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, dict]]:
+    """
+    get_face_bar_summary() for every BA of a year (or the given BAs) in one query:
+    {kode_ba: {label: {'awal': ..., 'akhir': ...}}}.
+    """
+    stmt = select(
+        FaceBARSummary.kode_ba, FaceBARSummary.face_bar_label, FaceBARSummary.data_category, FaceBARSummary.nilai
+    ).where(FaceBARSummary.tahun_anggaran == tahun)
+    if ba_codes is not None:
+        stmt = stmt.where(FaceBARSummary.kode_ba.in_(list(ba_codes)))
+
+    summaries = {kode_ba: _empty_part_i() for kode_ba in (ba_codes or [])}
+    for kode_ba, label, category, nilai in db.execute(stmt).all():
+        if kode_ba not in summaries:
+            summaries[kode_ba] = _empty_part_i()
+        _add_summary_row(summaries[kode_ba], label, category, nilai)
+    return summaries
+
+
+def build_bar_summary(part_i_data: Dict[str, dict], part_ii_data: Dict[str, dict]) -> pd.DataFrame:
+    """
+    Consolidated Face BAR table (Category, Saldo Awal, Mutasi, Saldo Akhir, Part) as shown
+    on the Face BAR page and rendered into the BAR PDF. Missing Part II labels count as 0.
+    """
+    summary_rows = []
+    for part, labels, values in (("I - Neraca", PART_I_LABELS, part_i_data), ("II - Non Neraca", PART_II_LABELS, part_ii_data)):
+        for label in labels:
+            vals = values.get(label, {})
+            awal = float(vals.get('awal', 0.0))
+            akhir = float(vals.get('akhir', 0.0))
+            summary_rows.append({
+                "Category": label,
+                "Saldo Awal": awal,
+                "Mutasi": akhir - awal,
+                "Saldo Akhir": akhir,
+                "Part": part
+            })
+    return pd.DataFrame(summary_rows)
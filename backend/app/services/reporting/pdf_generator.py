@@ -1,40 +1,105 @@
+import hashlib
 import io
+import threading
+from collections import OrderedDict
+from datetime import date
+from functools import lru_cache
+
+import pandas as pd
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.lib.units import inch
 
+@lru_cache(maxsize=None)
+def _paragraph_styles():
+    """
+    Paragraph styles shared by every render; building them (and the sample
+    stylesheet) once per process instead of per PDF.
+    """
+    styles = getSampleStyleSheet()
+    header_style = ParagraphStyle(
+        'Header',
+        parent=styles['Heading1'],
+        alignment=1, # Center
+        fontSize=12,
+        spaceAfter=6
+    )
+    title_style = ParagraphStyle(
+        'Title',
+        parent=styles['Normal'],
+        alignment=1,
+        fontSize=12,
+        bold=True,
+        spaceAfter=6
+    )
+    # Normal style at size 11, justified
+    normal_style = styles['Normal']
+    normal_style.fontSize = 11
+    normal_style.leading = 14
+    normal_style.alignment = 4  # TA_JUSTIFY
+
+    # Style for signature cells
+    sig_cell_style = ParagraphStyle(
+        'SigCell',
+        parent=normal_style,
+        alignment=1, # Center
+        fontSize=11,
+        leading=13
+    )
+    sig_grey_style = ParagraphStyle(
+        'SigGrey',
+        parent=sig_cell_style,
+        textColor=colors.grey,
+        fontSize=8,
+        italic=True
+    )
+    return styles, header_style, title_style, normal_style, sig_cell_style, sig_grey_style
+
+
+@lru_cache(maxsize=None)
+def _summary_table_style(p2_idx):
+    # Table Styling, with the Part II header at row p2_idx
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+        ('BACKGROUND', (0, 1), (-1, 1), colors.whitesmoke), # Part I header
+        ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        # TOTAL Row bold
+        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+        ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
+        # Style for Part II header
+        ('BACKGROUND', (0, p2_idx), (-1, p2_idx), colors.whitesmoke),
+        ('FONTNAME', (0, p2_idx), (-1, p2_idx), 'Helvetica-Bold'),
+    ])
+
+
+SIGNATURE_TABLE_STYLE = TableStyle([
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 0), # Row 1 (Jabatan)
+    ('BOTTOMPADDING', (0, 1), (-1, 1), 5), # Row 2 (E-sign label)
+    ('BOTTOMPADDING', (0, 3), (-1, 3), 15), # Increase gap before name
+])
+
+
 class BARPDFGenerator:
     def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self.header_style = ParagraphStyle(
-            'Header',
-            parent=self.styles['Heading1'],
-            alignment=1, # Center
-            fontSize=12,
-            spaceAfter=6
-        )
-        self.title_style = ParagraphStyle(
-            'Title',
-            parent=self.styles['Normal'],
-            alignment=1,
-            fontSize=12,
-            bold=True,
-            spaceAfter=6
-        )
-        self.normal_style = self.styles['Normal']
+        (self.styles, self.header_style, self.title_style, self.normal_style,
+         self.sig_cell_style, self.sig_grey_style) = _paragraph_styles()
         
     def generate_bar_pdf(self, metadata, summary_df, ba_name, year, counterpart_pic=None):
         buffer = io.BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=50, leftMargin=50, topMargin=50, bottomMargin=50)
         elements = []
         
-        # Adjust normal style to size 11 and justify
-        self.normal_style.fontSize = 11
-        self.normal_style.leading = 14
-        self.normal_style.alignment = 4  # TA_JUSTIFY
-        
         # 1. Header
         elements.append(Paragraph("BERITA ACARA", self.header_style))
         elements.append(Paragraph("REKONSILIASI DAN PEMUTAKHIRAN DATA BARANG MILIK NEGARA", self.header_style))
@@ -138,29 +203,8 @@ class BARPDFGenerator:
         
         # Table Styling - Utilizing ~6.8 inches width
         t = Table(table_data, colWidths=[2.8*inch, 1.35*inch, 1.35*inch, 1.35*inch])
-        t.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-            ('BACKGROUND', (0, 1), (-1, 1), colors.whitesmoke), # Part I header
-            ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-            # TOTAL Row bold
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-        ]))
-        
-        # Style for Part II header
-        p2_idx = len(part1) + 2
-        t.setStyle(TableStyle([
-            ('BACKGROUND', (0, p2_idx), (-1, p2_idx), colors.whitesmoke),
-            ('FONTNAME', (0, p2_idx), (-1, p2_idx), 'Helvetica-Bold'),
-        ]))
+        # Part II header sits after the column header, the Part I header and the Part I rows
+        t.setStyle(_summary_table_style(len(part1) + 2))
         
         elements.append(t)
         elements.append(Spacer(1, 0.3 * inch))
@@ -179,22 +223,8 @@ class BARPDFGenerator:
         # Divide equally: ~3.43in each
         col_width = 3.4 * inch
         
-        # Style for signature cells
-        sig_cell_style = ParagraphStyle(
-            'SigCell',
-            parent=self.normal_style,
-            alignment=1, # Center
-            fontSize=11,
-            leading=13
-        )
-        
-        sig_grey_style = ParagraphStyle(
-            'SigGrey',
-            parent=sig_cell_style,
-            textColor=colors.grey,
-            fontSize=8,
-            italic=True
-        )
+        sig_cell_style = self.sig_cell_style
+        sig_grey_style = self.sig_grey_style
 
         # Prepare Jabatan Paragraphs (to support wrapping)
         p1_jab_para = Paragraph(counterpart_pic.jabatan_pic if (counterpart_pic and counterpart_pic.jabatan_pic) else "Petugas Akuntansi,", sig_cell_style)
@@ -218,14 +248,53 @@ class BARPDFGenerator:
         ]
         
         sig_table = Table(sig_data, colWidths=[col_width, col_width])
-        sig_table.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 0), # Row 1 (Jabatan)
-            ('BOTTOMPADDING', (0, 1), (-1, 1), 5), # Row 2 (E-sign label)
-            ('BOTTOMPADDING', (0, 3), (-1, 3), 15), # Increase gap before name
-        ]))
+        sig_table.setStyle(SIGNATURE_TABLE_STYLE)
         elements.append(sig_table)
         
         doc.build(elements)
         buffer.seek(0)
         return buffer.getvalue()
+
+
+PDF_CACHE_SIZE = 32
+
+_pdf_cache = OrderedDict()
+_pdf_cache_lock = threading.Lock()
+
+
+def bar_pdf_key(metadata, summary_df, ba_name, year, counterpart_pic=None):
+    """
+    Hash of everything a BAR PDF depends on: the summary table, the BAR metadata,
+    the counterpart PIC, the BA, the year and today's date (printed in the header).
+    """
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(summary_df, index=True).values.tobytes())
+    digest.update(repr(list(summary_df.columns)).encode())
+    fields = (
+        [getattr(metadata, f, None) for f in ("nama_petugas", "nip_petugas", "jabatan_petugas", "jenis_ttd")],
+        [getattr(counterpart_pic, f, None) for f in ("nama_pic", "nip_pic", "jabatan_pic")],
+        ba_name, year, date.today().isoformat()
+    )
+    digest.update(repr(fields).encode())
+    return digest.hexdigest()
+
+
+def render_bar_pdf(metadata, summary_df, ba_name, year, counterpart_pic=None):
+    """
+    BARPDFGenerator().generate_bar_pdf() memoized on bar_pdf_key(); the least recently
+    used of the last PDF_CACHE_SIZE renders are kept in memory.
+    """
+    key = bar_pdf_key(metadata, summary_df, ba_name, year, counterpart_pic)
+    with _pdf_cache_lock:
+        if key in _pdf_cache:
+            _pdf_cache.move_to_end(key)
+            return _pdf_cache[key]
+
+    pdf_bytes = BARPDFGenerator().generate_bar_pdf(metadata, summary_df, ba_name, year, counterpart_pic=counterpart_pic)
+
+    with _pdf_cache_lock:
+        _pdf_cache[key] = pdf_bytes
+        _pdf_cache.move_to_end(key)
+        while len(_pdf_cache) > PDF_CACHE_SIZE:
+            _pdf_cache.popitem(last=False)
+    return pdf_bytes
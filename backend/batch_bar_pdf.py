@@ -0,0 +1,52 @@
+import argparse
+import os
+import sys
+
+# Add backend to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from app.db.session import WriterSessionLocal
+from app.services.reference.registry import sync_reference_tables
+from app.services.reporting.batch import generate_bar_zip
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the BAR PDF of every BA of a fiscal year into one ZIP archive.")
+    parser.add_argument("year", type=int, help="Fiscal year (tahun_anggaran)")
+    parser.add_argument("--ba", nargs="+", default=None, help="Only these BA codes, e.g. --ba 001 002")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: number of cores)")
+    parser.add_argument("--output", default=None, help="ZIP path (default: BAR_<year>.zip)")
+    args = parser.parse_args()
+
+    output = args.output or f"BAR_{args.year}.zip"
+    ba_codes = [code.zfill(3) for code in args.ba] if args.ba else None
+
+    def print_result(result):
+        if result.error:
+            print(f"  FAILED  {result.filename}: {result.error}")
+        else:
+            print(f"  {result.seconds:6.2f}s  {result.size / 1024:6.1f} KB  {result.filename}")
+
+    # Part I totals are read from face_bar_summary; rebuild it first if referensi_face_bar.xlsx changed
+    db = WriterSessionLocal()
+    try:
+        sync_reference_tables(db)
+    except FileNotFoundError as e:
+        print(f"Reference files not found, using the stored Face BAR summary: {e}")
+    finally:
+        db.close()
+
+    print(f"Generating BARs for {args.year} into {output} ...")
+    report = generate_bar_zip(output, args.year, ba_codes=ba_codes, max_workers=args.workers, on_result=print_result)
+
+    if not report.files:
+        print(f"No BA has data for {args.year}.")
+        return
+    print(f"\n{len(report.files) - len(report.failures)} PDFs in {report.seconds:.2f}s ({report.pdfs_per_second:.1f} PDFs/sec)")
+    if report.failures:
+        print(f"{len(report.failures)} failed:")
+        for result in report.failures:
+            print(f"  {result.filename}: {result.error}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import os
+import sys
+
+# Add backend to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from app.services.ingestion.archive import ingest_archive, is_archive
+from app.services.ingestion.bulk import bulk_ingest
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract and persist every workbook under a directory (e.g. excel/2023) or in a ZIP / tar.gz archive.")
+    parser.add_argument("root", help="Directory to walk or archive to read; the category is inferred from each file's path")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: number of cores)")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="Files being extracted at once, which bounds memory for archives (default: 2 x workers)")
+    parser.add_argument("--incremental", action="store_true", help="Write only rows that differ from the stored data")
+    parser.add_argument("--by-slice", action="store_true",
+                        help="Commit all categories of each (BA, year) in one transaction once extraction is done")
+    parser.add_argument("--year", type=int, nargs="+", default=None, help="Only files whose header states one of these years")
+    parser.add_argument("--ba", nargs="+", default=None, help="Only files whose header states one of these BA codes")
+    parser.add_argument("--no-catalog", action="store_true",
+                        help="Do not fingerprint files first; duplicates and placeholder reports are then ingested too")
+    parser.add_argument("--timings", action="store_true", help="Print time, rows and bytes per pipeline stage")
+    parser.add_argument("--dry-run", action="store_true", help="Extract and report only, do not write to the database")
+    args = parser.parse_args()
+
+    archive = os.path.isfile(args.root) and is_archive(args.root)
+    if not archive and not os.path.isdir(args.root):
+        print(f"Directory or archive not found: {args.root}")
+        sys.exit(1)
+    if archive and (args.year or args.ba):
+        parser.error("--year and --ba are only supported for directories")
+
+    def print_result(result):
+        name = result.path if archive else os.path.relpath(result.path, args.root)
+        if result.error:
+            print(f"  FAILED  {name}: {result.error}")
+        else:
+            print(f"  {result.seconds:6.2f}s  {result.records:5d} rows  [{result.category}] {name}")
+
+    print(f"Ingesting {args.root} ...")
+    options = dict(max_workers=args.workers, persist=not args.dry_run, on_result=print_result,
+                   incremental=args.incremental, by_slice=args.by_slice, max_in_flight=args.max_in_flight)
+    if archive:
+        report = ingest_archive(args.root, **options)
+    else:
+        report = bulk_ingest(args.root, years=args.year, ba_codes=args.ba, catalog=not args.no_catalog, **options)
+
+    files_per_sec = len(report.files) / report.seconds if report.seconds else 0.0
+    print(f"\n{len(report.files)} files, {report.total_records} records in {report.seconds:.2f}s ({files_per_sec:.1f} files/sec)")
+    if report.catalog and report.catalog.conflicts:
+        print(f"{len(report.catalog.conflicts)} files not ingested:")
+        for entry in report.catalog.conflicts:
+            name = os.path.relpath(entry.path, args.root)
+            original = f" of {os.path.relpath(entry.duplicate_of, args.root)}" if entry.duplicate_of else ""
+            print(f"  {entry.status}{original}: {name}")
+    if report.skipped:
+        print(f"{len(report.skipped)} files skipped by the --year / --ba filters")
+    if report.failures:
+        print(f"{len(report.failures)} failed:")
+        for result in report.failures:
+            print(f"  {result.path}: {result.error}")
+    for category, changes in report.changes.items():
+        print(f"[{category}] {changes.inserted} inserted, {changes.updated} updated, "
+              f"{changes.deleted} deleted, {changes.unchanged} unchanged")
+    if args.timings and report.trace:
+        # Worker stages overlap in wall time, so shares can add up to more than 100%
+        print(f"\n{'stage':24s} {'calls':>6s} {'seconds':>9s} {'share':>7s} {'rows':>9s} {'MiB':>8s}")
+        for stage in report.trace.by_stage():
+            rows = stage["rows"] if stage["rows"] is not None else ""
+            mib = f"{stage['bytes'] / 1024 / 1024:.1f}" if stage["bytes"] is not None else ""
+            print(f"{stage['stage']:24s} {stage['calls']:6d} {stage['seconds']:9.2f} {stage['share']:7.1%} {rows:>9} {mib:>8s}")
+        if report.trace.profile_path:
+            print(f"cProfile stats: {report.trace.profile_path}")
+    if not args.dry_run:
+        print(f"Batch ID: {report.upload_id}")
+
+if __name__ == "__main__":
+    main()
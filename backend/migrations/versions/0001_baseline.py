@@ -0,0 +1,157 @@
+"""Baseline schema
+
+Creates the schema as it stood before migrations were introduced. Databases that
+were built with create_all() and patched by the old migrate_db.py script are
+brought to the same state: missing tables, columns and indexes are added and
+jenis_aset is backfilled. face_bar_summary is created empty; populating it needs
+referensi_face_bar.xlsx and is left to sync_reference_tables() (see 0004).
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# jenis_aset by 3-digit kode_akun prefix, frozen as of this revision
+JENIS_ASET_PREFIXES = {
+    "117": "Persediaan",
+    "131": "Tanah",
+    "132": "Peralatan & Mesin",
+    "133": "Gedung & Bangunan",
+    "134": "Jalan, Irigasi & Jaringan",
+    "135": "Aset Tetap Lainnya",
+    "136": "KDP",
+}
+JENIS_ASET_DEFAULT = "Lainnya"
+
+
+def _tables():
+    metadata = sa.MetaData()
+    sa.Table(
+        "ref_accounts", metadata,
+        sa.Column("kode_akun", sa.String, primary_key=True, index=True),
+        sa.Column("uraian_akun", sa.String, nullable=False),
+        sa.Column("kategori", sa.String),
+    )
+    sa.Table(
+        "ref_organizations", metadata,
+        sa.Column("kode_ba", sa.String, primary_key=True, index=True),
+        sa.Column("uraian_ba", sa.String, nullable=False),
+    )
+    sa.Table(
+        "ref_staff", metadata,
+        sa.Column("id", sa.Integer, primary_key=True, index=True),
+        sa.Column("kode_ba", sa.String, sa.ForeignKey("ref_organizations.kode_ba")),
+        sa.Column("nama_penandatangan", sa.String),
+        sa.Column("nip_penandatangan", sa.String),
+        sa.Column("pic_seksi", sa.String),
+        sa.Column("pic_subdit", sa.String),
+        sa.Column("nama_kasubdit", sa.String),
+        sa.Column("nip_kasubdit", sa.String),
+    )
+    sa.Table(
+        "extracted_entries", metadata,
+        sa.Column("id", sa.Integer, primary_key=True, index=True),
+        sa.Column("upload_id", sa.String, index=True),
+        sa.Column("data_category", sa.String, index=True),
+        sa.Column("kode_akun", sa.String, index=True),
+        sa.Column("uraian_akun", sa.String),
+        sa.Column("jenis_aset", sa.String, index=True),
+        sa.Column("nilai", sa.Numeric, nullable=True),
+        sa.Column("tahun_anggaran", sa.Integer, nullable=False),
+        sa.Column("kode_ba", sa.String, index=True),
+        sa.Column("uraian_ba", sa.String),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    sa.Table(
+        "face_bar_summary", metadata,
+        sa.Column("id", sa.Integer, primary_key=True, index=True),
+        sa.Column("kode_ba", sa.String, nullable=False),
+        sa.Column("tahun_anggaran", sa.Integer, nullable=False),
+        sa.Column("face_bar_label", sa.String, nullable=False),
+        sa.Column("data_category", sa.String, nullable=False),
+        sa.Column("nilai", sa.Numeric),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint("kode_ba", "tahun_anggaran", "face_bar_label", "data_category", name="uq_face_bar_summary_key"),
+    )
+    sa.Table(
+        "bar_metadata", metadata,
+        sa.Column("id", sa.Integer, primary_key=True, index=True),
+        sa.Column("kode_ba", sa.String, index=True),
+        sa.Column("tahun_anggaran", sa.Integer, index=True),
+        sa.Column("nama_petugas", sa.String),
+        sa.Column("nip_petugas", sa.String),
+        sa.Column("jabatan_petugas", sa.String),
+        sa.Column("jenis_ttd", sa.String),
+        sa.Column("catatan_kualitatif", sa.String, nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    sa.Table(
+        "bar_non_neraca", metadata,
+        sa.Column("id", sa.Integer, primary_key=True, index=True),
+        sa.Column("kode_ba", sa.String, index=True),
+        sa.Column("tahun_anggaran", sa.Integer, index=True),
+        sa.Column("label", sa.String),
+        sa.Column("nilai_awal", sa.Numeric(precision=20, scale=2)),
+        sa.Column("nilai_akhir", sa.Numeric(precision=20, scale=2)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    sa.Table(
+        "organization_pics", metadata,
+        sa.Column("id", sa.Integer, primary_key=True, index=True),
+        sa.Column("kode_ba", sa.String, index=True),
+        sa.Column("nama_pic", sa.String),
+        sa.Column("nip_pic", sa.String),
+        sa.Column("jabatan_pic", sa.String),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    return metadata
+
+
+def _backfill_jenis_aset(bind):
+    entries = sa.table("extracted_entries", sa.column("kode_akun"), sa.column("jenis_aset"))
+    prefix = sa.func.substr(entries.c.kode_akun, 1, 3)
+    bind.execute(
+        entries.update()
+        .where(entries.c.jenis_aset.is_(None))
+        .values(jenis_aset=sa.case(JENIS_ASET_PREFIXES, value=prefix, else_=JENIS_ASET_DEFAULT))
+    )
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    metadata = _tables()
+
+    created = [t for t in metadata.sorted_tables if t.name not in existing_tables]
+    metadata.create_all(bind=bind, tables=created)
+
+    # Tables that predate this baseline may lack later columns and indexes
+    for table in metadata.sorted_tables:
+        if table in created:
+            continue
+        columns = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in columns:
+                op.add_column(table.name, sa.Column(column.name, column.type, nullable=True))
+        indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                op.create_index(index.name, table.name, [c.name for c in index.columns], unique=index.unique)
+
+    _backfill_jenis_aset(bind)
+
+
+def downgrade():
+    for table in reversed(_tables().sorted_tables):
+        op.drop_table(table.name)
@@ -0,0 +1,60 @@
+"""Composite indexes for (kode_ba, tahun_anggaran, data_category) access, natural-key unique indexes
+
+- extracted_entries: covering index on (kode_ba, tahun_anggaran, data_category, kode_akun, nilai)
+  for slice replacement and the Face BAR refresh, and (tahun_anggaran, data_category) for
+  snapshot partitions. The single-column kode_ba index is a prefix of the former and is dropped.
+- bar_metadata: unique (kode_ba, tahun_anggaran).
+- bar_non_neraca: unique (kode_ba, tahun_anggaran, label).
+  Duplicate rows are removed first: bar_metadata keeps the oldest row (the one the app
+  loaded with .first()), bar_non_neraca keeps the newest (the one that won when loading).
+  The single-column kode_ba indexes are prefixes of the new ones and are dropped.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def _delete_duplicates(table: str, key: str, keep: str):
+    op.execute(
+        f"DELETE FROM {table} WHERE id NOT IN "
+        f"(SELECT {keep}(id) FROM {table} GROUP BY {key})"
+    )
+
+
+def upgrade():
+    op.create_index(
+        "ix_extracted_entries_ba_year_category", "extracted_entries",
+        ["kode_ba", "tahun_anggaran", "data_category", "kode_akun", "nilai"]
+    )
+    op.create_index("ix_extracted_entries_year_category", "extracted_entries", ["tahun_anggaran", "data_category"])
+    op.drop_index("ix_extracted_entries_kode_ba", table_name="extracted_entries", if_exists=True)
+
+    _delete_duplicates("bar_metadata", "kode_ba, tahun_anggaran", "MIN")
+    op.create_index("uq_bar_metadata_ba_year", "bar_metadata", ["kode_ba", "tahun_anggaran"], unique=True)
+    op.drop_index("ix_bar_metadata_kode_ba", table_name="bar_metadata", if_exists=True)
+
+    _delete_duplicates("bar_non_neraca", "kode_ba, tahun_anggaran, label", "MAX")
+    op.create_index("uq_bar_non_neraca_ba_year_label", "bar_non_neraca", ["kode_ba", "tahun_anggaran", "label"], unique=True)
+    op.drop_index("ix_bar_non_neraca_kode_ba", table_name="bar_non_neraca", if_exists=True)
+
+    # Fresh statistics so the planner prefers the composite indexes
+    if op.get_bind().dialect.name in ("sqlite", "postgresql"):
+        op.execute("ANALYZE")
+
+
+def downgrade():
+    op.create_index("ix_bar_non_neraca_kode_ba", "bar_non_neraca", ["kode_ba"])
+    op.drop_index("uq_bar_non_neraca_ba_year_label", table_name="bar_non_neraca")
+    op.create_index("ix_bar_metadata_kode_ba", "bar_metadata", ["kode_ba"])
+    op.drop_index("uq_bar_metadata_ba_year", table_name="bar_metadata")
+    op.create_index("ix_extracted_entries_kode_ba", "extracted_entries", ["kode_ba"])
+    op.drop_index("ix_extracted_entries_year_category", table_name="extracted_entries")
+    op.drop_index("ix_extracted_entries_ba_year_category", table_name="extracted_entries")
@@ -0,0 +1,37 @@
+"""Change log table for incremental (diff-based) saves of extracted entries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "entry_change_log",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("upload_id", sa.String),
+        sa.Column("data_category", sa.String, nullable=False),
+        sa.Column("kode_ba", sa.String, nullable=False),
+        sa.Column("tahun_anggaran", sa.Integer, nullable=False),
+        sa.Column("inserted", sa.Integer, nullable=False),
+        sa.Column("updated", sa.Integer, nullable=False),
+        sa.Column("deleted", sa.Integer, nullable=False),
+        sa.Column("unchanged", sa.Integer, nullable=False),
+        sa.Column("changed_accounts", sa.String),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_entry_change_log_id", "entry_change_log", ["id"])
+    op.create_index("ix_entry_change_log_upload_id", "entry_change_log", ["upload_id"])
+    op.create_index("ix_entry_change_log_ba_year", "entry_change_log", ["kode_ba", "tahun_anggaran"])
+
+
+def downgrade():
+    op.drop_table("entry_change_log")
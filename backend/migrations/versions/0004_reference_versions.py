@@ -0,0 +1,30 @@
+"""Content hashes of the referensi workbooks last synced into the database
+
+face_bar_summary depends on referensi_face_bar.xlsx; the stored hash tells
+sync_reference_tables() when the summary has to be rebuilt. The table starts
+empty, so the first sync after this upgrade rebuilds every slice.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "ref_versions",
+        sa.Column("filename", sa.String, primary_key=True),
+        sa.Column("sha256", sa.String, nullable=False),
+        sa.Column("synced_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade():
+    op.drop_table("ref_versions")
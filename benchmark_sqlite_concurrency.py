@@ -0,0 +1,161 @@
+import sys
+import os
+import time
+import shutil
+import tempfile
+import threading
+import argparse
+import statistics
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from app.db.session import build_engine
+from app.db.migrations import upgrade_database
+from app.models.extracted_data import ExtractedEntry
+from app.services.analytics.queries import summarize_entries
+from app.services.ingestion.persistence import save_extracted_entries
+from app.services.reporting.face_bar import get_face_bar_summary
+
+# Readers run the dashboard queries while one writer keeps replacing a (BA, year, category)
+# slice, as happens when an ingestion job lands during analytics use. Compares the previous
+# engine setup (default pool, rollback journal) with the WAL/pragma profile and writer engine.
+
+base_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_slice(session_factory):
+    """
+    The largest (kode_ba, tahun_anggaran, data_category) slice, as records the writer can re-save.
+    """
+    db = session_factory()
+    try:
+        first = db.execute(
+            select(ExtractedEntry.kode_ba, ExtractedEntry.tahun_anggaran, ExtractedEntry.data_category)
+            .where(ExtractedEntry.data_category.isnot(None))
+            .group_by(ExtractedEntry.kode_ba, ExtractedEntry.tahun_anggaran, ExtractedEntry.data_category)
+            .order_by(func.count().desc())
+            .limit(1)
+        ).first()
+        if first is None:
+            raise SystemExit("Database has no extracted entries; ingest some data first.")
+        kode_ba, tahun, category = first
+        rows = db.query(ExtractedEntry).filter(
+            ExtractedEntry.kode_ba == kode_ba,
+            ExtractedEntry.tahun_anggaran == tahun,
+            ExtractedEntry.data_category == category,
+        ).all()
+        records = [
+            {
+                "kode_akun": r.kode_akun,
+                "uraian_akun": r.uraian_akun,
+                "nilai": float(r.nilai) if r.nilai is not None else None,
+                "tahun_anggaran": r.tahun_anggaran,
+                "kode_ba": r.kode_ba,
+                "uraian_ba": r.uraian_ba,
+            }
+            for r in rows
+        ]
+        return records, category
+    finally:
+        db.close()
+
+
+def run_profile(db_path, tuned, readers, duration):
+    url = f"sqlite:///{db_path}"
+    reader_engine = build_engine(url, tuned=tuned)
+    writer_engine = build_engine(url, writer=True, tuned=tuned) if tuned else reader_engine
+    ReaderSession = sessionmaker(autoflush=False, bind=reader_engine)
+    WriterSession = sessionmaker(autoflush=False, bind=writer_engine)
+
+    records, category = load_slice(ReaderSession)
+    kode_ba, tahun = records[0]["kode_ba"], records[0]["tahun_anggaran"]
+
+    stop = threading.Event()
+    latencies = []
+    stats = {"reads": 0, "read_errors": 0, "commits": 0, "write_errors": 0}
+    lock = threading.Lock()
+
+    def reader():
+        while not stop.is_set():
+            db = ReaderSession()
+            start = time.perf_counter()
+            try:
+                summarize_entries(db, years=[tahun])
+                get_face_bar_summary(db, kode_ba, tahun)
+                elapsed = time.perf_counter() - start
+                with lock:
+                    stats["reads"] += 1
+                    latencies.append(elapsed)
+            except OperationalError:
+                with lock:
+                    stats["read_errors"] += 1
+            finally:
+                db.close()
+
+    def writer():
+        while not stop.is_set():
+            db = WriterSession()
+            try:
+                save_extracted_entries(db, records, category, "benchmark", snapshot=False)
+                stats["commits"] += 1
+            except OperationalError:
+                db.rollback()
+                stats["write_errors"] += 1
+            finally:
+                db.close()
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    reader_engine.dispose()
+    writer_engine.dispose()
+
+    p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) >= 2 else float("nan")
+    return {
+        "reads_per_s": stats["reads"] / duration,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else float("nan"),
+        "p95_ms": p95 * 1000,
+        "read_errors": stats["read_errors"],
+        "commits_per_s": stats["commits"] / duration,
+        "write_errors": stats["write_errors"],
+        "slice_rows": len(records),
+    }
+
+
+def benchmark(source, readers, duration):
+    print(f"Source: {source}  readers: {readers}  duration: {duration:.0f} s per profile")
+    for label, tuned in (("default engine", False), ("WAL + writer", True)):
+        # Fresh copy per profile; the tuned run switches the file to WAL
+        workdir = tempfile.mkdtemp()
+        db_path = os.path.join(workdir, "bench.db")
+        shutil.copyfile(source, db_path)
+        upgrade_database(f"sqlite:///{db_path}")
+        try:
+            r = run_profile(db_path, tuned, readers, duration)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        print(f"\n{label} (writer re-saves a {r['slice_rows']}-row slice):")
+        print(f"  reads   : {r['reads_per_s']:8.1f} /s  p50 {r['p50_ms']:7.1f} ms  p95 {r['p95_ms']:7.1f} ms  "
+              f"errors {r['read_errors']}")
+        print(f"  commits : {r['commits_per_s']:8.1f} /s  errors {r['write_errors']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent read/write benchmark for the SQLite engine profiles.")
+    parser.add_argument("database", nargs="?", default=os.path.join(base_dir, "sql_app.db"),
+                        help="SQLite file to copy and benchmark against (default: sql_app.db)")
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent reader threads")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per profile")
+    args = parser.parse_args()
+    benchmark(args.database, args.readers, args.duration)
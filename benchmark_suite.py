@@ -0,0 +1,346 @@
+import sys
+import os
+import json
+import time
+import shutil
+import argparse
+import platform
+import resource
+import tempfile
+import statistics
+import subprocess
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import pandas as pd
+
+# Add backend to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from app.services.extraction.factory import ExtractorFactory
+from app.services.ingestion.bulk import discover_files
+
+# Benchmark suite over the bundled excel/ corpus. Every benchmark runs in its own fresh worker
+# process so peak RSS is attributable to it; results are written as JSON and can be compared
+# with an earlier run (--compare) to spot regressions between commits.
+
+base_dir = os.path.dirname(os.path.abspath(__file__))
+excel_dir = os.path.join(base_dir, "excel")
+CATEGORIES = ["Neraca", "Saldo Awal", "Penyusutan"]
+
+# Metrics where a higher value is better; all others (seconds, MiB) are better when lower
+HIGHER_IS_BETTER = ("records_per_sec", "rows_per_sec", "pdfs_per_sec", "calls_per_sec")
+
+
+def corpus_files(category, years, limit=None):
+    # Same discovery and category inference as bulk ingestion
+    paths = [
+        path
+        for year in years
+        for path, found in discover_files(os.path.join(excel_dir, str(year)))
+        if found == category
+    ]
+    return paths[:limit] if limit else paths
+
+
+def peak_rss_mib():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def timings(samples):
+    return {
+        "p50_ms": statistics.median(samples) * 1000 if samples else None,
+        "max_ms": max(samples) * 1000 if samples else None,
+    }
+
+
+def bench_extract(category, paths):
+    """
+    Full extractor.extract() per workbook: time, records and records/sec.
+    """
+    warnings.filterwarnings("ignore")
+    extractor = ExtractorFactory.get_extractor(category)
+    files = []
+    for path in paths:
+        start = time.perf_counter()
+        try:
+            records = len(extractor.extract(path, os.path.basename(path)))
+            error = None
+        except Exception as e:
+            records, error = 0, f"{type(e).__name__}: {e}"
+        files.append({
+            "file": os.path.relpath(path, excel_dir),
+            "seconds": time.perf_counter() - start,
+            "records": records,
+            "error": error,
+        })
+
+    ok = [f for f in files if not f["error"]]
+    seconds = sum(f["seconds"] for f in ok)
+    records = sum(f["records"] for f in ok)
+    return {
+        "files": len(ok),
+        "failed": len(files) - len(ok),
+        "records": records,
+        "seconds": seconds,
+        "records_per_sec": records / seconds if seconds else None,
+        **timings([f["seconds"] for f in ok]),
+        "peak_rss_mib": peak_rss_mib(),
+        "per_file": files,
+    }
+
+
+def bench_parse_metadata(paths, repeat=20):
+    """
+    BaseExtractor.parse_metadata on the header window of each workbook (reading is not timed).
+    """
+    warnings.filterwarnings("ignore")
+    extractor = ExtractorFactory.get_extractor("Neraca")
+    headers = []
+    for path in paths:
+        try:
+            headers.append(pd.read_excel(path, header=None, nrows=extractor.header_window))
+        except Exception:
+            continue
+
+    samples = []
+    for df in headers:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            extractor.parse_metadata(df)
+        samples.append((time.perf_counter() - start) / repeat)
+
+    seconds = sum(samples)
+    return {
+        "files": len(headers),
+        "seconds": seconds,
+        "calls_per_sec": len(samples) / seconds if seconds else None,
+        **timings(samples),
+        "peak_rss_mib": peak_rss_mib(),
+    }
+
+
+def _records_by_category(paths_by_category):
+    # Input for the DB and PDF benchmarks; the on-disk extraction cache keeps reruns cheap
+    from app.services.extraction.cache import extract_cached
+
+    warnings.filterwarnings("ignore")
+    records = {}
+    for category, paths in paths_by_category.items():
+        extractor = ExtractorFactory.get_extractor(category)
+        rows = []
+        for path in paths:
+            try:
+                with open(path, "rb") as f:
+                    rows.extend(extract_cached(extractor, f.read(), os.path.basename(path)))
+            except Exception:
+                continue
+        records[category] = rows
+    return records
+
+
+def _temp_session(workdir):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from app.db.migrations import upgrade_database
+
+    url = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    upgrade_database(url)
+    return Session(create_engine(url))
+
+
+def bench_db_save(paths_by_category):
+    """
+    save_extracted_entries into an empty database, the same save again (replacing every slice),
+    and an incremental sync_extracted_entries with nothing changed, per category.
+    """
+    from app.services.ingestion.persistence import save_extracted_entries, sync_extracted_entries
+
+    records = _records_by_category(paths_by_category)
+    workdir = tempfile.mkdtemp()
+    db = _temp_session(workdir)
+    result = {}
+    try:
+        for category, rows in records.items():
+            stages = {}
+            for stage, save in (
+                ("insert", lambda: save_extracted_entries(db, rows, category, "insert", snapshot=False)),
+                ("replace", lambda: save_extracted_entries(db, rows, category, "replace", snapshot=False)),
+                ("sync_unchanged", lambda: sync_extracted_entries(db, rows, category, "sync", snapshot=False)),
+            ):
+                start = time.perf_counter()
+                save()
+                seconds = time.perf_counter() - start
+                stages[stage] = {"seconds": seconds, "rows_per_sec": len(rows) / seconds if seconds else None}
+            result[category] = {"records": len(rows), **stages}
+    finally:
+        db.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+    result["peak_rss_mib"] = peak_rss_mib()
+    return result
+
+
+def bench_pdf(paths_by_category, year, limit=None):
+    """
+    Uncached BARPDFGenerator.generate_bar_pdf for every BA with Face BAR data in `year`.
+    """
+    from app.services.ingestion.persistence import save_extracted_entries
+    from app.services.reporting.batch import collect_bar_jobs
+    from app.services.reporting.pdf_generator import BARPDFGenerator
+
+    records = _records_by_category(paths_by_category)
+    workdir = tempfile.mkdtemp()
+    db = _temp_session(workdir)
+    try:
+        for category, rows in records.items():
+            save_extracted_entries(db, rows, category, "pdf", default_year=year, snapshot=False)
+        jobs = collect_bar_jobs(db, year)[:limit] if limit else collect_bar_jobs(db, year)
+    finally:
+        db.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    generator = BARPDFGenerator()
+    samples, size = [], 0
+    for job in jobs:
+        start = time.perf_counter()
+        pdf = generator.generate_bar_pdf(job.metadata, job.summary_df, job.ba_name, job.year, job.counterpart_pic)
+        samples.append(time.perf_counter() - start)
+        size += len(pdf)
+
+    seconds = sum(samples)
+    return {
+        "pdfs": len(samples),
+        "seconds": seconds,
+        "pdfs_per_sec": len(samples) / seconds if seconds else None,
+        "bytes": size,
+        **timings(samples),
+        "peak_rss_mib": peak_rss_mib(),
+    }
+
+
+def run_isolated(fn, *args):
+    # A fresh process per benchmark: ru_maxrss only ever grows, so sharing one would blur peaks
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(fn, *args).result()
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=base_dir, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(years, limit=None, only=None):
+    selected = lambda name: not only or any(name.startswith(o) for o in only)
+    benchmarks = {}
+
+    for category in CATEGORIES:
+        name = f"extract/{category}"
+        if selected(name):
+            print(f"Running {name} ...")
+            benchmarks[name] = run_isolated(bench_extract, category, corpus_files(category, years, limit))
+
+    all_paths = [p for c in CATEGORIES for p in corpus_files(c, years, limit)]
+    if selected("parse_metadata"):
+        print("Running parse_metadata ...")
+        benchmarks["parse_metadata"] = run_isolated(bench_parse_metadata, all_paths)
+
+    first_year = years[0]
+    paths_by_category = {c: corpus_files(c, [first_year], limit) for c in CATEGORIES}
+    if selected("db_save"):
+        print(f"Running db_save ({first_year}) ...")
+        benchmarks["db_save"] = run_isolated(bench_db_save, paths_by_category)
+    if selected("pdf"):
+        print(f"Running pdf ({first_year}) ...")
+        face_bar_paths = {c: paths_by_category[c] for c in ("Saldo Awal", "Neraca")}
+        benchmarks["pdf"] = run_isolated(bench_pdf, face_bar_paths, first_year, limit)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "years": years,
+            "limit": limit,
+        },
+        "benchmarks": benchmarks,
+    }
+
+
+def flatten(result, prefix=""):
+    """
+    {"extract/Neraca": {"seconds": 1.2, ...}} -> {"extract/Neraca.seconds": 1.2, ...}; per-file detail is skipped.
+    """
+    flat = {}
+    for key, value in result.items():
+        if key == "per_file":
+            continue
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(baseline, current, threshold):
+    """
+    Prints every metric that moved by more than `threshold` (a fraction) in the bad direction.
+    Returns the number of regressions.
+    """
+    before = flatten(baseline["benchmarks"])
+    after = flatten(current["benchmarks"])
+    regressions = 0
+    print(f"\nCompared with {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')}):")
+    for name in sorted(before.keys() & after.keys()):
+        old, new = before[name], after[name]
+        if not old or not any(name.endswith(m) for m in HIGHER_IS_BETTER + ("seconds", "_ms", "_mib")):
+            continue
+        change = (new - old) / old
+        worse = -change if name.endswith(HIGHER_IS_BETTER) else change
+        if worse > threshold:
+            regressions += 1
+            print(f"  REGRESSION {name}: {old:.4g} -> {new:.4g} ({change:+.1%})")
+    if not regressions:
+        print(f"  No metric regressed by more than {threshold:.0%}.")
+    return regressions
+
+
+def print_summary(results):
+    for name, result in results["benchmarks"].items():
+        print(f"\n{name}:")
+        for metric, value in flatten(result).items():
+            print(f"  {metric:32s} {value:14.4g}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark extraction, metadata parsing, DB saves and PDF generation.")
+    parser.add_argument("--years", type=int, nargs="+", default=[2023, 2024], help="Corpus years under excel/")
+    parser.add_argument("--limit", type=int, default=None, help="At most this many files per category (quick runs)")
+    parser.add_argument("--only", nargs="+", default=None, help="Run only benchmarks whose name starts with one of these")
+    parser.add_argument("--output", default=None, help="JSON file to write (default: benchmark_<commit>.json)")
+    parser.add_argument("--compare", default=None, help="Earlier JSON result to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change reported as a regression")
+    args = parser.parse_args()
+
+    results = run_suite(args.years, args.limit, args.only)
+    print_summary(results)
+
+    output = args.output or f"benchmark_{results['meta']['commit'] or 'local'}.json"
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        sys.exit(1 if compare(baseline, results, args.threshold) else 0)
@@ -0,0 +1,22 @@
+import sys
+import os
+
+import pytest
+from sqlalchemy import create_engine
+
+# Add backend to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from app.db.migrations import upgrade_database
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """
+    Engine on a new SQLite database in the test's tmp_path, migrated to head.
+    """
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    upgrade_database(url)
+    engine = create_engine(url)
+    yield engine
+    engine.dispose()
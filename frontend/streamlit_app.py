@@ -4,6 +4,7 @@ import sys
 import os
 import plotly.express as px
 import uuid
+import io
 
 # Add backend to path to import services
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -11,12 +12,54 @@ backend_path = os.path.join(current_dir, "..", "backend")
 sys.path.append(backend_path)
 
 from app.services.extraction.factory import ExtractorFactory
-from app.db.session import SessionLocal
-from app.models.extracted_data import ExtractedEntry, BARMetadata, BARNonNeraca, OrganizationPIC
-from app.services.reporting.pdf_generator import BARPDFGenerator
+from app.services.extraction.cache import extract_cached
+from app.services.ingestion.archive import ARCHIVE_EXTENSIONS, is_archive, iter_archive_members
+from app.services.ingestion.bulk import classify_workbook
+from app.services.ingestion.persistence import save_entry_slices, save_extracted_entries, sync_extracted_entries, EntryChanges
+from app.core.instrumentation import trace
+from app.db.migrations import upgrade_database
+from app.db.session import SessionLocal, WriterSessionLocal
+from app.models.extracted_data import ExtractedEntry, OrganizationPIC
+from app.services.reporting.pdf_generator import bar_pdf_key, render_bar_pdf
+from app.services.analytics.queries import get_filter_options, get_ba_codes, summarize_entries, aggregate_entries, load_entries
+from app.services.analytics.snapshot import get_snapshot_store, refresh_snapshot, snapshots_available
+from app.services.reporting import bar_forms
+from app.services.reporting.face_bar import PART_II_LABELS, get_face_bar_summary, build_bar_summary
+from app.services.reference.registry import organization_pic, sync_reference_tables
+
+# Must be the first Streamlit call; the cached preloads below render spinners
+st.set_page_config(
+    page_title="Financial Data Engine",
+    page_icon="📊",
+    layout="wide"
+)
+
+# Utility: Mirror referensi/*.xlsx into the reference tables; rebuilds the Face BAR summary when the mapping changed.
+# Cheap when nothing changed: the registry only compares file mtimes.
+def sync_reference_data():
+    db = WriterSessionLocal()
+    try:
+        sync_reference_tables(db)
+    except FileNotFoundError:
+        pass
+    finally:
+        db.close()
+
+# Utility: Bring the schema up to date, then sync the reference data, once per server process at startup
+@st.cache_resource
+def preload_reference_data():
+    upgrade_database()
+    sync_reference_data()
+
+preload_reference_data()
 
 # Utility: Get Organization PIC (Counterpart)
 def get_organization_pic(kode_ba):
+    # Served from the in-memory reference registry; the table is the fallback when referensi/ is missing
+    try:
+        return organization_pic(kode_ba)
+    except FileNotFoundError:
+        pass
     db = SessionLocal()
     try:
         return db.query(OrganizationPIC).filter(
@@ -25,41 +68,47 @@ def get_organization_pic(kode_ba):
     finally:
         db.close()
 
+# Utility: Uploaded workbooks as (name, file); ZIP / tar.gz uploads are expanded one member at a time, in memory
+def iter_uploaded_workbooks(uploaded_files):
+    for uploaded_file in uploaded_files:
+        if not is_archive(uploaded_file.name):
+            yield uploaded_file.name, uploaded_file
+            continue
+        try:
+            for member, data in iter_archive_members(uploaded_file, uploaded_file.name):
+                yield member, io.BytesIO(data)
+        except Exception as e:
+            st.error(f"Error reading archive {uploaded_file.name}: {e}")
+
+# Utility: Per-stage totals of an instrumentation trace as a table
+def stage_timings_frame(stage_trace):
+    df = pd.DataFrame(
+        stage_trace.by_stage(),
+        columns=["stage", "calls", "seconds", "rows", "bytes", "share"]
+    )
+    df["seconds"] = df["seconds"] * 1000
+    df["share"] = df["share"] * 100
+    df[["rows", "bytes"]] = df[["rows", "bytes"]].astype("Int64")
+    return df.rename(columns={
+        "stage": "Stage", "calls": "Calls", "seconds": "Time (ms)",
+        "rows": "Rows", "bytes": "Bytes", "share": "Share (%)"
+    })
+
 # Utility: Load Non-Neraca Data
 def load_non_neraca_data(kode_ba, tahun):
     db = SessionLocal()
     try:
-        results = db.query(BARNonNeraca).filter(
-            BARNonNeraca.kode_ba == kode_ba,
-            BARNonNeraca.tahun_anggaran == tahun
-        ).all()
-        return {r.label: {'awal': float(r.nilai_awal), 'akhir': float(r.nilai_akhir)} for r in results}
+        return bar_forms.load_non_neraca(db, kode_ba, tahun)
     finally:
         db.close()
 
-# Utility: Save Non-Neraca Data
+# Utility: Save Non-Neraca Data (one upsert batch per save)
 def save_non_neraca_data(kode_ba, tahun, labels_values):
-    db = SessionLocal()
+    db = WriterSessionLocal()
     try:
-        # Delete existing for this BA/Year
-        db.query(BARNonNeraca).filter(
-            BARNonNeraca.kode_ba == kode_ba,
-            BARNonNeraca.tahun_anggaran == tahun
-        ).delete()
-        
-        for label, vals in labels_values.items():
-            db_entry = BARNonNeraca(
-                kode_ba=kode_ba,
-                tahun_anggaran=tahun,
-                label=label,
-                nilai_awal=vals['awal'],
-                nilai_akhir=vals['akhir']
-            )
-            db.add(db_entry)
-        db.commit()
+        bar_forms.save_non_neraca(db, kode_ba, tahun, labels_values)
         return True
     except Exception as e:
-        db.rollback()
         st.error(f"Error saving non-neraca data: {e}")
         return False
     finally:
@@ -69,91 +118,60 @@ def save_non_neraca_data(kode_ba, tahun, labels_values):
 def load_bar_metadata(kode_ba, tahun):
     db = SessionLocal()
     try:
-        return db.query(BARMetadata).filter(
-            BARMetadata.kode_ba == kode_ba,
-            BARMetadata.tahun_anggaran == tahun
-        ).first()
+        return bar_forms.load_bar_metadata(db, kode_ba, tahun)
     finally:
         db.close()
 
-# Utility: Save BAR Metadata
+# Utility: Save BAR Metadata (single upsert; None leaves a field unchanged)
 def save_bar_metadata(kode_ba, tahun, nama=None, nip=None, jabatan=None, ttd_type=None, catatan=None):
-    db = SessionLocal()
+    db = WriterSessionLocal()
     try:
-        existing = db.query(BARMetadata).filter(
-            BARMetadata.kode_ba == kode_ba,
-            BARMetadata.tahun_anggaran == tahun
-        ).first()
-        
-        if existing:
-            if nama is not None: existing.nama_petugas = nama
-            if nip is not None: existing.nip_petugas = nip
-            if jabatan is not None: existing.jabatan_petugas = jabatan
-            if ttd_type is not None: existing.jenis_ttd = ttd_type
-            if catatan is not None: existing.catatan_kualitatif = catatan
-        else:
-            new_meta = BARMetadata(
-                kode_ba=kode_ba,
-                tahun_anggaran=tahun,
-                nama_petugas=nama,
-                nip_petugas=nip,
-                jabatan_petugas=jabatan,
-                jenis_ttd=ttd_type,
-                catatan_kualitatif=catatan
-            )
-            db.add(new_meta)
-        db.commit()
+        bar_forms.save_bar_metadata(
+            db, kode_ba, tahun,
+            nama_petugas=nama,
+            nip_petugas=nip,
+            jabatan_petugas=jabatan,
+            jenis_ttd=ttd_type,
+            catatan_kualitatif=catatan
+        )
         return True
     except Exception as e:
-        db.rollback()
         st.error(f"Error saving metadata: {e}")
         return False
     finally:
         db.close()
 
-st.set_page_config(
-    page_title="Financial Data Engine",
-    page_icon="📊",
-    layout="wide"
-)
-
-# Utility: Load data from DB
-def load_db_data() -> pd.DataFrame:
+# Utility: Run an analytics query with a short-lived session
+def run_query(query_fn, *args, **kwargs):
     db = SessionLocal()
     try:
-        query = db.query(ExtractedEntry).all()
-        if not query:
-            return pd.DataFrame()
-        
-        data = []
-        for entry in query:
-            data.append({
-                "id": entry.id,
-                "upload_id": entry.upload_id,
-                "data_category": entry.data_category,
-                "kode_akun": entry.kode_akun,
-                "uraian_akun": entry.uraian_akun,
-                "nilai": float(entry.nilai) if entry.nilai else 0.0,
-                "tahun_anggaran": entry.tahun_anggaran,
-                "kode_ba": entry.kode_ba,
-                "uraian_ba": entry.uraian_ba,
-                "created_at": entry.created_at
-            })
-        return pd.DataFrame(data)
+        return query_fn(db, *args, **kwargs)
     finally:
         db.close()
 
-# Utility: Simple Asset Categorization
-def get_asset_category(row):
-    kode = str(row['kode_akun'])
-    if kode.startswith('117'): return 'Persediaan'
-    if kode.startswith('131'): return 'Tanah'
-    if kode.startswith('132'): return 'Peralatan & Mesin'
-    if kode.startswith('133'): return 'Gedung & Bangunan'
-    if kode.startswith('134'): return 'Jalan, Irigasi & Jaringan'
-    if kode.startswith('135'): return 'Aset Tetap Lainnya'
-    if kode.startswith('136'): return 'KDP'
-    return 'Lainnya'
+# Utility: Run an analytics query against the Parquet snapshot when it is built, otherwise in SQL.
+# The snapshot store has a method with the same name and arguments (minus the session) for each query.
+def run_analytics(query_fn, *args, **kwargs):
+    store = get_snapshot_store()
+    if store.is_ready():
+        return getattr(store, query_fn.__name__)(*args, **kwargs)
+    return run_query(query_fn, *args, **kwargs)
+
+# Utility: Build the analytics snapshot once per server process if it does not exist yet
+@st.cache_resource
+def preload_analytics_snapshot():
+    if snapshots_available() and not get_snapshot_store().is_ready():
+        db = SessionLocal()
+        try:
+            refresh_snapshot(db)
+        finally:
+            db.close()
+
+preload_analytics_snapshot()
+
+# Utility: Pass None instead of a filter that selects every option (no WHERE clause needed)
+def narrow(selected, options):
+    return None if len(selected) == len(options) else selected
 
 # Sidebar Navigation
 st.sidebar.title("📌 Main Menu")
@@ -178,39 +196,52 @@ if page == "Data Ingestion":
     st.sidebar.divider()
     st.sidebar.header("Upload Settings")
     fiscal_year = st.sidebar.selectbox("Fiscal Year", [2022, 2023, 2024], index=1)
+    # A mixed set holds the Neraca, Saldo Awal and Penyusutan workbooks together; each file's
+    # category is told from its name or header, and each (BA, year) is saved in one transaction
+    MIXED_SET = "Mixed set (auto-detect)"
     data_category = st.sidebar.selectbox(
         "Data Category", 
-        ["Neraca", "Saldo Awal", "Penyusutan"]
+        ["Neraca", "Saldo Awal", "Penyusutan", MIXED_SET]
     )
+    mixed = data_category == MIXED_SET
 
     # File Upload
-    st.subheader(f"Upload {data_category} Files")
+    st.subheader("Upload a K/L Workbook Set" if mixed else f"Upload {data_category} Files")
     uploaded_files = st.file_uploader(
-        f"Choose {data_category} Excel files", 
-        type=["xlsx", "xls"],
-        accept_multiple_files=True
+        "Choose Neraca, Saldo Awal and Penyusutan Excel files" if mixed else f"Choose {data_category} Excel files", 
+        type=["xlsx", "xls"] + [ext.rsplit(".", 1)[-1] for ext in ARCHIVE_EXTENSIONS],
+        accept_multiple_files=True,
+        help="ZIP / tar.gz archives of workbooks are read member by member without unpacking."
     )
 
     if uploaded_files:
         all_results = []
         factory = ExtractorFactory()
-        extractor = factory.get_extractor(data_category)
+        file_count = 0
         
         processing_placeholder = st.empty()
         
-        for uploaded_file in uploaded_files:
-            processing_placeholder.info(f"Processing {uploaded_file.name}...")
-            try:
-                results = extractor.extract(uploaded_file, uploaded_file.name)
-                if results:
-                    for r in results:
-                        r['source_file'] = uploaded_file.name
-                        # Use selected year if not parsed
-                        if 'tahun_anggaran' not in r:
-                            r['tahun_anggaran'] = fiscal_year
-                    all_results.extend(results)
-            except Exception as e:
-                st.error(f"Error processing {uploaded_file.name}: {e}")
+        with trace(f"extract-{data_category}") as extract_trace:
+            for name, workbook in iter_uploaded_workbooks(uploaded_files):
+                file_count += 1
+                processing_placeholder.info(f"Processing {name}...")
+                category = classify_workbook(workbook, name) if mixed else data_category
+                if category is None:
+                    st.warning(f"Skipped {name}: not recognised as Neraca, Saldo Awal or Penyusutan.")
+                    continue
+                try:
+                    # Cached by content hash: reruns and re-uploads of the same file skip parsing
+                    results = extract_cached(factory.get_extractor(category), workbook, os.path.basename(name))
+                    if results:
+                        for r in results:
+                            r['source_file'] = name
+                            r['data_category'] = category
+                            # Use selected year if not parsed
+                            if r.get('tahun_anggaran') is None:
+                                r['tahun_anggaran'] = fiscal_year
+                        all_results.extend(results)
+                except Exception as e:
+                    st.error(f"Error processing {name}: {e}")
                 
         processing_placeholder.empty()
 
@@ -220,12 +251,13 @@ if page == "Data Ingestion":
             # Show Metrics
             total_value = df['nilai'].sum()
             count = len(df)
-            file_count = len(uploaded_files)
             
             col1, col2, col3 = st.columns(3)
             col1.metric("Total Files", file_count)
             col2.metric("Total Records", count)
             col3.metric("Total Value (IDR)", f"{total_value:,.0f}")
+            if mixed:
+                st.caption(" · ".join(f"{c}: {n} records" for c, n in df['data_category'].value_counts().sort_index().items()))
             
             # Data Preview
             st.subheader("Extracted Data (Consolidated)")
@@ -233,56 +265,61 @@ if page == "Data Ingestion":
             
             # Database Integration
             st.subheader("Database Persistence")
+            incremental = st.checkbox(
+                "Only write changed rows",
+                help="Compare with the stored data and insert, update or delete only the accounts that differ. "
+                     "Upload every file of an organisation (e.g. intra- and ekstrakomptabel) together."
+            )
             if st.button("💾 Save All Extracted Data to Database", type="primary"):
-                save_progress = st.progress(0)
-                status_text = st.empty()
-                
+                db = WriterSessionLocal()
                 try:
-                    db = SessionLocal()
                     upload_uuid = str(uuid.uuid4())
-                    
-                    # Deduplication: Find unique (tahun, ba) pairs in current batch
-                    unique_pairs = set((entry.get('tahun_anggaran', fiscal_year), entry.get('kode_ba')) for entry in all_results)
-                    
-                    for yr, ba in unique_pairs:
-                        db.query(ExtractedEntry).filter(
-                            ExtractedEntry.tahun_anggaran == yr,
-                            ExtractedEntry.kode_ba == ba,
-                            ExtractedEntry.data_category == data_category
-                        ).delete()
-                    
-                    db.flush()
-                    
-                    total = len(all_results)
-                    for i, entry in enumerate(all_results):
-                        db_entry = ExtractedEntry(
-                            upload_id=upload_uuid,
-                            data_category=data_category,
-                            kode_akun=entry.get('kode_akun'),
-                            uraian_akun=entry.get('uraian_akun'),
-                            nilai=entry.get('nilai'),
-                            tahun_anggaran=entry.get('tahun_anggaran', fiscal_year),
-                            kode_ba=entry.get('kode_ba'),
-                            uraian_ba=entry.get('uraian_ba')
+                    with st.spinner(f"Saving {len(all_results)} entries..."), trace(f"upload-{upload_uuid}") as save_trace:
+                        by_category = {}
+                        for r in all_results:
+                            by_category.setdefault(r['data_category'], []).append(r)
+                        if incremental:
+                            changes = EntryChanges()
+                            for category, records in by_category.items():
+                                category_changes = sync_extracted_entries(db, records, category, upload_uuid, default_year=fiscal_year)
+                                changes.inserted += category_changes.inserted
+                                changes.updated += category_changes.updated
+                                changes.deleted += category_changes.deleted
+                                changes.unchanged += category_changes.unchanged
+                        elif mixed:
+                            # One transaction per (BA, year), all categories together
+                            total = sum(save_entry_slices(db, by_category, upload_uuid, default_year=fiscal_year).values())
+                        else:
+                            # Replaces existing rows per (tahun, ba) and bulk-inserts the batch in one transaction
+                            total = save_extracted_entries(db, all_results, data_category, upload_uuid, default_year=fiscal_year)
+                    if incremental:
+                        st.success(
+                            f"Saved changes: {changes.inserted} inserted, {changes.updated} updated, "
+                            f"{changes.deleted} deleted, {changes.unchanged} unchanged. (Batch ID: {upload_uuid})"
                         )
-                        db.add(db_entry)
-                        
-                        if i % 100 == 0 or i == total - 1:
-                            save_progress.progress((i + 1) / total)
-                            status_text.text(f"Saving entry {i+1} of {total}...")
-                    
-                    db.commit()
-                    st.success(f"Successfully saved {total} entries! (Batch ID: {upload_uuid})")
-                    db.close()
+                    else:
+                        st.success(f"Successfully saved {total} entries! (Batch ID: {upload_uuid})")
+                    st.session_state["ingestion_save_trace"] = save_trace
                 except Exception as e:
                     st.error(f"Failed to save data: {e}")
-                    if 'db' in locals():
-                        db.rollback()
-                        db.close()
+                finally:
+                    db.close()
             
             # Export Option
             csv = df.to_csv(index=False).encode('utf-8')
-            st.download_button("Download Combined CSV", csv, f"{data_category}_batch.csv", "text/csv")
+            st.download_button("Download Combined CSV", csv, f"{'mixed' if mixed else data_category}_batch.csv", "text/csv")
+
+            # Where the time went: extraction of this run and the last save
+            with st.expander("⏱️ Stage Timings"):
+                st.caption(f"Extraction: {extract_trace.seconds * 1000:,.1f} ms")
+                st.dataframe(stage_timings_frame(extract_trace), use_container_width=True, hide_index=True)
+                save_trace = st.session_state.get("ingestion_save_trace")
+                if save_trace is not None:
+                    st.caption(f"Last save ({save_trace.name}): {save_trace.seconds * 1000:,.1f} ms")
+                    st.dataframe(stage_timings_frame(save_trace), use_container_width=True, hide_index=True)
+                for t in (extract_trace, save_trace):
+                    if t is not None and t.profile_path:
+                        st.caption(f"cProfile stats: `{t.profile_path}`")
             
         else:
             st.warning("No data extracted. Please check file format.")
@@ -291,51 +328,45 @@ elif page == "Analytics Dashboard":
     st.title("📈 Analytics Dashboard")
     st.markdown("Analyze financial assets across Years and Organizations.")
 
-    # Load data
-    df_db: pd.DataFrame = load_db_data()
+    # Filters and aggregations read the Parquet snapshot (column-pruned, partition-filtered), or SQL before it is built
+    options = run_analytics(get_filter_options)
 
-    if df_db.empty:
+    if not options["tahun_anggaran"]:
         st.warning("No data found in database. Please go to 'Data Ingestion' and upload some files first.")
     else:
-        # Augment data with Asset Categories
-        df_db['jenis_aset'] = df_db.apply(get_asset_category, axis=1)
-
         # Dashboard Filters
         st.sidebar.divider()
         st.sidebar.header("Filters")
         
-        all_bas = sorted([str(x) for x in df_db['uraian_ba'].unique() if pd.notna(x)])
+        all_bas = options["uraian_ba"]
         selected_ba = st.sidebar.multiselect("Select Organization (BA)", all_bas, default=all_bas)
         
-        all_years = sorted([int(x) for x in df_db['tahun_anggaran'].unique() if pd.notna(x)])
+        all_years = options["tahun_anggaran"]
         selected_years = st.sidebar.multiselect("Select Years", all_years, default=all_years)
         
-        all_cats = sorted([str(x) for x in df_db['data_category'].unique() if pd.notna(x)])
+        all_cats = options["data_category"]
         selected_cats = st.sidebar.multiselect("Select Data Category", all_cats, default=all_cats)
         
-        all_assets = sorted([str(x) for x in df_db['jenis_aset'].unique() if pd.notna(x)])
+        all_assets = options["jenis_aset"]
         selected_assets = st.sidebar.multiselect("Select Asset Types", all_assets, default=all_assets)
 
         # Apply Filters
-        mask = (
-            df_db['uraian_ba'].isin(selected_ba) & 
-            df_db['tahun_anggaran'].isin(selected_years) &
-            df_db['data_category'].isin(selected_cats) &
-            df_db['jenis_aset'].isin(selected_assets)
+        filters = dict(
+            ba_names=narrow(selected_ba, all_bas),
+            years=narrow(selected_years, all_years),
+            categories=narrow(selected_cats, all_cats),
+            asset_types=narrow(selected_assets, all_assets)
         )
-        filtered_df = df_db[mask]
+        summary = run_analytics(summarize_entries, **filters)
 
-        if filtered_df.empty:
+        if summary["records"] == 0:
              st.info("No data matches the selected filters.")
         else:
             # Summary Metrics
-            total_assets = filtered_df['nilai'].sum()
-            ba_count = len(filtered_df['uraian_ba'].unique())
-            
             m1, m2, m3 = st.columns(3)
-            m1.metric("Total Asset Value", f"IDR {total_assets:,.0f}")
-            m2.metric("Filtered Organizations", ba_count)
-            m3.metric("Filtered Records", len(filtered_df))
+            m1.metric("Total Asset Value", f"IDR {summary['total_nilai']:,.0f}")
+            m2.metric("Filtered Organizations", summary["ba_count"])
+            m3.metric("Filtered Records", summary["records"])
 
             st.divider()
 
@@ -344,7 +375,7 @@ elif page == "Analytics Dashboard":
 
             with c1:
                 st.subheader("Asset Value Growth by Year")
-                growth_df = filtered_df.groupby('tahun_anggaran')['nilai'].sum().reset_index()
+                growth_df = run_analytics(aggregate_entries, ["tahun_anggaran"], **filters)
                 fig_growth = px.line(
                     growth_df, x='tahun_anggaran', y='nilai', 
                     markers=True, title="Total Asset Value per Fiscal Year",
@@ -354,7 +385,7 @@ elif page == "Analytics Dashboard":
 
             with c2:
                 st.subheader("Asset Composition by Type")
-                comp_df = filtered_df.groupby('jenis_aset')['nilai'].sum().reset_index()
+                comp_df = run_analytics(aggregate_entries, ["jenis_aset"], **filters)
                 fig_comp = px.pie(
                     comp_df, values='nilai', names='jenis_aset', 
                     title="Asset Value distribution",
@@ -364,7 +395,7 @@ elif page == "Analytics Dashboard":
 
             # Row 2: BA Comparison
             st.subheader("Organization (BA) Comparison")
-            comparison_df = filtered_df.groupby('uraian_ba')['nilai'].sum().reset_index()
+            comparison_df = run_analytics(aggregate_entries, ["uraian_ba"], **filters)
             fig_ba = px.bar(
                 comparison_df, x='uraian_ba', y='nilai',
                 title="Total Assets per Organization",
@@ -383,18 +414,14 @@ elif page == "Analytics Dashboard":
             if len(selected_years) > 0:
                 wf_year = st.selectbox("Select Year for Waterfall Analysis", selected_years, index=0)
                 
-                # Filter data for this year and selected organizations
-                wf_df = df_db[
-                    (df_db['tahun_anggaran'] == wf_year) & 
-                    (df_db['uraian_ba'].isin(selected_ba))
-                ]
-                
-                # Pivot to get categories and values per type
-                start_mask = wf_df['data_category'] == 'Saldo Awal'
-                end_mask = wf_df['data_category'] == 'Neraca'
+                # Sum per category and asset type for this year and the selected organizations
+                wf_df = run_analytics(
+                    aggregate_entries, ["data_category", "jenis_aset"],
+                    ba_names=filters["ba_names"], years=[wf_year], categories=["Saldo Awal", "Neraca"]
+                )
                 
-                start_vals = wf_df[start_mask].groupby('jenis_aset')['nilai'].sum()
-                end_vals = wf_df[end_mask].groupby('jenis_aset')['nilai'].sum()
+                start_vals = wf_df[wf_df['data_category'] == 'Saldo Awal'].set_index('jenis_aset')['nilai']
+                end_vals = wf_df[wf_df['data_category'] == 'Neraca'].set_index('jenis_aset')['nilai']
                 
                 # Get unique asset types present in either
                 all_asset_types = sorted(list(set(start_vals.index) | set(end_vals.index)))
@@ -445,25 +472,30 @@ elif page == "Analytics Dashboard":
             # Detailed Table
             st.divider()
             st.subheader("Filtered Asset Details")
+            detail_limit = 5000
+            filtered_df = run_analytics(load_entries, limit=detail_limit, **filters)
+            if summary["records"] > detail_limit:
+                st.caption(f"Showing the first {detail_limit:,} of {summary['records']:,} records.")
             st.dataframe(filtered_df, use_container_width=True)
 
 elif page == "Face BAR":
     st.title("📄 Face BAR (Berita Acara Rekonsiliasi)")
     st.markdown("Enter reporting metadata and signing officer details.")
 
-    df_db: pd.DataFrame = load_db_data()
-    if df_db.empty:
+    ba_codes = run_query(get_ba_codes)
+    options = run_query(get_filter_options)
+    if not ba_codes:
         st.warning("No data found. Please upload data first.")
     else:
         # Selection for specific BA and Year
-        all_bas = sorted([str(x) for x in df_db['uraian_ba'].unique() if pd.notna(x)])
-        all_years = sorted([int(x) for x in df_db['tahun_anggaran'].unique() if pd.notna(x)])
+        all_bas = list(ba_codes)
+        all_years = options["tahun_anggaran"]
         
         col1, col2 = st.columns(2)
         with col1:
             sel_ba_name = st.selectbox("Select Organization (BA)", all_bas)
             # Find kode_ba for the selected name
-            sel_ba_code = df_db[df_db['uraian_ba'] == sel_ba_name]['kode_ba'].iloc[0]
+            sel_ba_code = ba_codes[sel_ba_name]
         with col2:
             sel_year = st.selectbox("Select Fiscal Year", all_years)
 
@@ -516,60 +548,13 @@ elif page == "Face BAR":
         st.divider()
         st.subheader("Asset Balance Summary")
         
-        # 1. Load Reference Mapping (Robust path detection for deployment)
-        filename = "referensi_face_bar.xlsx"
-        possible_paths = [
-            os.path.join(os.getcwd(), "referensi", filename),
-            os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "referensi", filename),
-            os.path.join("referensi", filename)
-        ]
-        
-        ref_path = None
-        for path in possible_paths:
-            if os.path.exists(path):
-                ref_path = path
-                break
-        
-        if not ref_path:
-            st.error(f"Reference file '{filename}' not found. Searched in: {possible_paths}")
-            st.stop()
-            
-        df_ref = pd.read_excel(ref_path)
-        df_ref['kode_akun_str'] = df_ref['kode_akun'].astype(str)
-        
-        # 2. Filter DB data for selected BA/Year
-        df_target = df_db[
-            (df_db['kode_ba'] == sel_ba_code) & 
-            (df_db['tahun_anggaran'] == sel_year)
-        ].copy()
-        df_target['kode_akun_str'] = df_target['kode_akun'].astype(str)
-        
-        # Merge with reference to get report labels
-        df_mapped = pd.merge(df_target, df_ref, on='kode_akun_str', how='inner')
-        
-        # Part I Labels
-        part_i_labels = [
-            "Persediaan", "Tanah", "Peralatan dan Mesin", "Gedung dan Bangunan",
-            "Jalan, Irigasi, dan Jaringan", "Aset Tetap Lainnya", "Konstruksi Dalam Pengerjaan",
-            "Aset Konsesi Jasa Partisipasi Pemerintah", "Aset Konsesi Jasa Pemerintah Partisipasi Mitra (BMN)", 
-            "Akum. Penyusutan Aset Tetap", "Properti Investasi", "Akum. Penyusutan Properti Investasi",
-            "Kemitraan Dengan Pihak Ketiga", "Aset Tak Berwujud", "Aset lain-lain",
-            "Akum. Penyusutan Aset Lainnya"
-        ]
-        
-        part_i_data = {}
-        for label in part_i_labels:
-            mask_label = df_mapped['akun_spesifik_face_bar'] == label
-            awal = float(df_mapped[mask_label & (df_mapped['data_category'] == 'Saldo Awal')]['nilai'].sum())
-            akhir = float(df_mapped[mask_label & (df_mapped['data_category'] == 'Neraca')]['nilai'].sum())
-            part_i_data[label] = {'awal': awal, 'akhir': akhir}
+        # Part I totals come from the materialized Face BAR summary (refreshed on ingestion and,
+        # through the sync, whenever referensi_face_bar.xlsx is edited)
+        sync_reference_data()
+        part_i_data = run_query(get_face_bar_summary, sel_ba_code, sel_year)
 
         # 4. Load Part II existing data
-        part_ii_labels = [
-            "BMN Ekstrakomptabel", "Akum. Peny. Ekstrakomptabel",
-            "BPYBDS", "BARANG HILANG", "BARANG RUSAK BERAT",
-            "BARANG PERSEDIAAN YANG DISERAHKAN", "BARANG PERSEDIAAN RUSAK/USANG"
-        ]
+        part_ii_labels = PART_II_LABELS
         existing_part_ii = load_non_neraca_data(sel_ba_code, sel_year)
         
         # 5. UI: Part II Manual Entry Form
@@ -605,38 +590,10 @@ elif page == "Face BAR":
         # 6. Display Consolidated Results
         st.markdown("#### Consolidated Asset Balance Summary")
         
-        summary_rows = []
         def fmt(x): return f"{x:,.2f}"
 
-        # Part I Rows
-        for label in part_i_labels:
-            vals = part_i_data[label]
-            awal = float(vals['awal'])
-            akhir = float(vals['akhir'])
-            mutasi = akhir - awal
-            summary_rows.append({
-                "Category": label,
-                "Saldo Awal": awal,
-                "Mutasi": mutasi,
-                "Saldo Akhir": akhir,
-                "Part": "I - Neraca"
-            })
-            
-        # Part II Rows
-        for label in part_ii_labels:
-            vals = new_part_ii_values[label]
-            awal = float(vals['awal'])
-            akhir = float(vals['akhir'])
-            mutasi = akhir - awal
-            summary_rows.append({
-                "Category": label,
-                "Saldo Awal": awal,
-                "Mutasi": mutasi,
-                "Saldo Akhir": akhir,
-                "Part": "II - Non Neraca"
-            })
-            
-        df_summary = pd.DataFrame(summary_rows)
+        df_summary = build_bar_summary(part_i_data, new_part_ii_values)
+        summary_rows = df_summary.to_dict('records')
         
         # Calculate Totals
         total_awal_i = float(sum(r['Saldo Awal'] for r in summary_rows if r['Part'] == "I - Neraca"))
@@ -680,31 +637,38 @@ elif page == "Face BAR":
         existing_meta = load_bar_metadata(sel_ba_code, sel_year)
         counterpart_pic = get_organization_pic(sel_ba_code)
         
-        pdf_gen = BARPDFGenerator()
-        pdf_bytes = pdf_gen.generate_bar_pdf(existing_meta, df_summary, sel_ba_name, sel_year, counterpart_pic=counterpart_pic)
-        
-        st.download_button(
-            label="📄 Download BAR (PDF)",
-            data=pdf_bytes,
-            file_name=f"BAR_{sel_ba_code}_{sel_year}.pdf",
-            mime="application/pdf"
-        )
+        # Rendered only on request; reruns with unchanged inputs reuse the memoized PDF
+        pdf_key = bar_pdf_key(existing_meta, df_summary, sel_ba_name, sel_year, counterpart_pic=counterpart_pic)
+        if st.session_state.get("bar_pdf_key") != pdf_key:
+            if st.button("📄 Prepare BAR (PDF)"):
+                st.session_state["bar_pdf_key"] = pdf_key
+
+        if st.session_state.get("bar_pdf_key") == pdf_key:
+            with st.spinner("Rendering PDF..."):
+                pdf_bytes = render_bar_pdf(existing_meta, df_summary, sel_ba_name, sel_year, counterpart_pic=counterpart_pic)
+            st.download_button(
+                label="📄 Download BAR (PDF)",
+                data=pdf_bytes,
+                file_name=f"BAR_{sel_ba_code}_{sel_year}.pdf",
+                mime="application/pdf"
+            )
 
 elif page == "Lampiran Kualitatif":
     st.title("📝 Lampiran Kualitatif")
     st.markdown("Provide qualitative analysis and explanations for the BAR.")
     
-    df_db: pd.DataFrame = load_db_data()
-    if df_db.empty:
+    ba_codes = run_query(get_ba_codes)
+    options = run_query(get_filter_options)
+    if not ba_codes:
         st.warning("No data found. Please upload data first.")
     else:
-        all_bas = sorted([str(x) for x in df_db['uraian_ba'].unique() if pd.notna(x)])
-        all_years = sorted([int(x) for x in df_db['tahun_anggaran'].unique() if pd.notna(x)])
+        all_bas = list(ba_codes)
+        all_years = options["tahun_anggaran"]
         
         col1, col2 = st.columns(2)
         with col1:
             sel_ba_name = st.selectbox("Select Organization (BA)", all_bas, key="qual_ba")
-            sel_ba_code = df_db[df_db['uraian_ba'] == sel_ba_name]['kode_ba'].iloc[0]
+            sel_ba_code = ba_codes[sel_ba_name]
         with col2:
             sel_year = st.selectbox("Select Fiscal Year", all_years, key="qual_year")
 
@@ -1,30 +1,44 @@
-import sqlite3
 import os
+import sys
 
 # Determine project root and db path
 base_dir = os.path.dirname(os.path.abspath(__file__))
 db_path = os.path.join(base_dir, "sql_app.db")
 
+# Add backend to path
+sys.path.append(os.path.join(base_dir, "backend"))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.db.migrations import current_revision, upgrade_database
+from app.services.reference.registry import sync_reference_tables
+
 def migrate():
+    """
+    Brings sql_app.db up to date with the migrations in backend/migrations
+    (the same as `alembic upgrade head` from the backend directory), then
+    syncs the data that comes from referensi/: the reference tables and the
+    Face BAR summary. The app does the latter on its own at startup.
+    """
     if not os.path.exists(db_path):
         print(f"Database not found at {db_path}")
         return
 
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
+    url = f"sqlite:///{db_path}"
+    print(f"Current revision: {current_revision(url) or 'none'}")
+    upgrade_database(url)
+    print(f"Migration successful. Now at revision {current_revision(url)}.")
+
+    engine = create_engine(url)
     try:
-        print("Adding column 'catatan_kualitatif' to 'bar_metadata'...")
-        cursor.execute("ALTER TABLE bar_metadata ADD COLUMN catatan_kualitatif TEXT")
-        conn.commit()
-        print("Migration successful.")
-    except sqlite3.OperationalError as e:
-        if "duplicate column name" in str(e).lower():
-            print("Column 'catatan_kualitatif' already exists.")
-        else:
-            print(f"Error: {e}")
+        with Session(engine) as db:
+            if sync_reference_tables(db):
+                print("Reference tables and Face BAR summary rebuilt.")
+    except FileNotFoundError as e:
+        print(f"Reference files not found, Face BAR summary not rebuilt: {e}")
     finally:
-        conn.close()
+        engine.dispose()
 
 if __name__ == "__main__":
     migrate()
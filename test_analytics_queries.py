@@ -0,0 +1,111 @@
+import sys
+import os
+
+import pandas as pd
+import pytest
+from sqlalchemy.orm import Session
+
+# Add backend to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from app.services.analytics import queries
+from app.services.analytics.asset_category import classify_asset_categories
+from app.services.ingestion.persistence import save_extracted_entries
+
+# (category, year, kode_ba, kode_akun, nilai); None is an empty value cell
+SEED = [
+    ("Neraca", 2023, "001", "131111", 100.0),
+    ("Neraca", 2023, "001", "132111", 50.0),
+    ("Neraca", 2023, "002", "131111", 20.0),
+    ("Neraca", 2023, "002", "117111", 7.5),
+    ("Neraca", 2022, "001", "131111", 90.0),
+    ("Neraca", 2022, "002", "133111", 30.0),
+    ("Saldo Awal", 2023, "001", "131111", 80.0),
+    ("Saldo Awal", 2023, "002", "136111", 5.0),
+    ("Penyusutan", 2023, "001", "132111", -10.0),
+    ("Penyusutan", 2023, "001", "132111", None),
+    ("Penyusutan", 2023, "002", "169316", -2.5),
+]
+
+FILTERS = [
+    {},
+    {"years": [2023]},
+    {"ba_names": ["BA 002"]},
+    {"ba_codes": ["001"], "years": [2022, 2023]},
+    {"categories": ["Neraca", "Penyusutan"]},
+    {"asset_types": ["Tanah", "Peralatan & Mesin"]},
+    {"years": [2023], "ba_codes": ["001"], "categories": ["Neraca"], "asset_types": ["Tanah"]},
+    # An empty multiselect matches nothing
+    {"categories": []},
+]
+
+
+@pytest.fixture
+def seeded(engine):
+    """
+    Session on the seeded database, and the same rows as a DataFrame.
+    """
+    df = pd.DataFrame(SEED, columns=["data_category", "tahun_anggaran", "kode_ba", "kode_akun", "nilai"])
+    df["uraian_ba"] = "BA " + df["kode_ba"]
+    df["jenis_aset"] = classify_asset_categories(df["kode_akun"])
+    df["nilai"] = df["nilai"].astype(float)
+    with Session(engine) as db:
+        for (category, _), group in df.groupby(["data_category", "tahun_anggaran"]):
+            records = group[["kode_akun", "nilai", "tahun_anggaran", "kode_ba", "uraian_ba"]].to_dict("records")
+            for r in records:
+                r["uraian_akun"] = f"Akun {r['kode_akun']}"
+            save_extracted_entries(db, records, category, "seed", snapshot=False)
+        yield db, df
+
+
+def reference_rows(df, ba_names=None, ba_codes=None, years=None, categories=None, asset_types=None):
+    mask = pd.Series(True, index=df.index)
+    for column, values in (("uraian_ba", ba_names), ("kode_ba", ba_codes), ("tahun_anggaran", years),
+                           ("data_category", categories), ("jenis_aset", asset_types)):
+        if values is not None:
+            mask &= df[column].isin(values)
+    return df[mask]
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_summary_matches_pandas(seeded, filters):
+    db, df = seeded
+    rows = reference_rows(df, **filters)
+    assert queries.summarize_entries(db, **filters) == {
+        "total_nilai": pytest.approx(rows["nilai"].sum()),
+        "ba_count": rows["uraian_ba"].nunique(),
+        "records": len(rows),
+    }
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("group_by", [["tahun_anggaran"], ["uraian_ba", "jenis_aset"], ["data_category", "kode_ba", "kode_akun"]])
+def test_aggregates_match_pandas(seeded, group_by, filters):
+    db, df = seeded
+    expected = reference_rows(df, **filters).groupby(group_by, as_index=False)["nilai"].sum().sort_values(group_by)
+    actual = queries.aggregate_entries(db, group_by, **filters)
+    assert actual.columns.tolist() == group_by + ["nilai"]
+    assert actual[group_by].values.tolist() == expected[group_by].values.tolist()
+    assert actual["nilai"].tolist() == pytest.approx(expected["nilai"].tolist())
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_loaded_rows_match_pandas(seeded, filters):
+    db, df = seeded
+    columns = ["data_category", "tahun_anggaran", "kode_ba", "kode_akun", "jenis_aset", "nilai"]
+    expected = reference_rows(df, **filters)[columns].fillna({"nilai": 0.0})
+    actual = queries.load_entries(db, **filters)
+    assert sorted(map(tuple, actual[columns].values.tolist())) == sorted(map(tuple, expected.values.tolist()))
+
+
+def test_filter_options_and_ba_codes(seeded):
+    db, df = seeded
+    options = queries.get_filter_options(db)
+    assert options["uraian_ba"] == ["BA 001", "BA 002"]
+    assert options["tahun_anggaran"] == [2022, 2023]
+    assert options["data_category"] == sorted(df["data_category"].unique())
+    assert queries.get_ba_codes(db) == {"BA 001": "001", "BA 002": "002"}
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,172 @@
+import sys
+import os
+import csv
+import io
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+# Add backend to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from app.core import instrumentation
+from app.core.config import settings
+from app.core.instrumentation import DURATION_BUCKETS, Span, merge_spans, span
+from app.main import app
+from app.services.analytics import export, snapshot
+from app.services.extraction import cache
+from app.services.extraction.factory import ExtractorFactory
+from app.services.ingestion import jobs
+
+base_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "excel", "2023")
+workbook_path = os.path.join(base_path, "Neraca", "Laporan lap_bmn_nrc kl  kode 001.xlsx")
+penyusutan_paths = [
+    os.path.join(base_path, "Penyusutan", "PENYUSUTAN INTRAKOMPTABEL", "Laporan lap_susut kl intrakomptabel kelompok kode 001.xlsx"),
+    os.path.join(base_path, "Penyusutan", "PENYUSUTAN EKSTRAKOMPTABEL", "Laporan lap_susut kl ekstrakomptabel kelompok kode 001.xlsx"),
+]
+
+
+@pytest.fixture
+def client(engine, tmp_path, monkeypatch):
+    """
+    TestClient whose jobs, exports, extraction cache and snapshot use the test database and tmp_path.
+    """
+    # The startup migration runs against the (already migrated) test database
+    monkeypatch.setattr(settings, "DATABASE_URL", str(engine.url))
+    monkeypatch.setattr(cache, "_default_cache", cache.ExtractionCache(str(tmp_path / "cache"), 16 * 1024 * 1024))
+    session = sessionmaker(bind=engine)
+    monkeypatch.setattr(jobs, "WriterSessionLocal", session)
+    monkeypatch.setattr(export, "SessionLocal", session)
+    monkeypatch.setattr(snapshot, "_default_store", snapshot.SnapshotStore(str(tmp_path / "snapshot")))
+    manager = jobs.JobManager(str(tmp_path / "uploads"), max_workers=1)
+    monkeypatch.setattr(jobs, "_default_manager", manager)
+    with TestClient(app) as client:
+        yield client
+
+
+def upload(client, path=workbook_path):
+    with open(path, "rb") as f:
+        response = client.post("/ingestion/uploads", files={"file": (os.path.basename(path), f)})
+    assert response.status_code == 201
+    return response.json()["upload_id"]
+
+
+def wait_for(client, job_id, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f"/ingestion/jobs/{job_id}").json()
+        if job["status"] in (jobs.JOB_SUCCEEDED, jobs.JOB_FAILED):
+            return job
+        time.sleep(0.1)
+    raise TimeoutError(job_id)
+
+
+def test_upload_job_results_and_export_round_trip(client, tmp_path):
+    expected = ExtractorFactory.get_extractor("Neraca").extract(workbook_path, os.path.basename(workbook_path))
+
+    upload_id = upload(client)
+    response = client.post("/ingestion/jobs", json={"upload_id": upload_id, "category": "Neraca"})
+    assert response.status_code == 202
+    # The upload is consumed by its job, even while the job is still running
+    assert client.post("/ingestion/jobs", json={"upload_id": upload_id, "category": "Neraca"}).status_code == 404
+    assert client.delete(f"/ingestion/uploads/{upload_id}").status_code == 404
+    job = wait_for(client, response.json()["job_id"])
+    assert (job["status"], job["error"], job["record_count"]) == (jobs.JOB_SUCCEEDED, None, len(expected))
+    assert job["batch_id"] is not None
+
+    results = client.get(f"/ingestion/jobs/{job['job_id']}/results", params={"offset": 1, "limit": 2}).json()
+    assert results["total"] == len(expected)
+    assert [r["kode_akun"] for r in results["records"]] == [r["kode_akun"] for r in expected[1:3]]
+
+    # ... and its file removed once the job finished
+    assert os.listdir(tmp_path / "uploads") == []
+
+    response = client.get("/export/entries", params={"format": "csv", "years": 2023})
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert sorted(r["kode_akun"] for r in rows) == sorted(str(r["kode_akun"]) for r in expected)
+    assert {r["upload_id"] for r in rows} == {job["batch_id"]}
+
+
+def test_parquet_export_round_trip(client):
+    pq = pytest.importorskip("pyarrow.parquet")
+    expected = ExtractorFactory.get_extractor("Neraca").extract(workbook_path, os.path.basename(workbook_path))
+
+    response = client.post("/ingestion/jobs", json={"upload_id": upload(client), "category": "Neraca"})
+    job = wait_for(client, response.json()["job_id"])
+    assert job["status"] == jobs.JOB_SUCCEEDED
+
+    response = client.get("/export/entries", params={"format": "parquet", "years": 2023, "chunk_size": 100})
+    assert response.status_code == 200
+    parquet = pq.ParquetFile(io.BytesIO(response.content))
+    # One row group per chunk
+    assert parquet.metadata.num_row_groups == -(-len(expected) // 100)
+    rows = parquet.read().to_pylist()
+    assert sorted((r["kode_akun"], r["nilai"]) for r in rows) == sorted((str(r["kode_akun"]), r["nilai"]) for r in expected)
+    assert {(r["upload_id"], r["data_category"], r["tahun_anggaran"]) for r in rows} == {(job["batch_id"], "Neraca", 2023)}
+
+
+def test_uploads_of_one_job_are_saved_together(client, tmp_path):
+    extractor = ExtractorFactory.get_extractor("Penyusutan")
+    expected = [r for path in penyusutan_paths for r in extractor.extract(path, os.path.basename(path))]
+
+    intra, ekstra = [upload(client, path) for path in penyusutan_paths]
+    response = client.post("/ingestion/jobs", json={"upload_id": intra, "extra_upload_ids": [ekstra], "category": "Penyusutan"})
+    assert response.status_code == 202
+    assert response.json()["upload_ids"] == [intra, ekstra]
+    job = wait_for(client, response.json()["job_id"])
+    assert (job["status"], job["error"], job["record_count"]) == (jobs.JOB_SUCCEEDED, None, len(expected))
+    assert os.listdir(tmp_path / "uploads") == []
+
+    # Both workbooks fill the same (2023, 001) slice; neither replaced the other's rows
+    response = client.get("/export/entries", params={"format": "csv", "categories": "Penyusutan"})
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == len(expected)
+    assert {(r["kode_ba"], r["tahun_anggaran"]) for r in rows} == {("001", "2023")}
+
+
+def test_invalid_requests_are_rejected(client):
+    upload_id = upload(client)
+    assert client.post("/ingestion/jobs", json={"upload_id": upload_id, "category": "Laba Rugi"}).status_code == 400
+    # A rejected job does not consume the upload
+    assert client.delete(f"/ingestion/uploads/{upload_id}").status_code == 204
+    assert client.post("/ingestion/jobs", json={"upload_id": upload_id, "category": "Neraca"}).status_code == 404
+    # A job with an unknown extra upload does not consume the others
+    upload_id = upload(client)
+    response = client.post("/ingestion/jobs", json={"upload_id": upload_id, "extra_upload_ids": ["unknown"], "category": "Neraca"})
+    assert response.status_code == 404
+    assert client.delete(f"/ingestion/uploads/{upload_id}").status_code == 204
+    assert client.get("/export/entries", params={"format": "xml"}).status_code == 400
+    assert client.get("/ingestion/jobs/unknown").status_code == 404
+
+
+def test_metrics_expose_cumulative_histograms(client, monkeypatch):
+    monkeypatch.setattr(instrumentation.metrics, "_stages", {})
+    with span("test.live", rows=3):
+        pass
+    # As sent back by an extraction worker: 20 ms and 3 s
+    merge_spans([Span("test.merged", seconds=0.02, rows=5, bytes=100), Span("test.merged", seconds=3.0)])
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = dict(line.rsplit(" ", 1) for line in response.text.splitlines() if not line.startswith("#"))
+
+    buckets = [int(samples[f'bar_stage_duration_seconds_bucket{{stage="test.merged",le="{bound}"}}']) for bound in DURATION_BUCKETS]
+    assert buckets == [0 if bound < 0.02 else 1 if bound < 3.0 else 2 for bound in DURATION_BUCKETS]
+    assert samples['bar_stage_duration_seconds_bucket{stage="test.merged",le="+Inf"}'] == "2"
+    assert float(samples['bar_stage_duration_seconds_sum{stage="test.merged"}']) == pytest.approx(3.02)
+    assert samples['bar_stage_duration_seconds_count{stage="test.merged"}'] == "2"
+    assert (samples['bar_stage_rows_total{stage="test.merged"}'], samples['bar_stage_bytes_total{stage="test.merged"}']) == ("5", "100")
+
+    # A span recorded in this process: every bucket from its duration up holds it
+    live = [int(samples[f'bar_stage_duration_seconds_bucket{{stage="test.live",le="{bound}"}}']) for bound in DURATION_BUCKETS]
+    assert live == sorted(live) and live[-1] == 1
+    assert samples['bar_stage_duration_seconds_bucket{stage="test.live",le="+Inf"}'] == samples['bar_stage_duration_seconds_count{stage="test.live"}'] == "1"
+    assert samples['bar_stage_rows_total{stage="test.live"}'] == "3"
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
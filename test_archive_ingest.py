@@ -0,0 +1,71 @@
+import sys
+import os
+import io
+import tarfile
+import zipfile
+
+# Add backend to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from app.services.extraction.factory import ExtractorFactory
+from app.services.ingestion.archive import ingest_archive, iter_archive_members
+
+base_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "excel", "2023")
+# Member name -> corpus file; "upload (2).xlsx" can only be classified from its header
+members = {
+    "Neraca/Laporan lap_bmn_nrc kl  kode 001.xlsx": "Neraca/Laporan lap_bmn_nrc kl  kode 001.xlsx",
+    "upload (2).xlsx": "Saldo Awal/Laporan lap_bmn_nrc_sawal kl  kode 001.xlsx",
+}
+ignored = {"__MACOSX/._upload (2).xlsx": b"", "notes.txt": b"not a workbook", "~$lock.xlsx": b""}
+
+
+def workbooks():
+    contents = {}
+    for member, rel_path in members.items():
+        with open(os.path.join(base_path, rel_path), "rb") as f:
+            contents[member] = f.read()
+    return contents
+
+
+def make_zip():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for member, data in {**workbooks(), **ignored}.items():
+            zf.writestr(member, data)
+    buffer.seek(0)
+    return buffer
+
+
+def make_tar_gz():
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for member, data in {**workbooks(), **ignored}.items():
+            info = tarfile.TarInfo(member)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    buffer.seek(0)
+    return buffer
+
+
+def test_members_are_read_from_zip_and_tar_gz():
+    expected = workbooks()
+    assert dict(iter_archive_members(make_zip(), "set.zip")) == expected
+    assert dict(iter_archive_members(make_tar_gz(), "set.tar.gz")) == expected
+
+
+def test_archive_ingest_classifies_and_extracts_every_member():
+    report = ingest_archive(make_zip(), "set.zip", persist=False, max_workers=1, max_in_flight=1)
+
+    assert not report.failures
+    results = {r.path: (r.category, r.records) for r in report.files}
+    expected = {}
+    for member, rel_path, category in zip(members, members.values(), ["Neraca", "Saldo Awal"]):
+        records = ExtractorFactory.get_extractor(category).extract(os.path.join(base_path, rel_path), member)
+        expected[member] = (category, len(records))
+    assert results == expected
+
+
+if __name__ == "__main__":
+    test_members_are_read_from_zip_and_tar_gz()
+    test_archive_ingest_classifies_and_extracts_every_member()
+    print("Archive members are streamed into extraction.")
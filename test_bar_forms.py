@@ -0,0 +1,40 @@
+import sys
+import os
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+# Add backend to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from app.models.extracted_data import BARMetadata, BARNonNeraca
+from app.services.reporting import bar_forms
+
+
+def test_non_neraca_save_is_idempotent_and_replaces_labels(engine):
+    with Session(engine) as db:
+        values = {"BPYBDS": {"awal": 1.0, "akhir": 2.0}, "BARANG HILANG": {"awal": 3.0, "akhir": 4.0}}
+        bar_forms.save_non_neraca(db, "001", 2023, values)
+        bar_forms.save_non_neraca(db, "001", 2023, values)
+        assert db.scalar(select(func.count()).select_from(BARNonNeraca)) == 2
+
+        bar_forms.save_non_neraca(db, "001", 2023, {"BPYBDS": {"awal": 5.0, "akhir": 6.0}})
+        assert bar_forms.load_non_neraca(db, "001", 2023) == {"BPYBDS": {"awal": 5.0, "akhir": 6.0}}
+
+
+def test_metadata_upsert_only_writes_given_fields(engine):
+    with Session(engine) as db:
+        bar_forms.save_bar_metadata(db, "001", 2023, nama_petugas="A", nip_petugas="1", jenis_ttd="Manual")
+        # Saving the qualitative notes must not touch the signatory section
+        bar_forms.save_bar_metadata(db, "001", 2023, catatan_kualitatif="ok")
+        bar_forms.save_bar_metadata(db, "001", 2023, nama_petugas="B")
+
+        assert db.scalar(select(func.count()).select_from(BARMetadata)) == 1
+        meta = bar_forms.load_bar_metadata(db, "001", 2023)
+        assert (meta.nama_petugas, meta.nip_petugas, meta.jenis_ttd, meta.catatan_kualitatif) == ("B", "1", "Manual", "ok")
+        assert meta.updated_at is not None
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,78 @@
+import sys
+import os
+import io
+import zipfile
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.orm import Session, sessionmaker
+
+# Add backend to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from app.services.ingestion.persistence import save_extracted_entries
+from app.services.reporting import batch, pdf_generator
+from app.services.reporting.face_bar import build_bar_summary, get_face_bar_summary
+
+RECORDS = [
+    {"kode_akun": "131111", "uraian_akun": "Tanah", "nilai": 100.0, "tahun_anggaran": 2023, "kode_ba": "001", "uraian_ba": "BA 001"},
+    {"kode_akun": "132111", "uraian_akun": "Alat Besar", "nilai": 50.0, "tahun_anggaran": 2023, "kode_ba": "002", "uraian_ba": "BA 002"},
+    {"kode_akun": "131111", "uraian_akun": "Tanah", "nilai": 10.0, "tahun_anggaran": 2023, "kode_ba": "004", "uraian_ba": "BA 004"},
+    # Another year: not part of the 2023 batch
+    {"kode_akun": "131111", "uraian_akun": "Tanah", "nilai": 90.0, "tahun_anggaran": 2022, "kode_ba": "005", "uraian_ba": "BA 005"},
+]
+
+
+def test_zip_holds_one_pdf_per_collected_job(engine, monkeypatch):
+    monkeypatch.setattr(batch, "SessionLocal", sessionmaker(bind=engine))
+    with Session(engine) as db:
+        save_extracted_entries(db, RECORDS, "Neraca", "first", snapshot=False)
+        jobs = batch.collect_bar_jobs(db, 2023)
+        some = batch.collect_bar_jobs(db, 2023, ["002", "004"])
+    assert [job.filename for job in jobs] == ["BAR_001_2023.pdf", "BAR_002_2023.pdf", "BAR_004_2023.pdf"]
+
+    for ba_codes, expected in ((None, jobs), (["002", "004"], some)):
+        output = io.BytesIO()
+        report = batch.generate_bar_zip(output, 2023, ba_codes=ba_codes, max_workers=1)
+        assert report.failures == []
+        with zipfile.ZipFile(output) as archive:
+            assert sorted(archive.namelist()) == [job.filename for job in expected]
+            assert all(archive.read(name).startswith(b"%PDF") for name in archive.namelist())
+        assert sorted(f.filename for f in report.files) == [job.filename for job in expected]
+
+
+def test_render_is_memoized_on_its_inputs(engine, monkeypatch):
+    monkeypatch.setattr(pdf_generator, "_pdf_cache", OrderedDict())
+    generate = pdf_generator.BARPDFGenerator.generate_bar_pdf
+    calls = []
+
+    def counting_generate(self, *args, **kwargs):
+        calls.append(args)
+        return generate(self, *args, **kwargs)
+
+    monkeypatch.setattr(pdf_generator.BARPDFGenerator, "generate_bar_pdf", counting_generate)
+
+    with Session(engine) as db:
+        save_extracted_entries(db, RECORDS, "Neraca", "first", snapshot=False)
+        summary = build_bar_summary(get_face_bar_summary(db, "001", 2023), {})
+    metadata = SimpleNamespace(nama_petugas="A", nip_petugas="1", jabatan_petugas="Petugas", jenis_ttd="Manual")
+
+    first = pdf_generator.render_bar_pdf(metadata, summary, "BA 001", 2023)
+    # A rerun with equal (not identical) inputs is served from the memo
+    again = pdf_generator.render_bar_pdf(SimpleNamespace(**vars(metadata)), summary.copy(), "BA 001", 2023)
+    assert again is first and len(calls) == 1
+
+    changed = summary.copy()
+    changed.loc[0, "Saldo Akhir"] += 1
+    assert pdf_generator.bar_pdf_key(metadata, changed, "BA 001", 2023) != pdf_generator.bar_pdf_key(metadata, summary, "BA 001", 2023)
+    assert pdf_generator.render_bar_pdf(metadata, changed, "BA 001", 2023) != first
+    assert len(calls) == 2
+
+    # The signatory is printed too
+    pdf_generator.render_bar_pdf(SimpleNamespace(**{**vars(metadata), "nama_petugas": "B"}), summary, "BA 001", 2023)
+    assert len(calls) == 3
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,68 @@
+import sys
+import os
+import random
+from datetime import datetime
+
+# Add backend to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from app.services.ingestion.catalog import (
+    CATALOG_EXACT_DUPLICATE, CATALOG_INGEST, CATALOG_LOGICAL_DUPLICATE, CATALOG_PLACEHOLDER,
+    CatalogEntry, build_catalog, resolve_duplicates,
+)
+
+base_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "excel", "2023")
+
+
+def entry(path, sha256, kode_ba="098", layout="penyusutan_ekstrakomptabel", exported_at=None, error=None):
+    return CatalogEntry(path=path, category="Penyusutan", sha256=sha256, size=1, layout=layout,
+                        kode_ba=kode_ba, tahun_anggaran=2023, exported_at=exported_at, error=error)
+
+
+def test_duplicates_are_resolved_the_same_way_in_any_order():
+    entries = [
+        entry("ekstra/kode 098 (1).xlsx", "b", exported_at=datetime(2024, 3, 1, 17, 30, 44)),
+        entry("ekstra/kode 098.xlsx", "a", exported_at=datetime(2024, 3, 1, 17, 30, 30)),
+        entry("ekstra/kode 098 copy.xlsx", "a", exported_at=datetime(2024, 3, 1, 17, 30, 30)),
+        # Same BA and year, but the other Penyusutan report: not a duplicate
+        entry("intra/kode 098.xlsx", "c", layout="penyusutan_intrakomptabel"),
+        entry("intra/kode zzz.xlsx", "d", kode_ba=None),
+        # Unreadable files are left for extraction to report, even when byte-identical
+        entry("intra/kode 044.xlsx", "empty", error="BadZipFile"),
+        entry("intra/kode 081.xlsx", "empty", error="BadZipFile"),
+    ]
+    expected = {
+        "ekstra/kode 098 (1).xlsx": (CATALOG_INGEST, None),
+        "ekstra/kode 098 copy.xlsx": (CATALOG_LOGICAL_DUPLICATE, "ekstra/kode 098 (1).xlsx"),
+        "ekstra/kode 098.xlsx": (CATALOG_EXACT_DUPLICATE, "ekstra/kode 098 copy.xlsx"),
+        "intra/kode 098.xlsx": (CATALOG_INGEST, None),
+        "intra/kode zzz.xlsx": (CATALOG_PLACEHOLDER, None),
+        "intra/kode 044.xlsx": (CATALOG_INGEST, None),
+        "intra/kode 081.xlsx": (CATALOG_INGEST, None),
+    }
+    for seed in range(5):
+        shuffled = [CatalogEntry(**vars(e)) for e in entries]
+        random.Random(seed).shuffle(shuffled)
+        resolved = {e.path: (e.status, e.duplicate_of) for e in resolve_duplicates(shuffled)}
+        assert resolved == expected
+
+
+def test_catalog_reads_header_of_corpus_files():
+    files = [
+        (os.path.join(base_path, "Neraca", "Laporan lap_bmn_nrc kl  kode 001.xlsx"), "Neraca"),
+        (os.path.join(base_path, "Neraca", "Laporan lap_bmn_nrc kl  kode 999.xlsx"), "Neraca"),
+        (os.path.join(base_path, "Neraca", "Laporan lap_bmn_nrc kl  kode zzz.xlsx"), "Neraca"),
+    ]
+    catalog = build_catalog(files)
+    first, bun, placeholder = catalog.entries
+    assert (first.layout, first.kode_ba, first.tahun_anggaran, first.status) == ("neraca_face", "001", 2023, CATALOG_INGEST)
+    assert first.exported_at is not None and len(first.sha256) == 64
+    # BA 999 (Bendahara Umum Negara) is a real BA; only the zzz suspense file is a placeholder
+    assert (bun.kode_ba, bun.status) == ("999", CATALOG_INGEST)
+    assert catalog.conflicts == [placeholder] and placeholder.status == CATALOG_PLACEHOLDER
+
+
+if __name__ == "__main__":
+    test_duplicates_are_resolved_the_same_way_in_any_order()
+    test_catalog_reads_header_of_corpus_files()
+    print("Duplicate workbooks are detected deterministically.")
@@ -0,0 +1,79 @@
+import sys
+import os
+
+import pytest
+
+# Add backend to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from app.services.extraction.cache import CACHE_SUFFIX, ExtractionCache, extract_cached
+from app.services.extraction.factory import ExtractorFactory
+
+base_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "excel", "2023", "Neraca")
+workbook_path = os.path.join(base_path, "Laporan lap_bmn_nrc kl  kode 001.xlsx")
+other_workbook_path = os.path.join(base_path, "Laporan lap_bmn_nrc kl  kode 002.xlsx")
+
+
+@pytest.fixture
+def extractor():
+    """
+    Neraca extractor that counts its extract() calls.
+    """
+    extractor = ExtractorFactory.get_extractor("Neraca")
+    extract = extractor.extract
+    extractor.calls = 0
+
+    def counting_extract(file_content, filename):
+        extractor.calls += 1
+        return extract(file_content, filename)
+
+    extractor.extract = counting_extract
+    return extractor
+
+
+def test_unchanged_workbook_is_served_from_the_cache(extractor, tmp_path):
+    cache = ExtractionCache(str(tmp_path), 16 * 1024 * 1024)
+    first = extract_cached(extractor, workbook_path, "kode 001.xlsx", cache)
+    # Same bytes under another name and as an open file: still a hit
+    with open(workbook_path, "rb") as f:
+        second = extract_cached(extractor, f, "renamed.xlsx", cache)
+    assert extractor.calls == 1
+    assert second == first == ExtractorFactory.get_extractor("Neraca").extract(workbook_path, "kode 001.xlsx")
+
+
+def test_new_extractor_version_or_content_misses(extractor, tmp_path):
+    cache = ExtractionCache(str(tmp_path), 16 * 1024 * 1024)
+    extract_cached(extractor, workbook_path, "kode 001.xlsx", cache)
+
+    extractor.version = "test-bump"
+    extract_cached(extractor, workbook_path, "kode 001.xlsx", cache)
+    assert extractor.calls == 2
+
+    records = extract_cached(extractor, other_workbook_path, "kode 001.xlsx", cache)
+    assert extractor.calls == 3
+    assert {r["kode_ba"] for r in records} == {"002"}
+    assert len([name for name in os.listdir(tmp_path) if name.endswith(CACHE_SUFFIX)]) == 3
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    records = [{"kode_akun": str(117111 + i), "uraian_akun": "Barang Konsumsi", "nilai": float(i)} for i in range(100)]
+    probe = ExtractionCache(str(tmp_path / "probe"), 16 * 1024 * 1024)
+    probe.put("probe", records)
+    entry_size = os.path.getsize(os.path.join(probe.directory, "probe" + CACHE_SUFFIX))
+
+    # Room for two entries
+    cache = ExtractionCache(str(tmp_path / "cache"), 2 * entry_size)
+    for i, key in enumerate(["a", "b", "c"]):
+        cache.put(key, records)
+        # Distinct mtimes in insertion order, even on coarse-grained filesystems
+        os.utime(os.path.join(cache.directory, key + CACHE_SUFFIX), (1000 + i, 1000 + i))
+    # Putting c evicted the oldest entry
+    assert cache.get("a") is None
+    # The hit marks b as recently used, so c goes next
+    assert cache.get("b") == records
+    cache.put("d", records)
+    assert (cache.get("b"), cache.get("c"), cache.get("d")) == (records, None, records)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
@@ -1,11 +1,14 @@
 import sys
 import os
 import pandas as pd
+import pytest
 
 # Add backend to path so we can import app modules
 sys.path.append(os.path.join(os.getcwd(), "backend"))
 
+from app.services.extraction.base import PARSER_STREAMING
 from app.services.extraction.factory import ExtractorFactory
+from app.services.extraction.header import read_header_rows
 
 # Determine project root and base path
 base_dir = os.path.dirname(os.path.abspath(__file__))
@@ -50,5 +53,56 @@ def test_extraction():
             import traceback
             traceback.print_exc()
 
+BA_001 = {"tahun_anggaran": 2023, "kode_ba": "001", "uraian_ba": "MAJELIS PERMUSYAWARATAN RAKYAT"}
+
+# One corpus workbook per layout: (category, path, layout, record count, sum of nilai, first two and last (kode_akun, uraian_akun, nilai))
+golden_workbooks = [
+    ("Neraca", "Neraca/Laporan lap_bmn_nrc kl  kode 001.xlsx", "neraca_face", 19, 1151712906358.0, [
+        ("117111", "Barang Konsumsi", 16026973491.0),
+        ("117113", "Bahan untuk Pemeliharaan", 284863252.0),
+        ("169316", "Akumulasi Amortisasi Lisensi", -38591400.0),
+    ]),
+    ("Saldo Awal", "Saldo Awal/Laporan lap_bmn_nrc_sawal kl  kode 001.xlsx", "neraca_saldo_awal", 22, 1133287506984.0, [
+        ("117111", "Barang Konsumsi", 18780590985.0),
+        ("117113", "Bahan untuk Pemeliharaan", 302653350.0),
+        ("169318", "Akumulasi Amortisasi  Aset Tak Berwujud  yang tidak digunakan", -344000000.0),
+    ]),
+    ("Penyusutan", "Penyusutan/PENYUSUTAN INTRAKOMPTABEL/Laporan lap_susut kl intrakomptabel kelompok kode 001.xlsx",
+     "penyusutan_intrakomptabel", 71, 2265878450646.0, [
+        ("131111", "Tanah", 835960489740.0),
+        ("20101", "TANAH PERSIL", 558817345740.0),
+        ("40102", "BANGUNAN GEDUNG TEMPAT TINGGAL", 0.0),
+    ]),
+    ("Penyusutan", "Penyusutan/PENYUSUTAN EKSTRAKOMPTABEL/Laporan lap_susut kl ekstrakomptabel kelompok kode 001.xlsx",
+     "penyusutan_ekstrakomptabel", 24, 193419566.0, [
+        ("132111", "Peralatan dan Mesin", 87700783.0),
+        ("30202", "ALAT ANGKUTAN DARAT TAK BERMOTOR", 0.0),
+        ("31002", "PERALATAN KOMPUTER", 0.0),
+    ]),
+]
+
+
+@pytest.mark.parametrize("category, rel_path, layout, count, total, rows", golden_workbooks, ids=[w[2] for w in golden_workbooks])
+def test_extract_matches_golden_records(category, rel_path, layout, count, total, rows):
+    full_path = os.path.join(base_path, rel_path)
+    extractor = ExtractorFactory.get_extractor(category)
+    assert extractor.detect_layout(read_header_rows(full_path)).name == layout
+
+    records = extractor.extract(full_path, os.path.basename(full_path))
+    assert len(records) == count
+    assert sum(r["nilai"] for r in records) == pytest.approx(total)
+    expected = [{"kode_akun": k, "uraian_akun": u, "nilai": n, **BA_001} for k, u, n in rows]
+    assert records[:2] + records[-1:] == expected
+
+
+@pytest.mark.parametrize("category, rel_path", [w[:2] for w in golden_workbooks], ids=[w[2] for w in golden_workbooks])
+def test_streaming_and_pandas_parsers_agree(category, rel_path):
+    full_path = os.path.join(base_path, rel_path)
+    records = ExtractorFactory.get_extractor(category).extract(full_path, os.path.basename(full_path))
+    with open(full_path, "rb") as f:
+        streamed = list(ExtractorFactory.get_extractor(category, PARSER_STREAMING).iter_records(f))
+    assert streamed == records
+
+
 if __name__ == "__main__":
     test_extraction()
@@ -0,0 +1,101 @@
+import sys
+import os
+import shutil
+
+import pandas as pd
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+# Add backend to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from app.models.extracted_data import ExtractedEntry
+from app.services.ingestion.persistence import save_extracted_entries
+from app.services.reference import registry as registry_module
+from app.services.reference.registry import FACE_BAR_FILE, registry, sync_reference_tables
+from app.services.reporting.face_bar import get_face_bar_summary
+
+reference_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "referensi")
+
+RECORDS = [
+    {"kode_akun": "131111", "uraian_akun": "Tanah", "nilai": 100.0, "tahun_anggaran": 2023, "kode_ba": "001", "uraian_ba": "BA 001"},
+    {"kode_akun": "132111", "uraian_akun": "Alat Besar", "nilai": 50.0, "tahun_anggaran": 2023, "kode_ba": "001", "uraian_ba": "BA 001"},
+]
+
+
+@pytest.fixture
+def reference_dir(tmp_path, monkeypatch):
+    """
+    Copy of referensi/ that the registry reads instead, so tests can edit the workbooks.
+    """
+    directory = tmp_path / "referensi"
+    shutil.copytree(reference_path, directory)
+    monkeypatch.setattr(registry, "directory", str(directory))
+    monkeypatch.setattr(registry, "_entries", {})
+    monkeypatch.setattr(registry, "_pics", None)
+    monkeypatch.setattr(registry_module, "_synced_fingerprint", None)
+    return directory
+
+
+def remap(directory, kode_akun, label):
+    path = directory / FACE_BAR_FILE
+    df = pd.read_excel(path)
+    df.loc[df["kode_akun"].astype(str) == kode_akun, "akun_spesifik_face_bar"] = label
+    df.to_excel(path, index=False)
+    # Make sure the registry sees a new mtime even on coarse-grained filesystems
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def akhir(db, label):
+    return get_face_bar_summary(db, "001", 2023)[label]["akhir"]
+
+
+def test_summary_follows_mapping_edits(engine, reference_dir):
+    with Session(engine) as db:
+        assert sync_reference_tables(db)
+        save_extracted_entries(db, RECORDS, "Neraca", "first", snapshot=False)
+        assert (akhir(db, "Tanah"), akhir(db, "Peralatan dan Mesin")) == (100.0, 50.0)
+
+        remap(reference_dir, "131111", "Peralatan dan Mesin")
+        assert sync_reference_tables(db)
+        assert (akhir(db, "Tanah"), akhir(db, "Peralatan dan Mesin")) == (0.0, 150.0)
+
+        # Nothing changed since: no rewrite
+        assert not sync_reference_tables(db)
+
+
+def test_mapping_edited_by_another_process_is_picked_up(engine, reference_dir, monkeypatch):
+    with Session(engine) as db:
+        sync_reference_tables(db)
+        save_extracted_entries(db, RECORDS, "Neraca", "first", snapshot=False)
+
+        remap(reference_dir, "131111", "Peralatan dan Mesin")
+        # A new process: nothing synced in memory, only ref_versions tells the summary is stale
+        monkeypatch.setattr(registry, "_entries", {})
+        monkeypatch.setattr(registry_module, "_synced_fingerprint", None)
+        assert sync_reference_tables(db)
+        assert akhir(db, "Peralatan dan Mesin") == 150.0
+
+
+def test_entries_are_stored_without_the_mapping(engine, reference_dir):
+    with Session(engine) as db:
+        sync_reference_tables(db)
+        mapping = reference_dir / FACE_BAR_FILE
+        moved = reference_dir.parent / FACE_BAR_FILE
+        mapping.rename(moved)
+
+        with pytest.warns(UserWarning, match="Face BAR summary not refreshed"):
+            save_extracted_entries(db, RECORDS, "Neraca", "first", snapshot=False)
+        assert db.scalar(select(func.count()).select_from(ExtractedEntry)) == 2
+        assert akhir(db, "Tanah") == 0.0
+
+        # Once the mapping is back, the next sync rebuilds the stale summary
+        moved.rename(mapping)
+        assert sync_reference_tables(db)
+        assert akhir(db, "Tanah") == 100.0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
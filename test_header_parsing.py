@@ -0,0 +1,61 @@
+import sys
+import os
+
+# Add backend to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from app.services.extraction.header import parse_header, resolve_year
+from app.services.extraction.layouts import detect_layout
+
+nan = float("nan")
+
+
+def test_neraca_header():
+    rows = [
+        ["LAPORAN POSISI BARANG MILIK NEGARA DI NERACA", nan, nan],
+        ["TAHUN ANGGARAN  2024", nan, nan],
+        [nan, nan, "UAPB", ":  1.0", "MAJELIS PERMUSYAWARATAN RAKYAT"],
+        [nan, "KODE", "URAIAN"],
+        [nan, "1", "2", "2"],
+        [nan, 117111, nan, nan, nan, "Barang Konsumsi", nan, nan, 1500],
+    ]
+    info = parse_header(rows)
+    assert info.as_metadata() == {"kode_ba": "001", "uraian_ba": "MAJELIS PERMUSYAWARATAN RAKYAT", "tahun_anggaran": 2024}
+    assert (info.data_start_row, info.code_col) == (5, 1)
+
+
+def test_penyusutan_header_takes_year_from_period():
+    rows = [
+        ["LAPORAN PENYUSUTAN BARANG KUASA PENGGUNA - TINGKAT KL"],
+        ["UNTUK PERIODE YANG BERAKHIR 31 DESEMBER 2024 - UNAUDITED"],
+        ["UAKPB", ":  043", "KEMENTERIAN LINGKUNGAN HIDUP"],
+        ["1", "2", "3", "4", "8=5+6+7"],
+    ]
+    info = parse_header(rows)
+    assert (info.kode_ba, info.tahun_anggaran) == ("043", 2024)
+    # No data rows in the window
+    assert info.data_start_row is None
+
+    # Nothing recognisable: the historical BA defaults; the year is left to whoever stores the records
+    assert parse_header([["LAPORAN"]]).as_metadata() == {"kode_ba": "000", "uraian_ba": "Unknown", "tahun_anggaran": None}
+    assert (resolve_year(None, 2024), resolve_year(None), resolve_year(2022, 2024)) == (2024, 2023, 2022)
+
+
+def test_penyusutan_layouts_detected_from_column_headers():
+    def header(nilai_buku_col):
+        row = [nan] * (nilai_buku_col + 1)
+        row[0], row[2], row[5], row[nilai_buku_col] = "KODE", "URAIAN", "KUANTITAS", "NILAI BUKU"
+        return [["LAPORAN PENYUSUTAN BARANG KUASA PENGGUNA - TINGKAT KL"], row]
+
+    assert detect_layout(header(18)).name == "penyusutan_intrakomptabel"
+    assert detect_layout(header(21)).value_col == 21
+    # The printed report code wins over column positions
+    assert detect_layout([["lap_bmn_neraca_sawal_kl_poc"]] + header(21)).category == "Saldo Awal"
+    assert detect_layout(header(21), category="Neraca") is None
+
+
+if __name__ == "__main__":
+    test_neraca_header()
+    test_penyusutan_header_takes_year_from_period()
+    test_penyusutan_layouts_detected_from_column_headers()
+    print("Report headers are parsed as expected.")
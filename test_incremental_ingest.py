@@ -0,0 +1,111 @@
+import sys
+import os
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+# Add backend to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from app.models.extracted_data import EntryChangeLog, ExtractedEntry
+from app.services.ingestion.persistence import save_entry_slices, save_extracted_entries, sync_extracted_entries
+
+
+def record(kode_akun, nilai, kode_ba="001"):
+    return {"kode_akun": kode_akun, "uraian_akun": f"Akun {kode_akun}", "nilai": nilai,
+            "tahun_anggaran": 2023, "kode_ba": kode_ba, "uraian_ba": f"BA {kode_ba}"}
+
+
+def stored(db):
+    return sorted(
+        (r.kode_ba, r.kode_akun, float(r.nilai), r.upload_id)
+        for r in db.execute(select(ExtractedEntry)).scalars()
+    )
+
+
+def stored_by_category(db):
+    return sorted(
+        (r.data_category, r.kode_ba, r.kode_akun, float(r.nilai), r.upload_id)
+        for r in db.execute(select(ExtractedEntry)).scalars()
+    )
+
+
+def test_sync_writes_only_changed_rows(engine):
+    with Session(engine) as db:
+        # 132111 appears twice, as with intra- and ekstrakomptabel Penyusutan files
+        initial = [record("131111", 1.0), record("132111", 2.0), record("132111", 3.0), record("133111", 4.0)]
+        save_extracted_entries(db, initial, "Penyusutan", "first", snapshot=False)
+
+        # Same rows in a different order: nothing to write
+        changes = sync_extracted_entries(db, list(reversed(initial)), "Penyusutan", "second", snapshot=False)
+        assert (changes.inserted, changes.updated, changes.deleted, changes.unchanged) == (0, 0, 0, 4)
+
+        incoming = [record("131111", 1.0), record("132111", 3.0), record("132111", 5.0), record("134111", 6.0)]
+        changes = sync_extracted_entries(db, incoming, "Penyusutan", "third", snapshot=False)
+        assert (changes.inserted, changes.updated, changes.deleted, changes.unchanged) == (1, 1, 1, 2)
+
+        # Unchanged rows keep the upload that wrote them
+        assert stored(db) == [
+            ("001", "131111", 1.0, "first"),
+            ("001", "132111", 3.0, "first"),
+            ("001", "132111", 5.0, "third"),
+            ("001", "134111", 6.0, "third"),
+        ]
+        log = db.execute(select(EntryChangeLog).where(EntryChangeLog.upload_id == "third")).scalar_one()
+        assert (log.inserted, log.updated, log.deleted, log.unchanged) == (1, 1, 1, 2)
+        assert log.changed_accounts == "132111,133111,134111"
+
+
+def test_sync_leaves_other_slices_and_categories_alone(engine):
+    with Session(engine) as db:
+        save_extracted_entries(db, [record("131111", 1.0, "001"), record("131111", 2.0, "002")], "Neraca", "first", snapshot=False)
+        save_extracted_entries(db, [record("131111", 9.0, "001")], "Saldo Awal", "first", snapshot=False)
+
+        sync_extracted_entries(db, [record("132111", 7.0, "001")], "Neraca", "second", snapshot=False)
+
+        assert stored(db) == [
+            ("001", "131111", 9.0, "first"),
+            ("001", "132111", 7.0, "second"),
+            ("002", "131111", 2.0, "first"),
+        ]
+
+
+def test_slice_save_replaces_every_category_of_a_slice(engine):
+    with Session(engine) as db:
+        save_extracted_entries(db, [record("131111", 1.0, "001"), record("131111", 2.0, "002")], "Neraca", "first", snapshot=False)
+        save_extracted_entries(db, [record("131111", 3.0, "001")], "Penyusutan", "first", snapshot=False)
+
+        saved = save_entry_slices(db, {
+            "Neraca": [record("132111", 4.0, "001")],
+            "Saldo Awal": [record("132111", 5.0, "001")],
+        }, "second", snapshot=False)
+
+        assert saved == {"Neraca": 1, "Saldo Awal": 1}
+        # BA 002 and the Penyusutan rows of BA 001 are not part of the set
+        assert stored_by_category(db) == [
+            ("Neraca", "001", "132111", 4.0, "second"),
+            ("Neraca", "002", "131111", 2.0, "first"),
+            ("Penyusutan", "001", "131111", 3.0, "first"),
+            ("Saldo Awal", "001", "132111", 5.0, "second"),
+        ]
+
+
+def test_default_year_applies_to_records_without_one(engine):
+    def years(db, category):
+        return {yr for (yr,) in db.execute(select(ExtractedEntry.tahun_anggaran).where(ExtractedEntry.data_category == category))}
+
+    # As extracted from a workbook whose header states no year
+    undated = [{**record("131111", 1.0), "tahun_anggaran": None}]
+    with Session(engine) as db:
+        save_extracted_entries(db, undated, "Neraca", "first", default_year=2024, snapshot=False)
+        sync_extracted_entries(db, undated, "Penyusutan", "first", default_year=2024, snapshot=False)
+        save_entry_slices(db, {"Saldo Awal": undated}, "first", snapshot=False)
+        # A year stated by the workbook wins over the default
+        save_extracted_entries(db, [record("131111", 1.0)], "Neraca", "second", default_year=2024, snapshot=False)
+
+        assert (years(db, "Neraca"), years(db, "Penyusutan"), years(db, "Saldo Awal")) == ({2023, 2024}, {2024}, {2023})
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
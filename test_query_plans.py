@@ -0,0 +1,94 @@
+import sys
+import os
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+# Add backend to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from app.models.extracted_data import BARMetadata, BARNonNeraca
+from app.services.ingestion.persistence import save_extracted_entries
+from app.services.reporting.face_bar import get_face_bar_summary
+
+# EXPLAIN QUERY PLAN regression checks: the hot (kode_ba, tahun_anggaran[, data_category]) queries
+# must be answered from the composite indexes created by migration 0002, never by a table scan.
+
+SAMPLE_RECORDS = [
+    {"kode_akun": "131111", "uraian_akun": "Tanah", "nilai": 100.0, "tahun_anggaran": 2023, "kode_ba": "001", "uraian_ba": "BA 001"},
+    {"kode_akun": "132111", "uraian_akun": "Alat Besar", "nilai": 50.0, "tahun_anggaran": 2023, "kode_ba": "001", "uraian_ba": "BA 001"},
+]
+
+
+def capture_statements(engine, fn):
+    """
+    Runs fn(session) and returns every (sql, params) it sent to the database.
+    """
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        with Session(engine) as db:
+            fn(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return statements
+
+
+def query_plan(engine, statement, parameters=()):
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return " | ".join(row[-1] for row in rows)
+
+
+def plans_for(engine, table, statements):
+    return [
+        (statement, query_plan(engine, statement, parameters))
+        for statement, parameters in statements
+        if table in statement and statement.lstrip().upper().startswith(("SELECT", "DELETE"))
+    ]
+
+
+def test_slice_replacement_uses_composite_index(engine):
+    statements = capture_statements(
+        engine, lambda db: save_extracted_entries(db, SAMPLE_RECORDS, "Neraca", "batch", snapshot=False)
+    )
+    plans = plans_for(engine, "extracted_entries", statements)
+    assert plans, "no extracted_entries queries captured"
+    for statement, plan in plans:
+        assert "ix_extracted_entries_ba_year_category" in plan, f"{statement}\n-> {plan}"
+        if statement.lstrip().upper().startswith("SELECT"):
+            # Face BAR refresh sums nilai per kode_akun straight from the index
+            assert "COVERING INDEX" in plan, f"{statement}\n-> {plan}"
+
+
+def test_face_bar_summary_lookup_uses_unique_index(engine):
+    statements = capture_statements(engine, lambda db: get_face_bar_summary(db, "001", 2023))
+    plans = plans_for(engine, "face_bar_summary", statements)
+    assert plans, "no face_bar_summary queries captured"
+    for statement, plan in plans:
+        assert "USING INDEX sqlite_autoindex_face_bar_summary_1" in plan, f"{statement}\n-> {plan}"
+
+
+def test_bar_metadata_and_non_neraca_lookups_use_natural_key_indexes(engine):
+    def load(db):
+        db.execute(select(BARMetadata).where(BARMetadata.kode_ba == "001", BARMetadata.tahun_anggaran == 2023)).first()
+        db.execute(select(BARNonNeraca).where(BARNonNeraca.kode_ba == "001", BARNonNeraca.tahun_anggaran == 2023)).all()
+
+    statements = capture_statements(engine, load)
+    metadata_plans = plans_for(engine, "bar_metadata", statements)
+    non_neraca_plans = plans_for(engine, "bar_non_neraca", statements)
+    assert metadata_plans and non_neraca_plans
+    for statement, plan in metadata_plans:
+        assert "uq_bar_metadata_ba_year" in plan, f"{statement}\n-> {plan}"
+    for statement, plan in non_neraca_plans:
+        assert "uq_bar_non_neraca_ba_year_label" in plan, f"{statement}\n-> {plan}"
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,69 @@
+import sys
+import os
+
+import pytest
+from sqlalchemy.orm import Session
+
+# Add backend to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from app.models.extracted_data import ExtractedEntry
+from app.services.analytics import queries, snapshot
+from app.services.ingestion.persistence import save_extracted_entries
+
+pytest.importorskip("pyarrow")
+
+RECORDS = [
+    {"kode_akun": "131111", "uraian_akun": "Tanah", "nilai": 100.0, "tahun_anggaran": 2023, "kode_ba": "001", "uraian_ba": "BA 001"},
+    {"kode_akun": "132111", "uraian_akun": "Alat Besar", "nilai": 50.0, "tahun_anggaran": 2023, "kode_ba": "001", "uraian_ba": "BA 001"},
+]
+
+
+def test_reads_during_a_refresh_ignore_the_file_being_written(engine, tmp_path, monkeypatch):
+    store = snapshot.SnapshotStore(str(tmp_path / "snapshot"))
+    with Session(engine) as db:
+        save_extracted_entries(db, RECORDS, "Neraca", "first", snapshot=False)
+        store.refresh(db)
+        assert store.summarize_entries()["records"] == 2
+
+        seen = []
+        write_table = snapshot.pq.write_table
+
+        def write_and_read(table, path):
+            # The temporary file is complete but not yet swapped in
+            write_table(table, path)
+            seen.append(store.summarize_entries())
+
+        monkeypatch.setattr(snapshot.pq, "write_table", write_and_read)
+        store.refresh(db, [(2023, "Neraca")])
+
+    assert seen == [{"total_nilai": 150.0, "ba_count": 1, "records": 2}]
+
+
+def test_rows_without_a_category_get_their_own_partition(engine, tmp_path):
+    store = snapshot.SnapshotStore(str(tmp_path / "snapshot"))
+    with Session(engine) as db:
+        save_extracted_entries(db, RECORDS, "Neraca", "first", snapshot=False)
+        # Rows ingested before data_category existed
+        db.add(ExtractedEntry(kode_akun="131111", uraian_akun="Tanah", nilai=25.0, tahun_anggaran=2023,
+                              kode_ba="002", uraian_ba="BA 002", data_category=None))
+        db.commit()
+        store.refresh(db)
+        assert os.path.isdir(tmp_path / "snapshot" / "tahun_anggaran=2023" / f"data_category={snapshot.NULL_PARTITION}")
+
+        for filters in ({}, {"categories": ["Neraca"]}, {"years": [2023]}):
+            assert store.summarize_entries(**filters) == queries.summarize_entries(db, **filters)
+        loaded = store.load_entries()
+        assert loaded["id"].tolist() == queries.load_entries(db)["id"].tolist()
+        assert loaded["data_category"].isna().sum() == 1
+        assert store.get_filter_options() == queries.get_filter_options(db)
+
+        # The NULL partition can be rewritten on its own
+        db.query(ExtractedEntry).filter(ExtractedEntry.data_category.is_(None)).update({"nilai": 30.0})
+        db.commit()
+        store.refresh(db, [(2023, None)])
+        assert store.summarize_entries() == queries.summarize_entries(db)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
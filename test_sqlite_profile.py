@@ -0,0 +1,80 @@
+import sys
+import os
+import sqlite3
+
+import pytest
+from sqlalchemy import event, text
+
+# Add backend to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from app.core.config import settings
+from app.db.session import build_engine
+
+# PRAGMA synchronous values
+SYNCHRONOUS_NORMAL = 1
+
+
+def pragmas(engine):
+    with engine.connect() as conn:
+        return {
+            name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in ("journal_mode", "synchronous", "busy_timeout", "cache_size", "temp_store")
+        }
+
+
+def test_tuned_engines_apply_the_pragmas(tmp_path):
+    url = f"sqlite:///{tmp_path / 'profile.db'}"
+    for writer in (False, True):
+        engine = build_engine(url, writer=writer)
+        try:
+            assert pragmas(engine) == {
+                "journal_mode": "wal",
+                "synchronous": SYNCHRONOUS_NORMAL,
+                "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+                "cache_size": -settings.SQLITE_CACHE_SIZE_KB,
+                "temp_store": 2,  # MEMORY
+            }
+        finally:
+            engine.dispose()
+
+    untuned = build_engine(f"sqlite:///{tmp_path / 'untuned.db'}", tuned=False)
+    try:
+        assert pragmas(untuned)["journal_mode"] == "delete"
+    finally:
+        untuned.dispose()
+
+
+def test_writer_transactions_begin_immediate(tmp_path):
+    url = f"sqlite:///{tmp_path / 'profile.db'}"
+    statements = {}
+    for writer in (False, True):
+        engine = build_engine(url, writer=writer)
+        issued = statements[writer] = []
+        event.listen(engine, "before_cursor_execute", lambda conn, cursor, sql, *args: issued.append(sql))
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("CREATE TABLE IF NOT EXISTS t (x INTEGER)"))
+                conn.execute(text("INSERT INTO t VALUES (1)"))
+        finally:
+            engine.dispose()
+
+    assert statements[True][0] == "BEGIN IMMEDIATE"
+    # The readers' engine leaves transaction control to pysqlite
+    assert "BEGIN IMMEDIATE" not in statements[False]
+    # The write lock is taken at BEGIN, before any statement: another writer cannot start
+    engine = build_engine(url, writer=True)
+    try:
+        with engine.begin():
+            other = sqlite3.connect(tmp_path / "profile.db", timeout=0)
+            try:
+                with pytest.raises(sqlite3.OperationalError, match="database is locked"):
+                    other.execute("BEGIN IMMEDIATE")
+            finally:
+                other.close()
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))